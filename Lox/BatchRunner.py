@@ -0,0 +1,97 @@
+import glob
+import io
+import multiprocessing
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from LoxContext import LoxContext
+
+'''
+Runs many independent Lox scripts across a pool of worker processes (plox -jobs).
+Usage:
+    plox -jobs [n] [scripts, globs or job files]
+An argument ending in ".lox" (or containing a glob pattern) names scripts that run
+without arguments. Any other argument is a job file: one job per line, the script
+followed by its arguments (quoted as in a shell); blank lines and lines starting
+with '#' are skipped.
+The Python and GetMod modules and the library files are loaded and parsed once,
+before the workers are forked, so every job starts warm. Each job runs in its
+own context, with its output captured in memory; once all are done, the output
+of each job is written out in order, followed by a summary of exit codes and timings.
+'''
+
+def readJobs(arguments: list[str]) -> list[list[str]]:
+    jobs: list[list[str]] = []
+    for argument in arguments:
+        if glob.has_magic(argument):
+            jobs.extend([path] for path in sorted(glob.glob(argument)))
+        elif argument.endswith(".lox"):
+            jobs.append([argument])
+        else:
+            with open(argument) as file:
+                for line in file:
+                    line = line.strip()
+                    if (line != "") and (line[0] != '#'):
+                        jobs.append(shlex.split(line))
+    return jobs
+
+# Runs one script, in a worker process.
+def runJob(job: list[str]) -> dict:
+    from LoxMain import runFile
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    context = LoxContext(argv = job[1:], stdout = stdout, stderr = stderr)
+    context.fileName = job[0]
+    context.linePos = True
+    context.linePrint = True
+    code = 0
+    start = time.perf_counter()
+    if (len(job[0]) < 4) or (job[0][-4:] != ".lox"):
+        context.output.error("Invalid lox file.\n")
+        code = 64
+    else:
+        try:
+            runFile(context, job[0])
+        except SystemExit as exit:
+            code = exit.code if (type(exit.code) == int) else 1
+        except Exception as error:
+            context.output.error(f"Internal error: {error!r}\n")
+            code = 70
+    context.output.flush()
+    return {"job": job, "code": code, "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(), "time": time.perf_counter() - start}
+
+def runJobs(jobs: list[list[str]], workers: int | None = None) -> int:
+    from LoxServer import warmUp
+    warmUp(LoxContext())
+    # Forked workers share the modules loaded above; elsewhere, each worker loads its own.
+    if "fork" in multiprocessing.get_all_start_methods():
+        method = multiprocessing.get_context("fork")
+    else:
+        method = None
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers = workers, mp_context = method) as pool:
+        # map() keeps the results in submission order.
+        results = list(pool.map(runJob, jobs))
+    total = time.perf_counter() - start
+
+    for result in results:
+        print(f"==> {shlex.join(result["job"])} <==")
+        sys.stdout.write(result["stdout"])
+        sys.stdout.flush()
+        sys.stderr.write(result["stderr"])
+        sys.stderr.flush()
+
+    print("\nExit   Time (ms)  Job")
+    failed = 0
+    for result in results:
+        print(f"{result["code"]:4}  {result["time"] * 1000:10.1f}  {shlex.join(result["job"])}")
+        if result["code"] != 0:
+            failed += 1
+    busy = sum(result["time"] for result in results)
+    print(f"Ran {len(results)} jobs in {total:.2f} s ({busy:.2f} s of job time); "
+          f"{len(results) - failed} succeeded, {failed} failed.")
+    # The batch fails with the highest exit code of its jobs.
+    return max((result["code"] for result in results), default = 0)
@@ -1,27 +1,31 @@
 from __future__ import annotations
 from typing import Any, TYPE_CHECKING
 
-from datetime import datetime, time
+import copy
+from ByteBuffer import ByteBuffer
 from Environment import Environment
 from Error import RuntimeError
 from Expr import Expr
+from LineStream import LineStream
 from List import List
-from LoxCallable import LoxCallable
+from LoxCallable import LoxCallable, NativeCallable
 from LoxInstance import LoxInstance
 from Reference import Reference
 from String import String
 from Token import Token
 
 if TYPE_CHECKING:
+    from datetime import time
     from Interpreter import Interpreter
+    from Scheduler import LoxTask
 
 # General class to implement built-in functions.
 
 '''
-To define a built-in function, simply include its logic under its mode for both call() and arity(), 
-constructing a method for it that is used for call(), and then create a BuiltinFunction object 
-with the appropriate mode. You thereafter assign the appropriate name to the object in 
-the builtins environment.
+To define a built-in function, write a method for it taking (interpreter, expr) and then its
+arguments, and add its name, method and arity to the table at the end of this file.
+Each built-in is a BuiltinFunction object made once, when the builtins environment is set up,
+which calls its method directly.
 '''
 
 # Current built-in functions supported:
@@ -29,7 +33,8 @@ the builtins environment.
 # 2. type(x) - Prints the type of x.
 # 3. str(x) - Returns a string form of x.
 # 4. number(x) - Returns a number (float) form of x.
-# 5. length(x) - Returns the length of a string (String object) or list (List object).
+# 5. length(x) - Returns the length of a string (String object), list (List object) or bytes (ByteBuffer object)
+# (or, for a stream, the number of elements read so far, plus one if there is another).
 # 6. copy(x) - Returns an isolated copy of X (will use the constructor if X is a class instance).
 # 7. strformat(x) - Returns an ASCII-encoded/formatted version of its argument string.
 # 8. perror(x) - Prints message X to stderr.
@@ -41,58 +46,22 @@ the builtins environment.
 # passed to a function, etc., it simply becomes the object.
 # Until then, it is a Reference object.
 # 11. breakpoint() - Starts a debug prompt when run from a file.
+# 12. spawn(f, args...) - Starts f(args...) as a task, and returns the task.
+# 13. await(x) - Waits for task X (or each task in list X) and returns its result(s).
 
-builtins = Environment()
-functions = ["clock", "type", "string", "number", "length", "copy",
-            "strformat", "perror", "arity", "reference", "breakpoint", "debug"]
-
-class BuiltinFunction(LoxCallable):
-    def __init__(self, mode: str) -> None:
-        self.mode: str = mode
-    
-    def call(self, interpreter: Interpreter, expr: Expr.Call, 
-             arguments: list[Any]) -> Any:
-        if self.mode == "clock":
-            return self.b_clock()
-        if self.mode == "type":
-            return self.b_type(interpreter, arguments[0])
-        if self.mode == "string":
-            return self.b_string(interpreter, arguments[0])
-        if self.mode == "number":
-            return self.b_number(expr, arguments[0])
-        if self.mode == "length":
-            return self.b_length(expr, arguments[0])
-        if self.mode == "copy":
-            return self.b_copy(interpreter, expr, arguments)
-        if self.mode == "strformat":
-            return self.b_strformat(expr, arguments[0])
-        if self.mode == "perror":
-            if len(arguments) == 2:
-                self.b_perror(expr, arguments[0], arguments[1])
-            elif len(arguments) == 1:
-                self.b_perror(expr, arguments[0])
-            return ()
-        if self.mode == "arity":
-            return self.b_arity(expr, arguments[0])
-        if self.mode == "reference":
-            return self.b_reference(arguments[0])
-        if self.mode == "breakpoint":
-            self.b_breakpoint(interpreter, expr)
-            return ()
-        if self.mode == "debug":
-            self.b_debug(interpreter)
-            return ()
-    
-    def b_clock(self) -> time:
+class BuiltinFunction(NativeCallable):
+    def b_clock(self, interpreter: Interpreter, expr: Expr.Call) -> time:
+        # Only imported when needed, to keep startup fast.
+        from datetime import datetime
         return datetime.now().time()
     
-    def b_type(self, interpreter: Interpreter, object: Any) -> String:
+    def b_type(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> String:
         return String(f"<{interpreter.varType(object)}>")
     
-    def b_string(self, interpreter: Interpreter, object: Any) -> String:
+    def b_string(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> String:
         return String(interpreter.stringify(object))
     
-    def b_number(self, expr: Expr.Call, object: Any) -> float | None:
+    def b_number(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> float | None:
         callee: Token
         if type(expr.callee) == Expr.Variable:
             callee = expr.callee.name
@@ -105,30 +74,32 @@ class BuiltinFunction(LoxCallable):
         except ValueError:
             raise RuntimeError(callee, "Invalid input to number().")
     
-    def b_length(self, expr: Expr.Call, object: Any) -> float | None:
+    def b_length(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> float | None:
         callee: Token
         if type(expr.callee) == Expr.Variable:
             callee = expr.callee.name
         elif type(expr.callee) == Expr.Access:
             callee = expr.rightParen
-        validTypes = (String, List)
+        validTypes = (String, List, ByteBuffer, LineStream)
         if type(object) not in validTypes:
             raise RuntimeError(callee, "Invalid input to length().")
         if type(object) == String:
             return float(len(object.text))
         elif type(object) == List:
             return float(len(object.array))
+        elif type(object) == ByteBuffer:
+            return float(len(object.view))
+        elif type(object) == LineStream:
+            # Elements read so far, plus one if there is another.
+            return object.length()
     
-    def b_copy(self, interpreter: Interpreter, expr: Expr.Call, 
-               arguments: list[Any]) -> Any:
-        object = arguments[0]
+    def b_copy(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> Any:
         if isinstance(object, LoxInstance):
-            return object.klass.call(interpreter, expr, arguments)
-        import copy
+            return object.klass.call(interpreter, expr, [object])
         newObj = copy.deepcopy(object)
         return newObj
     
-    def b_strformat(self, expr: Expr.Call, object: Any) -> String | None:
+    def b_strformat(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> String | None:
         callee: Token
         if type(expr.callee) == Expr.Variable:
             callee = expr.callee.name
@@ -138,64 +109,81 @@ class BuiltinFunction(LoxCallable):
             raise RuntimeError(callee, "strformat() only accepts string arguments.")
         return String(object.text.encode("utf-8").decode("unicode_escape"))
      
-    def b_perror(self, expr: Expr.Call, message: String, 
-                 format: bool = True) -> None:
+    def b_perror(self, interpreter: Interpreter, expr: Expr.Call, message: String, 
+                 format: bool = True) -> tuple:
         if type(message) != String:
             raise RuntimeError(expr.rightParen, "perror() only accepts string arguments.")
-        import sys
         if format:
             text = message.text.encode("utf-8").decode("unicode_escape")
         else:
             text = message.text
-        sys.stderr.write(text + '\n')
+        interpreter.context.output.error(text + '\n')
+        return ()
     
-    def b_arity(self, expr: Expr.Call, function: Any) -> List | None:
+    def b_arity(self, interpreter: Interpreter, expr: Expr.Call, function: Any) -> List | None:
         if not isinstance(function, LoxCallable):
             raise RuntimeError(expr.rightParen, "arity() only accepts function arguments.")
-        return List(function.arity())
+        # A copy, as native functions share theirs between calls.
+        return List(list(function.arity()))
 
-    def b_reference(self, object: Any) -> Reference:
+    def b_reference(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> Reference:
         return Reference(object)
     
-    def b_breakpoint(self, interpreter: Interpreter, expr: Expr.Call) -> None:
+    def b_breakpoint(self, interpreter: Interpreter, expr: Expr.Call) -> tuple:
         from Debug import breakpointStop
-        breakpointStop(interpreter, interpreter.environment, expr).debugStart()
+        breakpointStop(interpreter, interpreter.environment, expr.callee.name).debugStart()
+        return ()
     
-    def b_debug(self, interpreter: Interpreter) -> None:
+    def b_debug(self, interpreter: Interpreter, expr: Expr.Call) -> tuple:
         from Debug import replDebugger
         replDebugger(interpreter).runDebugger()
+        return ()
+
+    def b_spawn(self, interpreter: Interpreter, expr: Expr.Call, function: Any,
+                *arguments: Any) -> LoxTask:
+        from Scheduler import scheduler
+        if not isinstance(function, LoxCallable):
+            raise RuntimeError(expr.rightParen, "spawn() only accepts function arguments.")
+        arity = function.arity()
+        if not (arity[0] <= len(arguments) <= arity[1]):
+            raise RuntimeError(expr.rightParen, "Arguments do not match the spawned function's arity.")
+        return scheduler(interpreter).spawn(function, expr, list(arguments))
+
+    def b_await(self, interpreter: Interpreter, expr: Expr.Call, object: Any) -> Any:
+        from Scheduler import LoxTask, scheduler
+        if type(object) == List:
+            if not all(type(task) == LoxTask for task in object.array):
+                raise RuntimeError(expr.rightParen, "await() only accepts tasks or lists of tasks.")
+            return List([self.b_await(interpreter, expr, task) for task in object.array])
+        if type(object) != LoxTask:
+            raise RuntimeError(expr.rightParen, "await() only accepts tasks or lists of tasks.")
+        try:
+            return scheduler(interpreter).wait(object)
+        # Errors from I/O tasks (errors from Lox code are already RuntimeErrors).
+        except (OSError, ValueError) as error:
+            raise RuntimeError(expr.rightParen, f"I/O task failed:\n{str(error)}")
 
-    def arity(self) -> list[int] | None:
-        match (self.mode):
-            case "clock":
-                return [0,0]
-            case "type":
-                return [1,1]
-            case "string":
-                return [1,1]
-            case "number":
-                return [1,1]
-            case "length":
-                return [1,1]
-            case "copy":
-                return [1,1]
-            case "strformat":
-                return [1,1]
-            case "perror":
-                return [1,2]
-            case "arity":
-                return [1,1]
-            case "reference":
-                return [1,1]
-            case "breakpoint":
-                return [0,0]    # breakpointStop's constructor takes one argument, 
-                                # but the user breakpoint() function takes none.
-            case "debug":
-                return [0,0]
+# Name, implementation, arity.
+functions = (("clock", BuiltinFunction.b_clock, [0,0]),
+             ("type", BuiltinFunction.b_type, [1,1]),
+             ("string", BuiltinFunction.b_string, [1,1]),
+             ("number", BuiltinFunction.b_number, [1,1]),
+             ("length", BuiltinFunction.b_length, [1,1]),
+             ("copy", BuiltinFunction.b_copy, [1,1]),
+             ("strformat", BuiltinFunction.b_strformat, [1,1]),
+             ("perror", BuiltinFunction.b_perror, [1,2]),
+             ("arity", BuiltinFunction.b_arity, [1,1]),
+             ("reference", BuiltinFunction.b_reference, [1,1]),
+             # breakpointStop's constructor takes one argument,
+             # but the user breakpoint() function takes none.
+             ("breakpoint", BuiltinFunction.b_breakpoint, [0,0]),
+             ("debug", BuiltinFunction.b_debug, [0,0]),
+             ("spawn", BuiltinFunction.b_spawn, [1,255]),
+             ("await", BuiltinFunction.b_await, [1,1]))
 
-    def toString(self) -> str:
-        return "<native fn>"
-    
-def builtinSetUp() -> None:
-    for function in functions:
-        builtins.define(function, BuiltinFunction(function), "VAR")
\ No newline at end of file
+# Each interpreter gets its own built-ins environment.
+def builtinSetUp() -> Environment:
+    builtins = Environment()
+    for name, implementation, arity in functions:
+        builtins.define(name, BuiltinFunction(name, implementation, arity), "VAR")
+    return builtins
@@ -0,0 +1,205 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+
+import re
+import struct
+from Error import RuntimeError
+from LoxCallable import LoxCallable, NativeCallable
+from String import String
+
+if TYPE_CHECKING:
+    from Expr import Expr
+    from Interpreter import Interpreter
+    from Token import Token
+
+'''
+Bytes are Lox's binary data: a view (memoryview) over a bytearray (writable)
+or bytes (read-only, e.g., from a memory-mapped file).
+Slicing (b[start..end]) gives a new view over the same memory, without copying.
+Fixed-width integers and floats are read and written in place with unpack()/pack(),
+using struct format strings (e.g., "<I" for a little-endian 32-bit unsigned integer).
+'''
+
+# A single number or Boolean, with an optional byte order (e.g., "<I").
+numberFormat = re.compile(r"[@=<>!]?[bBhHiIlLqQnNefd?]")
+
+class ByteFunction(NativeCallable):
+    # Each method gets the bytes it is called on as self.instance.
+
+    # Returns the bytes decoded as a string.
+    def b_decode(self, interpreter: Interpreter, expr: Expr.Call,
+                 encoding: String | None = None) -> String:
+        encoding = "utf-8" if encoding == None else encoding.text
+        try:
+            return String(str(self.instance.view, encoding))
+        except LookupError:
+            raise RuntimeError(expr.rightParen, f"Unknown encoding '{encoding}'.")
+        except UnicodeDecodeError:
+            raise RuntimeError(expr.rightParen, f"Bytes are not valid {encoding}.")
+
+    # Reads a number of the given format at the given offset.
+    def b_unpack(self, interpreter: Interpreter, expr: Expr.Call, format: String,
+                 offset: float) -> float | bool:
+        try:
+            value = struct.unpack_from(format.text, self.instance.view, int(offset))[0]
+        except struct.error as error:
+            raise RuntimeError(expr.rightParen, f"Cannot unpack: {error}.")
+        if type(value) == bool:
+            return value
+        return float(value)
+
+    # Writes a number in the given format at the given offset.
+    def b_pack(self, interpreter: Interpreter, expr: Expr.Call, format: String, offset: float,
+               value: Any) -> tuple:
+        if self.instance.view.readonly:
+            raise RuntimeError(expr.rightParen, "Bytes are read-only.")
+        format = format.text
+        try:
+            if (type(value) == float) and (format.lstrip("@=<>!")[-1:] not in "efd"):
+                value = int(value)
+            struct.pack_into(format, self.instance.view, int(offset), value)
+        except struct.error as error:
+            raise RuntimeError(expr.rightParen, f"Cannot pack: {error}.")
+        return ()
+
+    # Returns the offset of the first occurrence of a string or bytes (-1 if not found).
+    def b_find(self, interpreter: Interpreter, expr: Expr.Call, target: Any,
+               start: float = 0) -> float:
+        if type(target) == String:
+            target = target.text.encode("utf-8")
+        else:
+            target = target.view
+        view = self.instance.view
+        start = int(start)
+        if start < 0:
+            start = max(0, len(view) + start)
+        # A view over its whole object is searched in place (bytes, bytearray and mmap all have find()).
+        owner = view.obj
+        if (len(view) == len(owner)) and hasattr(owner, "find"):
+            return float(owner.find(target, start))
+        # Otherwise only the part being searched is copied.
+        index = bytes(view[start:]).find(target)
+        return float(index if index == -1 else index + start)
+
+    # Returns the bytes as a hexadecimal string.
+    def b_hex(self, interpreter: Interpreter, expr: Expr.Call) -> String:
+        return String(self.instance.view.hex())
+
+    # ------------------------------------------------------------
+
+    def check_decode(self, expr: Expr.Call, arguments: list[Any]) -> bool | None:
+        if (len(arguments) == 0) or (type(arguments[0]) == String):
+            return True
+        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
+                                       "Types are: string.")
+
+    def checkFormat(self, expr: Expr.Call, format: String) -> None:
+        if numberFormat.fullmatch(format.text) == None:
+            raise RuntimeError(expr.rightParen, "Format must be a single number or Boolean " \
+                                                "(e.g., \"<I\"), with an optional byte order.")
+        try:
+            struct.calcsize(format.text)
+        except struct.error as error:
+            raise RuntimeError(expr.rightParen, f"Invalid format: {error}.")
+
+    def check_unpack(self, expr: Expr.Call, arguments: list[Any]) -> bool | None:
+        if (type(arguments[0]) == String) and (type(arguments[1]) == float):
+            self.checkFormat(expr, arguments[0])
+            if int(arguments[1]) < 0:
+                raise RuntimeError(expr.rightParen, "Offset cannot be negative.")
+            return True
+        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
+                                       "Types are: string, number.")
+
+    def check_pack(self, expr: Expr.Call, arguments: list[Any]) -> bool | None:
+        if (type(arguments[0]) == String) and (type(arguments[1]) == float) \
+                and (type(arguments[2]) in (float, bool)):
+            self.checkFormat(expr, arguments[0])
+            if int(arguments[1]) < 0:
+                raise RuntimeError(expr.rightParen, "Offset cannot be negative.")
+            return True
+        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
+                                       "Types are: string, number, number.")
+
+    def check_find(self, expr: Expr.Call, arguments: list[Any]) -> bool | None:
+        if type(arguments[0]) in (String, ByteBuffer):
+            if (len(arguments) == 1) or (type(arguments[1]) == float):
+                return True
+        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
+                                       "Types are: string or bytes, number.")
+
+    def toString(self) -> str:
+        return "<bytes method>"
+
+# Name, implementation, arity, argument check (None if any arguments are accepted).
+methods: dict[str, ByteFunction] = {}
+for name, implementation, arity, check in (
+        ("decode", ByteFunction.b_decode, [0,1], ByteFunction.check_decode),
+        ("unpack", ByteFunction.b_unpack, [2,2], ByteFunction.check_unpack),
+        ("pack", ByteFunction.b_pack, [3,3], ByteFunction.check_pack),
+        ("find", ByteFunction.b_find, [1,2], ByteFunction.check_find),
+        ("hex", ByteFunction.b_hex, [0,0], None)):
+    methods[name] = ByteFunction(name, implementation, arity, check)
+
+class ByteBuffer:
+    def __init__(self, data: bytes | bytearray | memoryview) -> None:
+        self.view = memoryview(data)
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __eq__(self, other: Any) -> bool:
+        return (type(other) == ByteBuffer) and (self.view == other.view)
+
+    # Copies (e.g., by copy()) get their own writable memory.
+    def __deepcopy__(self, memo: dict) -> ByteBuffer:
+        return ByteBuffer(bytearray(self.view))
+
+    def get(self, name: Token) -> ByteFunction:
+        method = methods.get(name.lexeme, None)
+        if method != None:
+            return method.bound(self)
+        raise RuntimeError(name, f"Undefined property or method '{name.lexeme}'.")
+
+    def __str__(self) -> str:
+        return str(bytes(self.view))
+
+class ByteInit(LoxCallable):
+    def check(self, expr: Expr.Call, arguments: list[Any]) -> bool | None:
+        if len(arguments) == 0:
+            return True
+        obj = arguments[0]
+        if (type(obj) == float) and (obj >= 0):
+            return True
+        if type(obj) in (String, ByteBuffer):
+            return True
+        from List import List
+        if (type(obj) == List) and all((type(element) == float) and (0 <= element < 256)
+                                       for element in obj.array):
+            return True
+        raise RuntimeError(expr.rightParen, "Invalid argument to Bytes().\n" \
+                           "Expected a size, a string, bytes, or a list of numbers from 0 to 255.")
+
+    # Bytes() - empty; Bytes(n) - n zero bytes; Bytes(string) - the string's UTF-8 encoding;
+    # Bytes(bytes) - a copy; Bytes(list) - the list's numbers as bytes.
+    def call(self, interpreter: Interpreter, expr: Expr.Call,
+             arguments: list[Any]) -> ByteBuffer:
+        if self.check(expr, arguments):
+            if len(arguments) == 0:
+                return ByteBuffer(bytearray())
+            obj = arguments[0]
+            if type(obj) == float:
+                return ByteBuffer(bytearray(int(obj)))
+            if type(obj) == String:
+                return ByteBuffer(bytearray(obj.text.encode("utf-8")))
+            if type(obj) == ByteBuffer:
+                return ByteBuffer(bytearray(obj.view))
+            return ByteBuffer(bytearray(int(element) for element in obj.array))
+
+    def arity(self) -> list[int]:
+        return [0,1]
+
+    def toString(self) -> str:
+        return "<Bytes constructor>"
+
+initBytes = ByteInit()
@@ -1,11 +1,12 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Any, TYPE_CHECKING
 
 from Environment import Environment
-from Error import StopError
+from Error import CLISwitch, StopError
 from Expr import Expr
-import State
+from LoxModule import LazyBinding, ModuleBinding
 from Stmt import Stmt
+from Token import Token
 
 if TYPE_CHECKING:
     from Interpreter import Interpreter
@@ -14,10 +15,10 @@ if TYPE_CHECKING:
 Features to implement:
 1) Breakpoints (figure out a way to allow them to be added at function entry points as well). DONE.
 2) Options:
-- step (Execute current line and stop at next one; if current line contains a function call, enter the function.)
-- next (Execute current line and stop at next one; if current line contains a function call, evaluate the call and go to the next line; do not step into the function.)
+- step (Execute current line and stop at next one; if current line contains a function call, enter the function.) DONE.
+- next (Execute current line and stop at next one; if current line contains a function call, evaluate the call and go to the next line; do not step into the function.) DONE.
 - continue (Continue executing until breakpoint, end, or error is reached.) DONE.
-- out (Step out of the current executing function, if any, while executing the remainder of its body.)
+- out (Step out of the current executing function, if any, while executing the remainder of its body.) DONE.
 3) Inspect variables in scope (values and current local/global variables). DONE.
 4) Show current line being executed and call stack.
 5) Evaluating expressions (possibly involving variables) on the fly. DONE.
@@ -28,14 +29,59 @@ Possibly:
 9) Allow user to specify logging mode to print out all output and commands.
 '''
 
-class CLISwitch(Exception):
-    pass
+class debugTracer:
+    '''
+    Follows execution through the interpreter's "line" hook while there are line
+    breakpoints or a pending step/next/out instruction.
+    Detaches itself otherwise, so the interpreter goes back to running untraced.
+    '''
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        self.context = interpreter.context
+        self.mode: str | None = None # "step", "next", "out" or None.
+        self.targetDepth = 0
+        self.attached = False
+
+    def resume(self, mode: str | None, depth: int) -> None:
+        self.mode = mode
+        self.targetDepth = depth
+        if (mode == None) and (len(self.context.breakpoints) == 0):
+            if self.attached:
+                self.interpreter.hooks.unregister("line", self.onLine)
+                self.attached = False
+        elif not self.attached:
+            self.interpreter.hooks.register("line", self.onLine)
+            self.attached = True
+
+    def onLine(self, stmt: Stmt) -> None:
+        # Statements run from the debugger prompt itself (e.g., value).
+        if self.context.debugMode:
+            return
+
+        token = stmt.start
+        depth = len(self.context.callStack)
+        match self.mode:
+            case "step":
+                stop = True
+            case "next":
+                stop = (depth <= self.targetDepth)
+            case "out":
+                stop = (depth < self.targetDepth)
+            case _:
+                stop = False
+        if stop or ((token.fileName, token.line) in self.context.breakpoints):
+            self.mode = None
+            breakpointStop(self.interpreter, self.interpreter.environment, 
+                           token, True).debugStart()
 
 class breakpointStop(Exception):
+    # token is the breakpoint() callee for breakpoint calls, or the first
+    # token of the statement about to run for line stops (atLine).
     def __init__(self, interpreter: Interpreter, environment: Environment, 
-                 expr: Expr.Call) -> None:
-        self.breakpoints = []
+                 token: Token, atLine: bool = False) -> None:
         self.interpreter = interpreter
+        self.context = interpreter.context
         self.environment = environment
         # Implementing them as dictionaries allows us to make easier match-case structures later.
         # Instructions -> Do X.
@@ -54,26 +100,62 @@ class breakpointStop(Exception):
                              "gl":  "globals"}
         self.commands = {"v":       "value",
                          "b":       "break"}
-        self.token = expr.callee.name
+        self.token = token
+        self.atLine = atLine
         self.quit = False # Continue debug prompt so long as this is false.
+        # Call depth of the code being debugged (the breakpoint() call itself
+        # is on the call stack for breakpoint calls).
+        self.depth = len(self.context.callStack) if atLine else len(self.context.callStack) - 1
+        # Set by step/next/out; None means run until the next breakpoint.
+        self.resumeMode: str | None = None
+        if self.context.tracer == None:
+            self.context.tracer = debugTracer(interpreter)
+        self.tracer: debugTracer = self.context.tracer
+
+    # Installed on the interpreter in place of lookUpVariable() during a debug session.
+    # Expressions typed at the prompt are not resolved, so names are
+    # looked up dynamically from the breakpoint's scope.
+    def debugLookUp(self, name: Token, expr: Expr.Variable) -> Any | None:
+        if name.lexeme in self.interpreter.builtins.values.keys():
+            return self.interpreter.builtins.get(name)
+        # Global user-defined functions can't be called,
+        # since they could themselves contain breakpoints,
+        # leading to very messy debugger problems.
+        return self.interpreter.environment.get(name)
 
     def debugStart(self) -> None:
         # Will turn off some features or specifications in our interpreter.
-        State.debugMode = True
-        if not State.inAFile:
+        self.context.debugMode = True
+        # The debugger prints directly, after the program's own output.
+        self.context.output.flush()
+        if not self.context.inAFile:
             print("No debug breakpoint option for command-line interpreter.")
             return
 
         fileName = self.token.fileName
-        file = State.fileLines[fileName]
-        line = self.token.line - 1
-        # To avoid wrap-around and printing lines from the end
-        # if a breakpoint is on the first line.
-        if line > 0:
+        file = self.context.fileLines[fileName]
+        if self.atLine:
+            # Line about to be executed.
+            line = self.token.line
             print(f'("{fileName}", {line}) ->\t{file[line - 1].lstrip()}')
         else:
-            print(f'("{fileName}", {line}) ->\t{file[line].lstrip()}')
+            line = self.token.line - 1
+            # To avoid wrap-around and printing lines from the end
+            # if a breakpoint is on the first line.
+            if line > 0:
+                print(f'("{fileName}", {line}) ->\t{file[line - 1].lstrip()}')
+            else:
+                print(f'("{fileName}", {line}) ->\t{file[line].lstrip()}')
 
+        self.interpreter.lookUpVariable = self.debugLookUp
+        try:
+            self.prompt()
+        finally:
+            self.interpreter.__dict__.pop("lookUpVariable", None)
+        self.tracer.resume(self.resumeMode, self.depth)
+        self.context.debugMode = False
+
+    def prompt(self) -> None:
         while not self.quit:
             print("(debug)", end = " ")
             # .strip() so the debugger doesn't choke on whitespace input.
@@ -96,18 +178,15 @@ class breakpointStop(Exception):
                     self.debugCommand(choice, arguments)
                 else:
                     print("Not a valid command/instruction. Type 'help' for a list of valid commands/instructions.")
-        State.debugMode = False
 
     def debugInstruction(self, choice: str) -> None:
         match choice:
             case "continue":
                 self.quit = True
                 return
-            case "step":
-                return
-            case "next":
-                return
-            case "out":
+            case "step" | "next" | "out":
+                self.resumeMode = choice
+                self.quit = True
                 return
             case "repl":
                 # Cannot be reset.
@@ -118,7 +197,7 @@ class breakpointStop(Exception):
             case "list":
                 line = self.token.line - 1
                 file = self.token.fileName
-                lines = State.fileLines[file]
+                lines = self.context.fileLines[file]
                 line -= 2
                 for i in range(0, 5):
                     if (line < 0) or (line >= len(lines)):
@@ -127,10 +206,14 @@ class breakpointStop(Exception):
                     print(lines[line])
                     line += 1
             case "stack":
-                for func in State.callStack:
+                # Most recent call first.
+                for func in reversed(self.context.callStack):
                     print(f"(\"{func["file"]}\", {func["line"]}): {func["name"]}")
             case "log":
-                for func in State.traceLog:
+                if not self.context.traceLog.enabled():
+                    print("Trace-log is disabled.")
+                    return
+                for func in self.context.traceLog:
                     print(f"(\"{func["file"]}\", {func["line"]}): {func["name"]}")
             case "help":
                 self.displayHelp()
@@ -138,14 +221,18 @@ class breakpointStop(Exception):
                 variables = self.environment.values
                 print("Objects in current scope:")
                 for var in variables:
-                    value = self.interpreter.stringify(variables[var])
-                    print(f"{var}: {value}")
+                    value = variables[var]
+                    if type(value) in (LazyBinding, ModuleBinding):
+                        value = value.force()
+                    print(f"{var}: {self.interpreter.stringify(value)}")
             case "globals":
                 variables = self.interpreter.globals.values
                 print("Objects in global scope:")
                 for var in variables:
-                    value = self.interpreter.stringify(variables[var])
-                    print(f"{var}: {value}")
+                    value = variables[var]
+                    if type(value) in (LazyBinding, ModuleBinding):
+                        value = value.force()
+                    print(f"{var}: {self.interpreter.stringify(value)}")
     
     def displayHelp(self) -> None:
         print(
@@ -154,11 +241,12 @@ class breakpointStop(Exception):
         c(ontinue)  - Exit debugger and continue execution until breakpoint, error, or end is reached.
         s(tep)      - Go to the next line, and enter the function if it is a function call.
         n(ext)      - Go to the next line, and evaluate (but do not enter) the function if it is a function call.
+        o(ut)       - Finish the current function and stop at the next line after its call.
         r(epl)      - End debug session and file execution and open a prompt shell.
         q(uit)      - Exit the debugger and conclude all code execution.
         l(ist)      - Display lines surrounding current breakpoint.
         st(ack)     - Display call-stack.
-        log         - Display trace-log for the file up until the current breakpoint.
+        log         - Display trace-log (most recent calls first) up until the current breakpoint.
         loc(als)    - Display all the variables/objects declared in the current scope.
         gl(obals)   - Display all the variables/objects declared in the global scope.
 
@@ -195,13 +283,13 @@ Available instructions:
             try:
                 from Scanner import Scanner
                 from Parser import Parser
-                tokens = Scanner(f"print {arguments[1]};", None).scanTokens()
-                if State.debugError:
-                    State.debugError = False # Reset.
+                tokens = Scanner(f"print {arguments[1]};", None, self.context).scanTokens()
+                if self.context.debugError:
+                    self.context.debugError = False # Reset.
                     return
-                statements = Parser(tokens).parse()
-                if State.debugError:
-                    State.debugError = False
+                statements = Parser(tokens, self.context).parse()
+                if self.context.debugError:
+                    self.context.debugError = False
                     return
 
                 self.interpreter.environment = self.interpreter.globals
@@ -214,13 +302,13 @@ Available instructions:
             try:
                 from Scanner import Scanner
                 from Parser import Parser
-                tokens = Scanner(f"print {arguments[1]};", None).scanTokens()
-                if State.debugError:
-                    State.debugError = False
+                tokens = Scanner(f"print {arguments[1]};", None, self.context).scanTokens()
+                if self.context.debugError:
+                    self.context.debugError = False
                     return
-                statements = Parser(tokens).parse()
-                if State.debugError:
-                    State.debugError = False
+                statements = Parser(tokens, self.context).parse()
+                if self.context.debugError:
+                    self.context.debugError = False
                     return
 
                 self.interpreter.environment = self.environment
@@ -236,7 +324,7 @@ Available instructions:
             if line.isdigit():
                 line = int(line)
                 if self.token.line <= line:
-                    State.breakpoints.append(line)
+                    self.context.breakpoints.add((self.token.fileName, line))
                 else:
                     if len(arguments) == 1:
                         print("Line has been passed.")
@@ -259,6 +347,7 @@ class replDebugger():
 
     def __init__(self, interpreter: Interpreter) -> None:
         self.interpreter = interpreter
+        self.context = interpreter.context
         self.instructions = {}
         self.commands = {}
         self.watches: list[Expr] = []
@@ -266,7 +355,7 @@ class replDebugger():
         self.exit = False
 
     def runDebugger(self) -> None:
-        State.replDebug = True
+        self.context.replDebug = True
         
         while not self.exit:
             print("(ldb)", end = " ")
@@ -278,4 +367,4 @@ class replDebugger():
                 choice = prompt[0].strip()
                 arguments = [x.strip() for x in prompt[1:]]
             
-        State.replDebug = False
\ No newline at end of file
+        self.context.replDebug = False
\ No newline at end of file
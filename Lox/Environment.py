@@ -3,6 +3,7 @@ from typing import Any
 
 from Token import Token
 from Error import RuntimeError
+from LoxModule import LazyBinding, ModuleBinding
 
 class Environment:
     def __init__(self, enclosing: Environment | None = None) -> None:
@@ -13,6 +14,13 @@ class Environment:
     def get(self, name: Token) -> Any | None:
         if name.lexeme in self.values.keys():
             value = self.values.get(name.lexeme)
+            # Library class or function that is defined on first use.
+            if type(value) == LazyBinding:
+                value = value.force()
+                self.values[name.lexeme] = value
+            # Name imported from a module (kept in the module's environment).
+            elif type(value) == ModuleBinding:
+                value = value.force()
             # Tuple-type value -> variable is uninitialized.
             if type(value) != tuple:
                 return value
@@ -28,6 +36,10 @@ class Environment:
         if name.lexeme in self.values.keys():
             if self.access[name.lexeme] == "FIX":
                 raise RuntimeError(name, f"Fixed variable '{name.lexeme}' cannot be re-assigned.")
+            binding = self.values[name.lexeme]
+            if type(binding) == ModuleBinding:
+                binding.environment.assign(name, value)
+                return
             self.values[name.lexeme] = value
             return
         
@@ -6,12 +6,13 @@ from Token import Token
 
 if TYPE_CHECKING:
     from Interpreter import Interpreter
+    from LoxContext import LoxContext
     from LoxInstance import LoxInstance
 
 class BaseError(Exception):
-    def show(self) -> None:
+    def show(self, context: LoxContext) -> None:
         from LoxMain import error
-        error(self)
+        error(context, self)
 
 class ScanError(BaseError):
     def __init__(self, line: int, column: int, file: str, message: str) -> None:
@@ -53,6 +54,10 @@ class Return(Exception):
 class StopError(Exception):
     pass
 
+# Raised by the debugger to switch from running a file to the REPL.
+class CLISwitch(Exception):
+    pass
+
 class UserError(Exception):
     def __init__(self, error: LoxInstance, expression: Expr) -> None:
         self.error = error
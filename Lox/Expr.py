@@ -10,6 +10,8 @@ class Expr:
 			return visitor.visitAccessExpr(self)
 
 	class Assign:
+		depth = None
+
 		def __init__(self, name, equals, value):
 			self.name = name
 			self.equals = equals
@@ -45,6 +47,8 @@ class Expr:
 			return visitor.visitCommaExpr(self)
 
 	class Get:
+		cache = None
+
 		def __init__(self, object, name):
 			self.object = object
 			self.name = name
@@ -102,6 +106,8 @@ class Expr:
 			return visitor.visitModifyExpr(self)
 
 	class Set:
+		cache = None
+
 		def __init__(self, object, name, value, visibility):
 			self.object = object
 			self.name = name
@@ -112,6 +118,8 @@ class Expr:
 			return visitor.visitSetExpr(self)
 
 	class Super:
+		depth = None
+
 		def __init__(self, keyword, method):
 			self.keyword = keyword
 			self.method = method
@@ -129,6 +137,8 @@ class Expr:
 			return visitor.visitTernaryExpr(self)
 
 	class This:
+		depth = None
+
 		def __init__(self, keyword):
 			self.keyword = keyword
 
@@ -144,6 +154,8 @@ class Expr:
 			return visitor.visitUnaryExpr(self)
 
 	class Variable:
+		depth = None
+
 		def __init__(self, name):
 			self.name = name
 
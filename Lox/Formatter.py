@@ -0,0 +1,101 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+
+from List import List
+from LoxCallable import LoxCallable
+from LoxGroup import LoxGroup
+from LoxInstance import LoxInstance
+from Reference import Reference
+from String import String
+
+if TYPE_CHECKING:
+    from Interpreter import Interpreter
+
+class Formatter:
+    '''
+    Turns Lox values into the text shown by print, string(), etc.
+    Nested lists are walked iteratively (with an explicit stack) and written
+    into a single buffer, so printing large or deeply nested lists is linear
+    and does not recurse.
+    A list containing itself is written as [...].
+    Each interpreter has its own (interpreter.formatter), as _str methods
+    run in its globals and print to its output.
+    '''
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+
+    def format(self, object: Any) -> str:
+        if type(object) == list:
+            object = List(object)
+        if type(object) != List:
+            return self.formatValue(object)
+
+        buffer: list[str] = ["["]
+        # Lists being written (for self-reference detection).
+        active = {id(object.array)}
+        # Each entry: a list being written and the index of its next element.
+        stack = [[object.array, 0]]
+        while len(stack) != 0:
+            entry = stack[-1]
+            array, index = entry
+            if index == len(array):
+                stack.pop()
+                active.discard(id(array))
+                buffer.append("]")
+                continue
+            entry[1] = index + 1
+            if index != 0:
+                buffer.append(", ")
+
+            element = array[index]
+            if type(element) == list:
+                element = List(element)
+            if type(element) == List:
+                if id(element.array) in active:
+                    buffer.append("[...]")
+                else:
+                    buffer.append("[")
+                    active.add(id(element.array))
+                    stack.append([element.array, 0])
+            elif type(element) == String:
+                # Strings inside lists are quoted.
+                buffer.append("\"")
+                buffer.append(element.text)
+                buffer.append("\"")
+            else:
+                buffer.append(self.formatValue(element))
+
+        return "".join(buffer)
+
+    # Any value other than a list.
+    def formatValue(self, object: Any) -> str:
+        if object == None:
+            return "nil"
+
+        if isinstance(object, LoxCallable):
+            return object.toString()
+        if type(object) == LoxInstance:
+            # _str methods return a String.
+            return str(object.toString(self.interpreter))
+        if type(object) == LoxGroup:
+            return object.toString()
+        if type(object) == Reference:
+            return "<" + self.interpreter.varType(object) + ">"
+
+        # Booleans in Lox are all-lowercase, unlike in Python.
+        if type(object) == bool:
+            if object == True:
+                return "true"
+            else:
+                return "false"
+
+        # The built-in Python str() function can convert objects of almost any data-type,
+        # so we only interfere with it if we wish to have some particular formatted output.
+        text = str(object)
+
+        if type(object) == float:
+            if text[-2:] == ".0":
+                text = text[:-2]
+
+        return text
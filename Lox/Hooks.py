@@ -0,0 +1,70 @@
+from __future__ import annotations
+from typing import Any, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Interpreter import Interpreter
+
+'''
+Execution events that tools (debugger, profilers, coverage, etc.) can register with.
+Events and the arguments passed to their hooks:
+- call(expr)                - Before a call expression is evaluated.
+- return(expr, value)       - After a call expression has produced a value.
+- line(stmt)                - Before a statement (with a known position) is executed.
+- exception(expr, error)    - When a Lox error propagates out of a call expression.
+- error(stmt, error)        - When a Lox error outside of any call expression stops execution
+                              (stmt is the top-level statement it was raised in).
+
+The interpreter only runs its traced methods while at least one hook is registered
+for the relevant events. Otherwise, the regular (uninstrumented) methods are used,
+so having the hook bus costs nothing when no tool is attached.
+'''
+
+events = ["call", "return", "line", "exception", "error"]
+
+class HookBus:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        self.hooks: dict[str, list[Callable[..., Any]]] = {event: [] for event in events}
+        # The last error that propagated out of a call expression (already passed to
+        # "exception" hooks, so not an "error" event).
+        self.callError: BaseException | None = None
+
+    def register(self, event: str, hook: Callable[..., Any]) -> None:
+        if event not in self.hooks.keys():
+            raise ValueError(f"Unknown execution event '{event}'.")
+        self.hooks[event].append(hook)
+        self.refresh()
+
+    def unregister(self, event: str, hook: Callable[..., Any]) -> None:
+        if hook in self.hooks.get(event, []):
+            self.hooks[event].remove(hook)
+        self.refresh()
+
+    def active(self) -> bool:
+        for hooks in self.hooks.values():
+            if len(hooks) != 0:
+                return True
+        return False
+
+    def emit(self, event: str, *args: Any) -> None:
+        # Copy so hooks can unregister themselves while being run.
+        for hook in list(self.hooks[event]):
+            hook(*args)
+
+    def refresh(self) -> None:
+        # The traced methods are installed as instance attributes, which
+        # shadow the regular class methods (statements and expressions dispatch
+        # through attribute lookup on the interpreter). Removing them restores
+        # the regular methods.
+        interpreter = self.interpreter
+        if len(self.hooks["line"]) != 0:
+            interpreter.execute = interpreter.tracedExecute
+        else:
+            interpreter.__dict__.pop("execute", None)
+
+        # Call expressions are also traced for "error" hooks, to tell errors inside calls apart.
+        callEvents = ("call", "return", "exception", "error")
+        if any(len(self.hooks[event]) != 0 for event in callEvents):
+            interpreter.visitCallExpr = interpreter.tracedCallExpr
+        else:
+            interpreter.__dict__.pop("visitCallExpr", None)
@@ -2,84 +2,118 @@ from typing import Any, Mapping, NoReturn, Protocol, Sequence
 
 from BuiltinFunction import BuiltinFunction
 import copy
-from Debug import CLISwitch
 from Environment import Environment
-from Error import RuntimeError, BreakError, ContinueError, Return, StopError, UserError
+from Error import RuntimeError, BreakError, CLISwitch, ContinueError, Return, StopError, UserError
 from Expr import Expr
+from Formatter import Formatter
+from Hooks import HookBus
+from ByteBuffer import ByteBuffer, initBytes
 from List import List, initList
+from LineStream import LineStream
 from LoxCallable import LoxCallable
 from LoxClass import LoxClass
+from LoxContext import LoxContext
 from LoxFunction import LoxFunction
 from LoxGroup import LoxGroup
-from LoxInstance import LoxInstance, InstanceFunction
+from LoxInstance import LoxInstance, InstanceFunction, instanceFunctions
+from LoxModule import LoxModule, LazyBinding, ModuleBinding
 from Reference import Reference
-import State
+from Scheduler import LoxTask
 from Stmt import Stmt
 from String import String
 import sys
 from Token import Token, TokenType
 from Warning import UserWarning
 
+# Top-level statements that only define things (sent to worker processes).
+declarationTypes = (Stmt.Function, Stmt.Class, Stmt.Group, Stmt.Fetch)
+
 class StmtHasAccept(Protocol):
     def accept(self, visitor) -> None: ...
 
 class Interpreter:
-    def __init__(self) -> None:
+    def __init__(self, context: LoxContext) -> None:
+        # State of the run this interpreter belongs to.
+        self.context = context
+        context.interpreter = self
         self.globals = Environment()
         self.environment = self.globals
         self.loopLevel = 0
-        self.locals: dict[Expr.Variable, int] = {}
         self.ExprStmt = False
+        # Execution events for the debugger and other tools.
+        self.hooks = HookBus(self)
+        # Turns values into printed text.
+        self.formatter = Formatter(self)
+        # The program's top-level declarations run so far, in order (used as an ordered set).
+        # Worker processes (see WorkerPool.py) run these to define the same functions.
+        self.declarations: dict[Stmt, None] = {}
 
         # Setting up built-in functions in global scope.
         from BuiltinFunction import builtinSetUp
-        builtinSetUp()
-        from BuiltinFunction import builtins
-        # Setting up the List() constructor.
-        builtins.define("List", initList, "VAR")
-        self.builtins = builtins
+        self.builtins = builtinSetUp()
+        # Setting up the List() and Bytes() constructors.
+        self.builtins.define("List", initList, "VAR")
+        self.builtins.define("Bytes", initBytes, "VAR")
 
     def interpret(self, statements: Sequence[StmtHasAccept]) -> None:
         # Have to place this here instead of constructor since
-        # the constructor runs globally before main() can set 
-        # up State.argv, so we (incorrectly) end up with an 
+        # the interpreter can be created before main() sets up 
+        # the context's argv, so we would (incorrectly) end up with an 
         # empty argv list.
         from CommandLine import argvSetUp
-        self.globals.define("cl", argvSetUp(), "FIX")
+        self.globals.define("cl", argvSetUp(self.context.argv), "FIX")
+        self.interpretMore(statements)
 
+    # Runs more statements in the same program (without resetting the "cl" group),
+    # e.g., the body of a streaming-mode script for each input line.
+    # Returns False if execution was stopped (by an error, a halting user error, etc.).
+    def interpretMore(self, statements: Sequence[StmtHasAccept]) -> bool:
         try:
             for statement in statements:
+                if type(statement) in declarationTypes:
+                    self.declarations[statement] = None
                 try:
                     self.execute(statement)
                 except UserError as exception:
                     exception.show(self)
-                    if exception.error.private["halt"] == True:
-                        return
+                    if exception.error.field("halt") == True:
+                        return False
                 except UserWarning as warning:
                     warning.show(self)
         except RecursionError:
-            sys.stderr.write("Recursion error: Recursion limit exceeded.\n")
-            return
+            self.context.output.error("Recursion error: Recursion limit exceeded.\n")
+            return False
         except RuntimeError as error: # Stops all execution.
-            error.show()
+            if error is not self.hooks.callError:
+                self.hooks.emit("error", statement, error)
+            self.hooks.callError = None
+            error.show(self.context)
+            return False
         except StopError:
-            return
+            return False
         except CLISwitch:
-            State.switchCLI = True
-            return
+            self.context.switchCLI = True
+            return False
+        return True
     
+    # The depth is kept on the expression node itself.
     def resolve(self, expr: Expr.Variable, depth: int) -> None:
-        self.locals[expr] = depth
+        expr.depth = depth
     
     def execute(self, stmt: StmtHasAccept) -> None:
         stmt.accept(self)
+
+    # Used in place of execute() while "line" hooks are registered.
+    def tracedExecute(self, stmt: Stmt) -> None:
+        # Blocks only group statements; their contents get their own events.
+        if (stmt.start != None) and (type(stmt) != Stmt.Block):
+            self.hooks.emit("line", stmt)
+        stmt.accept(self)
     
     def executeBlock(self, statements: list[StmtHasAccept], environment: Environment) -> None:
         previous = self.environment
-        currentCallStack = State.callStack
         try:
             self.environment = environment
-            State.callStack = copy.deepcopy(State.callStack)
 
             for statement in statements:
                 try:
@@ -88,7 +122,6 @@ class Interpreter:
                     warning.show(self)
         finally:
             self.environment = previous
-            State.callStack = currentCallStack
 
     # No need to check that 'break' or 'continue' are inside a loop, since their presence outside one 
     # raises a Parse Error (before the interpreter phase).
@@ -147,17 +180,14 @@ class Interpreter:
         for method in klass.public.values():
             method.context["class"] = klass
         
-        public["_fieldList"] = InstanceFunction("_fieldList")
-        public["_methodList"] = InstanceFunction("_methodList")
-        public["_fields"] = InstanceFunction("_fields")
-        public["_methods"] = InstanceFunction("_methods")
+        public.update(instanceFunctions)
 
         if stmt.superclass != None:
             self.environment = self.environment.enclosing
 
         self.environment.assign(stmt.name, klass)
 
-        classInit = metaclass.findMethod("init")
+        classInit = metaclass.findMethod("init", None, self.context)
         if classInit != None:
             if classInit.arity() != [0,0]:
                 raise RuntimeError(classInit.declaration.name, 
@@ -235,22 +265,40 @@ class Interpreter:
         name = stmt.name.lexeme[1:-1]
         match mode:
             case "Mod":
-                try:
-                    import os
-                    from importlib import import_module
-                    sys.path.append(os.getcwd() + "/Modules")
-                    module = import_module(f"{name}")
-                    setUp = getattr(module, f"{name}SetUp")
-                    setUp()
-                    env = getattr(module, name)
-                    self.environment.values.update(env.values)
-                    sys.path.pop()
-                except ModuleNotFoundError:
+                from NativeModule import nativeModule
+                environment = nativeModule(name)
+                if environment == None:
                     raise RuntimeError(stmt.name, "Module not found.")
-            case "Lib":
-                pass
-            case "File":
-                pass
+                for name, value in environment.values.items():
+                    self.environment.define(name, value, environment.access[name])
+            case "Lib" | "File":
+                module = stmt.module
+                # Run the module the first time it is fetched.
+                environment = self.context.moduleEnvironments.get(module.path, None)
+                if environment == None:
+                    self.executeModule(module)
+                    environment = self.context.moduleEnvironments[module.path]
+                # The names stay bound in the module's environment.
+                for name, value in environment.values.items():
+                    if type(value) != ModuleBinding: # Not itself imported from another module.
+                        value = ModuleBinding(environment, name)
+                    self.environment.define(name, value, environment.access[name])
+
+    # Runs a module's top-level statements in a new environment.
+    # Classes and functions are only defined when first looked up 
+    # (classes with a class initializer run code when defined, so they are not deferred).
+    def executeModule(self, module: LoxModule) -> None:
+        environment = Environment(self.globals)
+        self.context.moduleEnvironments[module.path] = environment
+        for statement in module.statements:
+            deferred = (type(statement) == Stmt.Function)
+            if type(statement) == Stmt.Class:
+                deferred = all(method.name.lexeme != "init" for method in statement.classMethods)
+            if deferred:
+                environment.define(statement.name.lexeme, 
+                                   LazyBinding(self, statement, environment), "VAR")
+            else:
+                self.executeBlock([statement], environment)
 
     def visitFunctionStmt(self, stmt: Stmt.Function) -> None:
         # Check that function is not an unassigned lambda (do nothing if it is).
@@ -334,7 +382,7 @@ class Interpreter:
         # No return value -> implicitly return None -> prints "nil".
         if (self.ExprStmt) and (type(value) == tuple):
             return
-        print(self.stringify(value))
+        self.context.output.write(self.stringify(value) + "\n")
 
     def reportClassHelper(self, klass: LoxClass) -> tuple:
         if klass.name == "Error":
@@ -375,7 +423,8 @@ class Interpreter:
         # Only return if declaration is for a static variable
         # and function has already run once.
         if stmt.static:
-            if (State.currentFunction != None) and (State.currentFunction.count > 0):
+            currentFunction = self.context.currentFunction
+            if (currentFunction != None) and (currentFunction.count > 0):
                 return
 
         # Default value will be an empty tuple.
@@ -392,7 +441,6 @@ class Interpreter:
             value = value.object
 
         elif type(value) == String:
-            import copy
             value = copy.deepcopy(value)
 
         if type(value) == List:
@@ -405,7 +453,7 @@ class Interpreter:
             # currentFunction cannot be None, since we raise a parse
             # error if a static variable declaration is outside of
             # a function.
-            State.currentFunction.statics[stmt.name.lexeme] = value
+            self.context.currentFunction.statics[stmt.name.lexeme] = value
 
     def visitWhileStmt(self, stmt: Stmt.While) -> None:
         self.loopLevel += 1
@@ -435,9 +483,6 @@ class Interpreter:
         raise RuntimeError(operator, "Operands must be numbers.")
     
     def varType(self, object) -> str:
-        # To check if variable holds a datetime.time 
-        # object (return value of clock()).
-        from datetime import time
         match object:
             case float(): # No check for int() since all values in Lox are saved as floats/doubles.
                 return "number"
@@ -449,10 +494,16 @@ class Interpreter:
                 return "boolean"
             case bytes():
                 return "bytes"
+            case ByteBuffer():
+                return "bytes"
             case list(): # In case an internal function passes an actual list.
                 return "list"
             case List():
                 return "list"
+            case LineStream():
+                return "stream"
+            case LoxTask():
+                return "task"
             case Reference():
                 return self.varType(object.object) + " reference"
             case LoxFunction():
@@ -464,7 +515,9 @@ class Interpreter:
                 return "native function"
             case InstanceFunction():
                 return "native method"
-            case _ if isinstance(object, time): # Format to check Boolean conditions in match-case structure.
+            # datetime.time object (return value of clock()).
+            # datetime is only imported once clock() has been called.
+            case _ if ("datetime" in sys.modules) and isinstance(object, sys.modules["datetime"].time):
                 return "datetime"
             case _ if isinstance(object, LoxClass):
                 return "class"
@@ -485,47 +538,10 @@ class Interpreter:
         return True
     
     def stringify(self, object) -> str:
-        if object == None:
-            return "nil"
-        
-        if isinstance(object, LoxCallable):
-            return object.toString()
-        if type(object) == LoxInstance:
-            return object.toString(self)
-        if type(object) == LoxGroup:
-            return object.toString()
-        if type(object) == list:
-            return str(List(object))
-        if type(object) == Reference:
-            return "<" + self.varType(object) + ">"
-        
-        # Booleans in Lox are all-lowercase, unlike in Python.
-        if type(object) == bool:
-            if object == True:
-                return "true"
-            else:
-                return "false"
-        
-        # The built-in Python print() function can print objects of almost any data-type,
-        # so we only interfere with it if we wish to have some particular formatted output.
-        text = str(object)
-
-        if type(object) == float:
-            if text[-2:] == ".0":
-                text = text[:-2]
-
-        return text
+        return self.formatter.format(object)
     
     def lookUpVariable(self, name: Token, expr: Expr.Variable) -> Any | None:
-        if State.debugMode:
-            if name.lexeme in self.builtins.values.keys():
-                return self.builtins.get(name)
-            # Global user-defined functions can't be called,
-            # since they could themselves contain breakpoints,
-            # leading to very messy debugger problems.
-            return self.environment.get(name)
-
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         if distance != None:
             value = self.environment.getAt(distance, name)
             return value
@@ -569,6 +585,8 @@ class Interpreter:
             object = object.text
         elif type(object) == List:
             object = object.array
+        elif type(object) == ByteBuffer:
+            object = object.view
         if self.checkIndices(expr, object, start, end):
             if end == None: # Only accessing a single element.
                 return object[int(start)]
@@ -582,6 +600,9 @@ class Interpreter:
         if (type(left) == float) and (type(right) == float):
             return (float(left) + float(right))
         
+        if (type(left) == ByteBuffer) and (type(right) == ByteBuffer):
+            return ByteBuffer(bytearray(left.view) + right.view)
+        
         if (type(left) == str) and (type(right) == str):
             return String(str(left) + str(right))
         
@@ -663,8 +684,8 @@ class Interpreter:
             funcData = {"name": name,
                         "file": token.fileName,
                         "line": token.line}
-        State.callStack.insert(0, funcData)
-        State.traceLog.insert(0, funcData)
+        self.context.callStack.append(funcData)
+        self.context.traceLog.record(funcData)
     
     def modifyString(self, mod: String, value: Any, expr: Expr.Modify) -> None:
         start = self.evaluate(expr.part.start)
@@ -711,6 +732,28 @@ class Interpreter:
                 value = value.array
                 mod.array[int(start) : int(end) + 1] = value
     
+    def modifyBytes(self, mod: ByteBuffer, value: Any, expr: Expr.Modify) -> None:
+        start = self.evaluate(expr.part.start)
+        end = None
+        if expr.part.end != None:
+            end = self.evaluate(expr.part.end)
+
+        if mod.view.readonly:
+            raise RuntimeError(expr.operator, "Bytes are read-only.")
+        if self.checkIndices(expr, mod.view, start, end):
+            if end == None:
+                if (type(value) != float) or not (0 <= value < 256) or (int(value) != value):
+                    raise RuntimeError(expr.operator, "A byte must be an integer from 0 to 255.")
+                mod.view[int(start)] = int(value)
+            else:
+                if type(value) != ByteBuffer:
+                    raise RuntimeError(expr.operator, "Can only assign bytes to bytes part.")
+                # Bytes cannot change size through a view, so the lengths must match.
+                part = mod.view[int(start) : int(end) + 1]
+                if len(part) != len(value.view):
+                    raise RuntimeError(expr.operator, "Assigned bytes must have the same length as the part.")
+                part[:] = value.view
+
     def evaluate(self, expr: Expr) -> Any:
         return expr.accept(self)
     
@@ -733,6 +776,14 @@ class Interpreter:
             if type(output) == list:
                 return List(output)
             return output
+        elif type(object) == ByteBuffer:
+            output = self.accessElements(object, start, end, expr)
+            if type(output) == memoryview:
+                # A view of the same memory (not a copy).
+                return ByteBuffer(output)
+            return float(output)
+        elif (type(object) == LineStream) and (end == None):
+            return object.at(start, expr.operator)
         else:
             raise RuntimeError(expr.operator, "Member access only for strings and lists.")
 
@@ -741,18 +792,18 @@ class Interpreter:
         if type(value) == Reference:
             value = value.object
         elif (type(value) == List) or (type(value) == String):
-            import copy
             value = copy.deepcopy(value)
 
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         if distance != None:
             self.environment.assignAt(distance, expr.name, value)
 
-            if State.currentFunction != None:
+            currentFunction = self.context.currentFunction
+            if currentFunction != None:
                 # Make sure this is a static variable.
                 # Assignments don't indicate this, unlike declarations.
-                if expr.name.lexeme in State.currentFunction.statics.keys():
-                    State.currentFunction.statics[expr.name.lexeme] = value
+                if expr.name.lexeme in currentFunction.statics.keys():
+                    currentFunction.statics[expr.name.lexeme] = value
         else:
             self.globals.assign(expr.name, value)
         return value
@@ -845,7 +896,6 @@ class Interpreter:
             value = self.evaluate(argument)
             if (type(value) == List) or (type(value) == String):
                 if (type(callee) != BuiltinFunction) or (callee.mode != "reference"):
-                    import copy
                     value = copy.deepcopy(value)
             if type(value) == Reference:
                 if (type(callee) != BuiltinFunction) or (callee.mode != "type"):
@@ -855,8 +905,6 @@ class Interpreter:
         if not isinstance(callee, LoxCallable):
             raise RuntimeError(expr.leftParen, "No such function or class.")
 
-        self.manageStack(expr, callee)
-        
         arity = callee.arity()
         if (len(arguments) < arity[0]):
             if arity[0] == 1: # To make argument singular rather than plural (plural for 0 as well).
@@ -872,8 +920,29 @@ class Interpreter:
             else:
                 raise RuntimeError(expr.rightParen, 
                                f"Expected maximum {arity[1]} arguments but got {len(arguments)}.")
-        
-        return callee.call(self, expr, arguments)
+
+        self.manageStack(expr, callee)
+        try:
+            return callee.call(self, expr, arguments)
+        finally:
+            self.context.callStack.pop()
+
+    # Used in place of visitCallExpr() while "call", "return",
+    # "exception" or "error" hooks are registered.
+    def tracedCallExpr(self, expr: Expr.Call) -> Any:
+        self.hooks.emit("call", expr)
+        value = None
+        try:
+            value = Interpreter.visitCallExpr(self, expr)
+            return value
+        except (RuntimeError, UserError, UserWarning) as error:
+            self.hooks.callError = error
+            self.hooks.emit("exception", expr, error)
+            raise
+        finally:
+            # Every "call" event is matched by a "return" event,
+            # even when the call is left through an exception.
+            self.hooks.emit("return", expr, value)
 
     def visitCommaExpr(self, expr: Expr.Comma) -> Any:
         expressions = expr.expressions
@@ -885,14 +954,28 @@ class Interpreter:
     
     def visitGetExpr(self, expr: Expr.Get) -> Any | None:
         object = self.evaluate(expr.object)
-        if (isinstance(object, LoxInstance)) or (type(object) == List):
+        # Inline cache: the last instance shape seen at this site, and the slot
+        # of the (public) field read from it.
+        cache = expr.cache
+        if (type(object) == LoxInstance) and (cache != None) and (object.shape is cache[0]):
+            result = object.values[cache[1]]
+        elif isinstance(object, LoxInstance):
+            result = object.get(expr.name, self.context)
+            if type(object) == LoxInstance:
+                slot = object.shape.fields.get(expr.name.lexeme, None)
+                if (slot != None) and (slot[1] == "public"):
+                    expr.cache = (object.shape, slot[0])
+        elif type(object) == List:
             result = object.get(expr.name)
-            if isinstance(result, LoxFunction) and result.isGetter():
-                result = result.call(self, None, None)
-            
-            return result
+        elif type(object) in (LineStream, ByteBuffer):
+            result = object.get(expr.name)
+        else:
+            raise RuntimeError(expr.name, "Only instances have properties.")
+        
+        if isinstance(result, LoxFunction) and result.isGetter():
+            result = result.call(self, None, None)
         
-        raise RuntimeError(expr.name, "Only instances have properties.")
+        return result
 
     def visitGroupingExpr(self, expr: Expr.Grouping) -> Any:
         return self.evaluate(expr.expression)
@@ -946,7 +1029,7 @@ class Interpreter:
         if objType not in validObjTypes:
             raise RuntimeError(expr.operator, "Left-hand value not modifiable.")
         mod = self.evaluate(expr.part.object)
-        if (type(mod) != String) and (type(mod) != List):
+        if type(mod) not in (String, List, ByteBuffer):
             raise RuntimeError(expr.operator, "Left-hand value not modifiable.")
 
         if type(mod) == String:
@@ -954,6 +1037,9 @@ class Interpreter:
 
         elif type(mod) == List:
             self.modifyList(mod, value, expr)
+
+        elif type(mod) == ByteBuffer:
+            self.modifyBytes(mod, value, expr)
         return value
     
     def visitSetExpr(self, expr: Expr.Set) -> Any | None:
@@ -962,22 +1048,31 @@ class Interpreter:
         if (isinstance(object, LoxInstance)):
             value = self.evaluate(expr.value)
             if type(value) == List:
-                import copy
                 value = copy.deepcopy(value)
-            object.set(expr.name, value, expr.visibility)
+            # Inline cache, as for Get expressions.
+            cache = expr.cache
+            if (type(object) == LoxInstance) and (cache != None) \
+                    and (object.shape is cache[0]) and (expr.visibility == "public"):
+                object.values[cache[1]] = value
+                return value
+            object.set(expr.name, value, expr.visibility, self.context)
+            if type(object) == LoxInstance:
+                slot = object.shape.fields.get(expr.name.lexeme, None)
+                if (slot != None) and (slot[1] == "public"):
+                    expr.cache = (object.shape, slot[0])
             return value
         
         raise RuntimeError(expr.name, "Only instances have modifiable fields.")
 
     def visitSuperExpr(self, expr: Expr.Super) -> Any | None:
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         dummySuper = Token(TokenType.SUPER, "super", "super",
                            0, 0, None)
         dummyThis = Token(TokenType.THIS, "this", "this",
                           0, 0, None)
         superclass = self.environment.getAt(distance, dummySuper)
         object = self.environment.getAt(distance - 1, dummyThis)
-        method = superclass.findMethod(expr.method.lexeme, expr.method)
+        method = superclass.findMethod(expr.method.lexeme, expr.method, self.context)
 
         if method == None:
             raise RuntimeError(expr.method, 
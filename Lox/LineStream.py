@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import Any, Iterator, TextIO, TYPE_CHECKING
+
+from Error import RuntimeError
+from List import List
+from LoxCallable import LoxCallable, NativeCallable
+from String import String
+
+if TYPE_CHECKING:
+    from Expr import Expr
+    from Interpreter import Interpreter
+    from Token import Token
+
+# Yields the lines of a text file (without their line endings).
+# Iterating over a file reads it a chunk at a time (as large as the file's buffer),
+# and returns data from pipes and terminals as soon as it arrives.
+def readLines(file: TextIO) -> Iterator[str]:
+    for line in file:
+        if line[-1] == "\n":
+            yield line[:-1]
+        else:
+            yield line
+
+class StreamFunction(NativeCallable):
+    # Each method gets the stream it is called on as self.instance.
+
+    # Returns a stream of the results of some operation on each element.
+    def s_transform(self, interpreter: Interpreter, expr: Expr.Call,
+                    mapping: Any) -> LineStream:
+        if not isinstance(mapping, LoxCallable):
+            raise RuntimeError(expr.rightParen, "transform() only accepts function arguments.")
+        def generate():
+            for element in self.instance.rest():
+                value = mapping.call(interpreter, expr, [element])
+                if type(value) == tuple:
+                    raise RuntimeError(expr.rightParen, "Function argument must return a value.")
+                yield value
+        return LineStream(generate())
+
+    # Returns a stream of only the elements satisfying some predicate.
+    def s_filter(self, interpreter: Interpreter, expr: Expr.Call,
+                 condition: Any) -> LineStream:
+        if not isinstance(condition, LoxCallable):
+            raise RuntimeError(expr.rightParen, "filter() only accepts function arguments.")
+        def generate():
+            for element in self.instance.rest():
+                predicate = condition.call(interpreter, expr, [element])
+                if predicate == True:
+                    yield element
+                elif predicate != False:
+                    raise RuntimeError(expr.rightParen, "Function argument must return a Boolean value.")
+        return LineStream(generate())
+
+    # Reads the rest of the stream into a list.
+    def s_collect(self, interpreter: Interpreter, expr: Expr.Call) -> List:
+        return List(list(self.instance.rest()))
+
+    def toString(self) -> str:
+        return "<stream method>"
+
+# Name, implementation, arity.
+methods: dict[str, StreamFunction] = {}
+for name, implementation, arity in (("transform", StreamFunction.s_transform, [1,1]),
+                                    ("filter", StreamFunction.s_filter, [1,1]),
+                                    ("collect", StreamFunction.s_collect, [0,0])):
+    methods[name] = StreamFunction(name, implementation, arity)
+
+class LineStream:
+    '''
+    A sequence whose elements (e.g., the lines of a file or of stdin) are only
+    read when they are reached, so only one of them is held at a time.
+    It can be iterated over with a range-for loop, which reads it through
+    indexing and length() in order: stream[i] is the current element or the next
+    one, and length() counts the elements read so far, plus one if there is another.
+    transform() and filter() give new streams (also read lazily), and collect()
+    reads the rest into a list.
+    '''
+
+    def __init__(self, source: Iterator[Any]) -> None:
+        self.source = source
+        # Index and value of the current element (-1 before the first one).
+        self.index = -1
+        self.current: Any = None
+        # The next element, once it has been looked at (to tell if there is one).
+        self.ahead: list[Any] = []
+        self.done = False
+
+    def peek(self) -> bool:
+        if (len(self.ahead) == 0) and not self.done:
+            try:
+                self.ahead.append(next(self.source))
+            except StopIteration:
+                self.done = True
+        return len(self.ahead) != 0
+
+    def advance(self) -> bool:
+        if not self.peek():
+            return False
+        self.current = self.ahead.pop()
+        self.index += 1
+        return True
+
+    # Elements not yet read.
+    def rest(self) -> Iterator[Any]:
+        while self.advance():
+            yield self.current
+
+    def length(self) -> float:
+        if self.peek():
+            return float(self.index + 2)
+        return float(self.index + 1)
+
+    def at(self, index: Any, token: Token) -> Any:
+        if type(index) != float:
+            raise RuntimeError(token, "Index must be a number.")
+        index = int(index)
+        if index == self.index:
+            return self.current
+        if index == self.index + 1:
+            if self.advance():
+                return self.current
+            if index == 0:
+                # An empty stream (a range-for loop reads the first element before checking).
+                return None
+            raise RuntimeError(token, "Index out of bounds.")
+        raise RuntimeError(token, "Streams can only be read in order (current or next element).")
+
+    def get(self, name: Token) -> StreamFunction:
+        method = methods.get(name.lexeme, None)
+        if method != None:
+            return method.bound(self)
+        raise RuntimeError(name, f"Undefined property or method '{name.lexeme}'.")
+
+    def __str__(self) -> str:
+        return "<stream>"
+
+# A stream of the lines of a text file, as strings.
+def lineStream(file: TextIO) -> LineStream:
+    return LineStream(String(line) for line in readLines(file))
@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import Any, TYPE_CHECKING, Literal
 
-from LoxCallable import LoxCallable
+import copy
+from LoxCallable import LoxCallable, NativeCallable
 from Error import RuntimeError
 from String import String
 
@@ -10,149 +11,29 @@ if TYPE_CHECKING:
     from Interpreter import Interpreter
     from Token import Token
 
-class ListFunction(LoxCallable):
-    def __init__(self, mode: str) -> None:
-        self.mode: str = mode
-        self.instance: List | None = None
-    
-    def bind(self, instance: List) -> None:
-        self.instance = instance
-    
-    def check(self, expr: Expr.Call, arguments: list[Any]):
-        checkFuncString = "check_" + self.mode
-        checkFunc = ListFunction.__dict__[checkFuncString]
-        return checkFunc(self, expr, arguments)
+class ListFunction(NativeCallable):
+    # Each method gets the list it is called on as self.instance.
 
-    def call(self, interpreter: Interpreter, expr: Expr.Call, 
-             arguments: list[Any]) -> Any | tuple:
-        if self.check(expr, arguments):
-            match self.mode:
-                # Adds element to the end of the list.
-                case "add":
-                    self.l_add(expr, arguments[0])
-                    return ()
-                # Adds element to specified position X.
-                case "insert":
-                    self.l_insert(expr, arguments[0], arguments[1])
-                    return ()
-                # Removes last element and returns it.
-                case "pop":
-                    return self.l_pop(expr)
-                # Removes element at position X and returns it.
-                case "remove":
-                    return self.l_remove(expr, arguments[0])
-                # Removes argument from list (if found) and returns it.
-                case "delete":
-                    if len(arguments) == 2:
-                        self.l_delete(expr, arguments[0], arguments[1])
-                    elif len(arguments) == 1:
-                        self.l_delete(expr, arguments[0])
-                    return ()
-
-                # Combines elements of the list into a single string.
-                # Raises an error if any of them aren't strings.
-                case "join":
-                    return self.l_join(expr)
-                # Returns a new list with any duplicates in the original removed.
-                case "unique":
-                    return self.l_unique(expr)
-                # Applies some operation to all elements.
-                # Operation need not return a value.
-                case "forEach":
-                    self.l_forEach(expr, interpreter, arguments[0])
-                    return ()
-                # Applies some operation to each element, returning a new list.
-                # Operation must return a value (corresponding element in the new list).
-                case "transform":
-                    return self.l_transform(expr, interpreter, arguments[0])
-                # Returns a new list with only the elements satisfying some predicate.
-                case "filter":
-                    return self.l_filter(expr, interpreter, arguments[0])
-                # Returns a new list containing all non-list elements.
-                # List elements are replaced with their contained elements, recursively.
-                case "flat": 
-                    return self.l_flat(expr)
-
-                # Returns whether or not the given element is in the list.
-                case "contains":
-                    return self.l_contains(expr, arguments[0])
-                # Returns whether or not the list contains any duplicates.
-                case "duplicate":
-                    return self.l_duplicate(expr)
-                # Returns index of first occurrence of argument (-1 if not found).
-                case "index":
-                    return self.l_index(expr, arguments[0])
-                # Returns index of last occurrence of argument (-1 if not found).
-                case "indexLast":
-                    return self.l_indexLast(expr, arguments[0])
-                # Returns whether any element satisfies a certain predicate.
-                case "any":
-                    return self.l_any(expr, interpreter, arguments[0])
-                # Returns whether all elements satisfy a certain predicate.
-                case "all":
-                    return self.l_all(expr, interpreter, arguments[0])
-                
-                # Returns a reversed form of the original list.
-                case "reverse":
-                    return self.l_reverse(expr)
-                # Returns a sorted form of the original list.
-                # Can be done in ascending or descending order (Boolean parameter).
-                case "sort":
-                    if len(arguments) == 1:
-                        return self.l_sort(expr, arguments[0])
-                    elif len(arguments) == 0:
-                        return self.l_sort(expr)
-                # Returns whether or not the list is sorted.
-                # Can check for ascending or descending order (Boolean parameter).
-                case "sorted":
-                    if len(arguments) == 1:
-                        return self.l_sorted(expr, arguments[0])
-                    elif len(arguments) == 0:
-                        return self.l_sorted(expr)
-                # Returns a new list with index-based pairings from the instance
-                # and argument.
-                # Continues until one of the lists ends.
-                case "pair":
-                    return self.l_pair(expr, arguments[0])
-                # Separates a list like the form produced by pair() into two lists.
-                # Returns a list containing the two lists.
-                # Raises an error(?) if a non-pair element exists in the argument.
-                case "separate":
-                    return self.l_separate(expr)
-
-                # Returns the sum of the elements.
-                # Elements must be numeric.
-                case "sum":
-                    return self.l_sum(expr)
-                # Returns the smallest element in the list.
-                # Elements must be all numeric or strings.
-                # List must be homogeneous.
-                case "min":
-                    return self.l_sum(expr)
-                # Returns the largest element in the list.
-                # Elements must be all numeric or strings.
-                # List must be homogeneous.
-                case "max":
-                    return self.l_max(expr)
-                # Returns the average of the elements in the list.
-                # Elements must be all numeric.
-                case "average":
-                    return self.l_average(expr)
-    
-    def l_add(self, expr: Expr.Call, element: Any) -> None:
+    # Adds element to the end of the list.
+    def l_add(self, interpreter: Interpreter, expr: Expr.Call, element: Any) -> tuple:
         self.instance.array.append(element)
+        return ()
     
-    def l_insert(self, expr: Expr.Call, index: float, 
-                 element: Any) -> None:
+    # Adds element to specified position X.
+    def l_insert(self, interpreter: Interpreter, expr: Expr.Call, index: float, 
+                 element: Any) -> tuple:
         index = int(index)
         self.instance.array.insert(index, element)
+        return ()
 
-    def l_pop(self, expr: Expr.Call) -> Any | None:
+    # Removes last element and returns it.
+    def l_pop(self, interpreter: Interpreter, expr: Expr.Call) -> Any | None:
         if len(self.instance.array) == 0:
             return #None
         return self.instance.array.pop()
 
-    def l_remove(self, expr: Expr.Call, index: float) -> Any:
+    # Removes element at position X and returns it.
+    def l_remove(self, interpreter: Interpreter, expr: Expr.Call, index: float) -> Any:
         # Check index validity before running this.
         array = self.instance.array
         index = int(index)
@@ -177,8 +58,9 @@ class ListFunction(LoxCallable):
             case _:
                 return (object == element)
 
-    def l_delete(self, expr: Expr.Call, element: Any, 
-                 all: bool = False) -> None:
+    # Removes argument from list (if found) and returns it.
+    def l_delete(self, interpreter: Interpreter, expr: Expr.Call, element: Any, 
+                 all: bool = False) -> tuple:
         # Handle ValueError here.
         array = self.instance.array
         removed = False
@@ -193,25 +75,34 @@ class ListFunction(LoxCallable):
             for object in array:
                 if self.compareHelper(object, element):
                     array.remove(object)
+        return ()
 
-    def l_join(self, expr: Expr.Call) -> String:
+    # Combines elements of the list into a single string.
+    # Raises an error if any of them aren't strings.
+    def l_join(self, interpreter: Interpreter, expr: Expr.Call) -> String:
         string = ""
         for part in self.instance.array:
             string += part.text
         return String(string)
     
-    def l_unique(self, expr: Expr.Call) -> List:
+    # Returns a new list with any duplicates in the original removed.
+    def l_unique(self, interpreter: Interpreter, expr: Expr.Call) -> List:
         array = self.instance.array
         uniqueArray = list(set(array))
         return List(uniqueArray)
 
-    def l_forEach(self, expr: Expr.Call, interpreter: Interpreter, 
-                  operation: LoxCallable) -> None:
+    # Applies some operation to all elements.
+    # Operation need not return a value.
+    def l_forEach(self, interpreter: Interpreter, expr: Expr.Call, 
+                  operation: LoxCallable) -> tuple:
         array = self.instance.array
         for element in array:
             operation.call(interpreter, expr, [element])
+        return ()
 
-    def l_transform(self, expr: Expr.Call, interpreter: Interpreter, 
+    # Applies some operation to each element, returning a new list.
+    # Operation must return a value (corresponding element in the new list).
+    def l_transform(self, interpreter: Interpreter, expr: Expr.Call, 
                     mapping: LoxCallable) -> List | None:
         array = self.instance.array
         newArray = []
@@ -222,7 +113,8 @@ class ListFunction(LoxCallable):
             newArray.append(value)
         return List(newArray)
 
-    def l_filter(self, expr: Expr.Call, interpreter: Interpreter, 
+    # Returns a new list with only the elements satisfying some predicate.
+    def l_filter(self, interpreter: Interpreter, expr: Expr.Call, 
                  condition: LoxCallable) -> List | None:
         array = self.instance.array
         filterArray = []
@@ -245,28 +137,33 @@ class ListFunction(LoxCallable):
                 flatArray.append(element)
         return flatArray
 
-    def l_flat(self, expr: Expr.Call) -> List:
+    # Returns a new list containing all non-list elements.
+    # List elements are replaced with their contained elements, recursively.
+    def l_flat(self, interpreter: Interpreter, expr: Expr.Call) -> List:
         array = self.instance.array
         return List(self.flatHelper(array))
 
-    def l_contains(self, expr: Expr.Call, element: Any) -> bool:
+    # Returns whether or not the given element is in the list.
+    def l_contains(self, interpreter: Interpreter, expr: Expr.Call, element: Any) -> bool:
         for object in self.instance.array:
             if self.compareHelper(object, element):
                 return True
         return False
     
-    def l_duplicate(self, expr: Expr.Call) -> bool:
+    # Returns whether or not the list contains any duplicates.
+    def l_duplicate(self, interpreter: Interpreter, expr: Expr.Call) -> bool:
         array = self.instance.array
         return (len(array) != len(set(array)))
 
-    def l_index(self, expr: Expr.Call, element: Any) -> float | None:
+    # Returns index of first occurrence of argument (-1 if not found).
+    def l_index(self, interpreter: Interpreter, expr: Expr.Call, element: Any) -> float | None:
         for i, object in enumerate(self.instance.array):
             if self.compareHelper(object, element):
                 return float(i)
         return #None
 
-    def l_indexLast(self, expr: Expr.Call, element: Any) -> float | None:
-        import copy
+    # Returns index of last occurrence of argument (-1 if not found).
+    def l_indexLast(self, interpreter: Interpreter, expr: Expr.Call, element: Any) -> float | None:
         array = copy.deepcopy(self.instance.array)
         array.reverse()
         for i, object in enumerate(array):
@@ -274,7 +171,8 @@ class ListFunction(LoxCallable):
                 return float(len(array) - i - 1)
         return #None
 
-    def l_any(self, expr: Expr.Call, interpreter: Interpreter, 
+    # Returns whether any element satisfies a certain predicate.
+    def l_any(self, interpreter: Interpreter, expr: Expr.Call, 
               condition: LoxCallable) -> bool | None:
         array = self.instance.array
         for element in array:
@@ -285,7 +183,8 @@ class ListFunction(LoxCallable):
                 raise RuntimeError(expr.rightParen, "Function argument must return a Boolean value.")
         return False
 
-    def l_all(self, expr: Expr.Call, interpreter: Interpreter, 
+    # Returns whether all elements satisfy a certain predicate.
+    def l_all(self, interpreter: Interpreter, expr: Expr.Call, 
               condition: LoxCallable) -> bool | None:
         array = self.instance.array
         for element in array:
@@ -296,14 +195,15 @@ class ListFunction(LoxCallable):
                 raise RuntimeError(expr.rightParen, "Function argument must return a Boolean value.")
         return True
 
-    def l_reverse(self, expr: Expr.Call) -> List:
-        import copy
+    # Returns a reversed form of the original list.
+    def l_reverse(self, interpreter: Interpreter, expr: Expr.Call) -> List:
         array = copy.deepcopy(self.instance.array)
         array.reverse()
         return List(array)
 
-    def l_sort(self, expr: Expr.Call, ascending: bool = True) -> List:
-        import copy
+    # Returns a sorted form of the original list.
+    # Can be done in ascending or descending order (Boolean parameter).
+    def l_sort(self, interpreter: Interpreter, expr: Expr.Call, ascending: bool = True) -> List:
         array = copy.deepcopy(self.instance.array)
         if (len(array) != 0) and (type(array[0]) == String):
             array = [obj.text for obj in array]
@@ -312,7 +212,9 @@ class ListFunction(LoxCallable):
             array = [String(obj) for obj in array]
         return List(array)
     
-    def l_sorted(self, expr: Expr.Call, ascending: bool = True) -> bool:
+    # Returns whether or not the list is sorted.
+    # Can check for ascending or descending order (Boolean parameter).
+    def l_sorted(self, interpreter: Interpreter, expr: Expr.Call, ascending: bool = True) -> bool:
         array = self.instance.array
         if (len(array) != 0) and (type(array[0]) == String):
             array = [obj.text for obj in array]
@@ -325,7 +227,10 @@ class ListFunction(LoxCallable):
                     return False
         return True
 
-    def l_pair(self, expr: Expr.Call, secondList: List) -> List:
+    # Returns a new list with index-based pairings from the instance
+    # and argument.
+    # Continues until one of the lists ends.
+    def l_pair(self, interpreter: Interpreter, expr: Expr.Call, secondList: List) -> List:
         array = self.instance.array
         # Argument check before ensures secondList is a List object.
         secondList = secondList.array
@@ -339,7 +244,10 @@ class ListFunction(LoxCallable):
             i += 1
         return List(pair)
 
-    def l_separate(self, expr: Expr.Call) -> List:
+    # Separates a list like the form produced by pair() into two lists.
+    # Returns a list containing the two lists.
+    # Raises an error(?) if a non-pair element exists in the argument.
+    def l_separate(self, interpreter: Interpreter, expr: Expr.Call) -> List:
         # Already checked that each element in instance's array
         # is a list containing exactly two elements.
         array = self.instance.array
@@ -350,33 +258,34 @@ class ListFunction(LoxCallable):
             largeList[1].append(elemArray[1])
         return List(largeList)
 
-    def l_sum(self, expr: Expr.Call) -> float:
+    # Returns the sum of the elements.
+    # Elements must be numeric.
+    def l_sum(self, interpreter: Interpreter, expr: Expr.Call) -> float:
         array = self.instance.array
         return float(sum(array))
 
-    def l_min(self, expr: Expr.Call) -> float:
+    # Returns the smallest element in the list.
+    # Elements must be all numeric or strings.
+    # List must be homogeneous.
+    def l_min(self, interpreter: Interpreter, expr: Expr.Call) -> float:
         array = self.instance.array
         return float(min(array))
 
-    def l_max(self, expr: Expr.Call) -> float:
+    # Returns the largest element in the list.
+    # Elements must be all numeric or strings.
+    # List must be homogeneous.
+    def l_max(self, interpreter: Interpreter, expr: Expr.Call) -> float:
         array = self.instance.array
         return float(max(array))
 
-    def l_average(self, expr: Expr.Call) -> float:
+    # Returns the average of the elements in the list.
+    # Elements must be all numeric.
+    def l_average(self, interpreter: Interpreter, expr: Expr.Call) -> float:
         array = self.instance.array
         return float(sum(array) / len(array))
 
     # ------------------------------------------------------------
 
-    def check_add(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
-    def check_insert(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
-    def check_pop(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
     def check_remove(self, expr: Expr.Call, 
                         arguments: list[Any]) -> bool | None:
         index = arguments[0]
@@ -388,9 +297,6 @@ class ListFunction(LoxCallable):
             raise RuntimeError(expr.rightParen, "Index value is beyond list end.")
         return True
     
-    def check_delete(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
     def check_join(self, expr: Expr.Call, 
                     arguments: list[Any]) -> bool | None:
         for obj in self.instance.array:
@@ -399,9 +305,6 @@ class ListFunction(LoxCallable):
                                    "List given must only contain strings.")
         return True
     
-    def check_unique(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
     def check_forEach(self, expr: Expr.Call, 
                         arguments: list[Any]) -> bool | None:
         operation = arguments[0]
@@ -426,21 +329,6 @@ class ListFunction(LoxCallable):
                                "Filter given is not a callable object.")
         return True
     
-    def check_flat(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
-    def check_contains(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-
-    def check_duplicate(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
-    def check_index(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
-    def check_indexLast(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
     def check_any(self, expr: Expr.Call, 
                     arguments: list[Any]) -> bool | None:
         condition = arguments[0]
@@ -457,9 +345,6 @@ class ListFunction(LoxCallable):
                                "Condition given is not a callable object.")
         return True
     
-    def check_reverse(self, expr: Expr.Call, arguments: list[Any]) -> bool:
-        return True
-    
     def check_sort(self, expr: Expr.Call, 
                         arguments: list[Any]) -> bool | None:
         array = self.instance.array
@@ -571,113 +456,60 @@ class ListFunction(LoxCallable):
                                    "List must contain numbers only.")
         return True
 
-    # ------------------------------------------------------------
-
-    def arity(self) -> list[int]:
-        match self.mode:
-            case "add":
-                return [1,1]
-            case "insert":
-                return [2,2]
-            case "pop":
-                return [0,0]
-            case "remove":
-                return [1,1]
-            case "delete":
-                return [1,2]
-
-            case "join":
-                return [0,0]
-            case "unique":
-                return [0,0]
-            case "forEach":
-                return [1,1]
-            case "transform":
-                return [1,1]
-            case "filter":
-                return [1,1]
-            case "flat":
-                return [0,0]
-
-            case "contains":
-                return [1,1]
-            case "duplicate":
-                return [0,0]
-            case "index":
-                return [1,1]
-            case "indexLast":
-                return [1,1]
-            case "any":
-                return [1,1]
-            case "all":
-                return [1,1]
-
-            case "reverse":
-                return [0,0]
-            case "sort":
-                return [0,1]
-            case "sorted":
-                return [0,1]
-            case "pair":
-                return [1,1]
-            case "separate":
-                return [0,0]
-
-            case "sum":
-                return [0,0]
-            case "min":
-                return [0,0]
-            case "max":
-                return [0,0]
-            case "average":
-                return [0,0]
-    
     # ------------------------------------------------------------
     def toString(self) -> str:
         return "<list method>"
 
-functions = ["add", "insert", "pop", "remove", "delete",
-             "join", "unique", "forEach", "transform", "filter", "flat",
-             "contains", "duplicate", "index", "indexLast", "any", "all", "collect",
-             "reverse", "sort", "sorted", "pair", "separate",
-             "sum", "min", "max", "average"]
+# Name, implementation, arity, argument check (None if any arguments are accepted).
+# The methods are made once, and shared by every list.
+methods: dict[str, ListFunction] = {}
+for name, implementation, arity, check in (
+        ("add", ListFunction.l_add, [1,1], None),
+        ("insert", ListFunction.l_insert, [2,2], None),
+        ("pop", ListFunction.l_pop, [0,0], None),
+        ("remove", ListFunction.l_remove, [1,1], ListFunction.check_remove),
+        ("delete", ListFunction.l_delete, [1,2], None),
+
+        ("join", ListFunction.l_join, [0,0], ListFunction.check_join),
+        ("unique", ListFunction.l_unique, [0,0], None),
+        ("forEach", ListFunction.l_forEach, [1,1], ListFunction.check_forEach),
+        ("transform", ListFunction.l_transform, [1,1], ListFunction.check_transform),
+        ("filter", ListFunction.l_filter, [1,1], ListFunction.check_filter),
+        ("flat", ListFunction.l_flat, [0,0], None),
+
+        ("contains", ListFunction.l_contains, [1,1], None),
+        ("duplicate", ListFunction.l_duplicate, [0,0], None),
+        ("index", ListFunction.l_index, [1,1], None),
+        ("indexLast", ListFunction.l_indexLast, [1,1], None),
+        ("any", ListFunction.l_any, [1,1], ListFunction.check_any),
+        ("all", ListFunction.l_all, [1,1], ListFunction.check_all),
+
+        ("reverse", ListFunction.l_reverse, [0,0], None),
+        ("sort", ListFunction.l_sort, [0,1], ListFunction.check_sort),
+        ("sorted", ListFunction.l_sorted, [0,1], ListFunction.check_sorted),
+        ("pair", ListFunction.l_pair, [1,1], ListFunction.check_pair),
+        ("separate", ListFunction.l_separate, [0,0], ListFunction.check_separate),
+
+        ("sum", ListFunction.l_sum, [0,0], ListFunction.check_sum),
+        ("min", ListFunction.l_min, [0,0], ListFunction.check_min),
+        ("max", ListFunction.l_max, [0,0], ListFunction.check_max),
+        ("average", ListFunction.l_average, [0,0], ListFunction.check_average)):
+    methods[name] = ListFunction(name, implementation, arity, check)
 
 class List:
     def __init__(self, array: list) -> None:
         self.array = array
-        self.methods: dict[str, ListFunction] = {}
-        for function in functions:
-            self.methods[function] = ListFunction(function)
 
     def get(self, name: Token) -> ListFunction | None:
-        method = self.methods.get(name.lexeme, None)
+        method = methods.get(name.lexeme, None)
         if method != None:
-            import copy
-            func = copy.deepcopy(method)
-            func.bind(self)
-            return func
+            return method.bound(self)
         
         raise RuntimeError(name, f"Undefined property or method '{name.lexeme}'.")
 
     def set() -> None:
         pass
 
-    def __str__(self) -> str:
-        from Interpreter import Interpreter
-        dummyInterpreter = Interpreter()
-        string = "["
-        for element in self.array:
-            if type(element) == String:
-                string += "\""
-            string += dummyInterpreter.stringify(element)
-            if type(element) == String:
-                string += "\""
-            string += ", "
-        if string[-2:] == ", ":
-            string = string[:-2]
-        string += "]"
-        return string
-
 # To have a List() constructor function.
 # Alternative way of creating/declaring a list.
 class ListInit(LoxCallable):
@@ -1,10 +1,12 @@
 from __future__ import annotations
-from typing import Any, TYPE_CHECKING
+from typing import Any, Callable, TYPE_CHECKING
 
+import copy
 # To make an abstract LoxCallable class.
 from abc import ABC, abstractmethod
 
 if TYPE_CHECKING:
+    from Expr import Expr
     from Interpreter import Interpreter
 
 class LoxCallable(ABC):
@@ -14,4 +16,47 @@ class LoxCallable(ABC):
 
     @abstractmethod
     def call(self, interpreter: Interpreter, arguments: list[Any]) -> None:
-        pass
\ No newline at end of file
+        pass
+
+class NativeCallable(LoxCallable):
+    '''
+    A function or method implemented in Python (a built-in, or a method of a list,
+    bytes, stream or class instance). Each one is its own object, made once, holding
+    its name (mode), implementation and arity, along with its argument check (None if
+    it has none), so a call is the check and then implementation(function, interpreter,
+    expr, *arguments).
+    '''
+
+    def __init__(self, mode: str, implementation: Callable, arity: list[int],
+                 check: Callable | None = None) -> None:
+        self.mode = mode
+        self.implementation = implementation
+        self.arityRange = arity
+        self.checkArguments = check
+        # Object the function is a method of (None for functions).
+        self.instance: Any = None
+
+    def bind(self, instance: Any) -> None:
+        self.instance = instance
+
+    # Methods are shared by every object of their type, so each access binds a copy.
+    def bound(self, instance: Any) -> NativeCallable:
+        method = object.__new__(type(self))
+        method.__dict__.update(self.__dict__)
+        method.bind(instance)
+        return method
+
+    # Copies (e.g., in LoxInstance.get()) only need their own instance.
+    def __deepcopy__(self, memo: dict) -> NativeCallable:
+        return copy.copy(self)
+
+    def call(self, interpreter: Interpreter, expr: Expr.Call, arguments: list[Any]) -> Any:
+        if self.checkArguments != None:
+            self.checkArguments(self, expr, arguments)
+        return self.implementation(self, interpreter, expr, *arguments)
+
+    def arity(self) -> list[int]:
+        return self.arityRange
+
+    def toString(self) -> str:
+        return "<native fn>"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any, TYPE_CHECKING
 
+import copy
 from Error import RuntimeError
 from LoxCallable import LoxCallable
 from LoxFunction import LoxFunction
@@ -11,6 +12,7 @@ if TYPE_CHECKING:
     from Expr import Expr
     from Interpreter import Interpreter
     from LoxClass import LoxClass
+    from LoxContext import LoxContext
 
 class LoxClass(LoxInstance, LoxCallable):
     def __init__(self, metaclass: LoxClass, superclass: LoxClass, 
@@ -22,21 +24,59 @@ class LoxClass(LoxInstance, LoxCallable):
         self.private = private
         self.public = public
     
+    # Class objects keep their members in the method dictionaries
+    # (static fields are stored alongside the methods), rather than in
+    # an instance shape.
+    def get(self, name: Token, context: LoxContext) -> Any | LoxFunction:
+        if name.lexeme in self.private.keys():
+            if context.inMethod and self.verifyClass(self.klass, context):
+                return self.private[name.lexeme]
+            raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
+
+        if name.lexeme in self.public.keys():
+            return self.public[name.lexeme]
+        
+        method = self.klass.findMethod(name.lexeme, name, context)
+        if method != None:
+            if type(method) == LoxFunction:
+                return method.bind(self)
+            elif isinstance(method, LoxCallable):
+                func = copy.deepcopy(method)
+                func.bind(self)
+                return func
+        
+        raise RuntimeError(name, f"Undefined property or method '{name.lexeme}'.")
+    
+    def set(self, name: Token, value: Any, visibility: str, context: LoxContext):
+        if name.lexeme in self.private.keys():
+            if context.inMethod and self.verifyClass(self.klass, context):
+                self.private[name.lexeme] = value
+                return
+            raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
+        tempMethod = self.klass.findMethod(name.lexeme, None, context)
+        if tempMethod != None:
+            raise RuntimeError(name, f"Method in class definition cannot be re-assigned.")
+        
+        if visibility == "private":
+            self.private[name.lexeme] = value
+        elif visibility == "public":
+            self.public[name.lexeme] = value
+
     def call(self, interpreter: Interpreter, expr: Expr, 
                 arguments: list[Any]) -> LoxInstance:
         instance = LoxInstance(self)
-        initializer = self.findMethod("init")
+        initializer = self.findMethod("init", None, interpreter.context)
         if initializer != None:
             initializer.bind(instance).call(interpreter, expr, arguments)
         return instance
     
     # We have a separate nameString parameter since we sometimes
     # pass a raw string to this method.
-    def findMethod(self, nameString: str, 
-                    nameToken: Token | None = None) -> LoxFunction | None:
+    # Private methods are only found from within a method (context is None outside of a call).
+    def findMethod(self, nameString: str, nameToken: Token | None = None, 
+                    context: LoxContext | None = None) -> LoxFunction | None:
         if nameString in self.private.keys():
-            import State as State
-            if State.inMethod:
+            if (context != None) and context.inMethod:
                 method = self.private.get(nameString)
                 assert (method != None)
                 if method.context["class"].name == self.name:
@@ -48,7 +88,7 @@ class LoxClass(LoxInstance, LoxCallable):
             return self.public.get(nameString)
         
         elif self.superclass != None:
-            return self.superclass.findMethod(nameString, nameToken)
+            return self.superclass.findMethod(nameString, nameToken, context)
         
         return #None
     
@@ -0,0 +1,50 @@
+import os
+import socket
+import sys
+
+'''
+Thin client for a running plox server (plox -serve).
+Usage is the same as plox for files:
+    python3 Lox/LoxClient.py [script] [arguments]
+The client's stdin, stdout and stderr are handed over to the server, so the
+script reads and writes them directly; the client then waits for the exit code.
+Kept free of interpreter (and most other) imports, so it starts about as fast as Python itself.
+'''
+
+def socketPath() -> str:
+    return os.environ.get("PLOX_SOCKET", f"/tmp/plox-{os.getuid()}.sock")
+
+def request(arguments: list[str]) -> int:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socketPath())
+    except OSError as error:
+        sys.stderr.write(f"Could not reach plox server at {socketPath()}: {error.strerror}.\n")
+        return 69
+
+    # Working directory, then the arguments, separated by null characters.
+    message = "\0".join([os.getcwd()] + arguments).encode()
+    socket.send_fds(connection, [message], [0, 1, 2])
+
+    # Replies: "pid [n]\n" once the script starts, then "exit [code]\n".
+    reply = connection.makefile("r")
+    pid = None
+    code = 70
+    try:
+        for line in reply:
+            kind, value = line.split()
+            if kind == "pid":
+                pid = int(value)
+            elif kind == "exit":
+                code = int(value)
+    except KeyboardInterrupt:
+        # Interrupt the script rather than leaving it running in the server.
+        if pid != None:
+            import signal
+            os.kill(pid, signal.SIGINT)
+        code = 130
+    connection.close()
+    return code
+
+if __name__ == "__main__":
+    sys.exit(request(sys.argv[1:]))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, TextIO
+
+from Output import Output
+import State
+from TraceLog import TraceLog
+
+if TYPE_CHECKING:
+    from Environment import Environment
+    from Interpreter import Interpreter
+    from LoxClass import LoxClass
+    from LoxFunction import LoxFunction
+    from Scheduler import Scheduler
+    from WorkerPool import WorkerPool
+
+class LoxContext:
+    '''
+    Everything belonging to one run of the interpreter: command-line options,
+    error flags, debugger state, program output, module environments and the
+    interpreter itself.
+    It is handed to the Scanner, Parser, Interpreter and Resolver, and reached
+    by everything else through the interpreter (interpreter.context), so separate
+    contexts never share state and can run side by side in one process.
+    Only compiled modules (State.modules) are shared between contexts.
+    '''
+
+    def __init__(self, argv: list[str] | None = None, stdout: TextIO | None = None,
+                 stderr: TextIO | None = None) -> None:
+        # Command-line options (set by LoxMain).
+        self.fileName: str | None = None
+        self.testMode = False
+        self.cleanMode = False
+        self.Error = False # True if "-error" or "-linepos" options have been used.
+        self.linePos = False # True if line-position info should be printed.
+        self.linePrint = False # True if error lines should be printed.
+        self.argv: list[str] = argv or []
+
+        # For error-handling.
+        self.hadError = False # If a lex error, parse error, or resolve error occurred during their respective stages.
+        self.hadRuntimeError = False # If a runtime error occurred during the interpreter stage.
+        # All the lines in each file being executed (to print out lines containing errors),
+        # by file name.
+        self.fileLines: dict[str, list[str]] = {}
+
+        # For debug option (files only).
+        self.inAFile = False # Whether or not we are running a file or command-line prompts.
+        self.switchCLI = False # Whether or not to end file execution and switch to terminal CLI.
+        self.debugMode = False # Whether or not we are in a debug session (will alter format of error-reporting).
+        self.debugError = False
+        # Active calls, most recent last.
+        self.callStack: list[dict] = []
+        self.traceLog = TraceLog(State.traceLogSize)
+        # Line breakpoints, as (file name, line number) pairs.
+        self.breakpoints: set[tuple[str, int]] = set()
+        # Debugger's line tracer (created on the first debug session).
+        self.tracer = None
+        self.replDebug = False
+
+        # For program output (print, echo, error messages, etc.).
+        # Streams default to sys.stdout/sys.stderr (whichever they are at the time).
+        self.output = Output(State.outputBufferSize, State.outputPolicy, stdout, stderr)
+
+        # Environments of the GetLib/GetFile modules run so far, by module path.
+        self.moduleEnvironments: dict[str, Environment] = {}
+        # Paths of the modules resolved so far.
+        self.resolvedModules: set[str] = set()
+
+        # For access to private fields within methods.
+        self.inMethod = False
+        self.currentClass: LoxClass | None = None
+
+        # For static variables in functions.
+        self.currentFunction: LoxFunction | None = None
+
+        # Created on first use (see LoxMain.run()).
+        self.interpreter: Interpreter | None = None
+        # Runs spawned and I/O tasks (created by the first spawn() or async I/O call).
+        self.scheduler: Scheduler | None = None
+        # Worker processes for the parallel module (created on first use).
+        self.workerPool: WorkerPool | None = None
@@ -14,6 +14,9 @@ if TYPE_CHECKING:
     from LoxFunction import LoxFunction
     from LoxInstance import LoxInstance
 
+# For looking up 'this' in initializers.
+thisToken = Token(TokenType.THIS, "this", None, 0, 0, None)
+
 class LoxFunction(LoxCallable):
     def __init__(self, declaration: Stmt.Function, closure: Environment, 
                  context: dict) -> None:
@@ -67,39 +70,36 @@ class LoxFunction(LoxCallable):
         for var in self.statics:
             environment.define(var, self.statics[var], "VAR")
         
-        dummyToken = Token(TokenType.THIS, "this", None, 0, 0, None)
-
-        import State
-        currentState = State.inMethod
-        currentClass = State.currentClass
-        currentFunction = State.currentFunction
+        # The run's context (self.context holds this function's own flags).
+        state = interpreter.context
+        currentState = state.inMethod
+        currentClass = state.currentClass
+        currentFunction = state.currentFunction
 
         try:
-            State.currentFunction = self
+            state.currentFunction = self
             if self.context["isMethod"]:
-                State.inMethod = True
-                State.currentClass = self.context["class"]
+                state.inMethod = True
+                state.currentClass = self.context["class"]
             interpreter.executeBlock(self.declaration.body, environment)
         except Return as r:
             self.count += 1
-            State.currentFunction = currentFunction
-            State.callStack = State.callStack[1:]
+            state.currentFunction = currentFunction
             # Reset inMethod.
             if self.context["isMethod"]:
-                State.inMethod = currentState
-                State.currentClass = currentClass
+                state.inMethod = currentState
+                state.currentClass = currentClass
             if self.context["isInitializer"]:
-                return self.closure.getAt(0, dummyToken)
+                return self.closure.getAt(0, thisToken)
             return r.value
         
-        State.currentFunction = currentFunction
-        State.callStack = State.callStack[1:]
+        state.currentFunction = currentFunction
         # Reset inMethod.
         if self.context["isMethod"]:
-            State.inMethod = currentState
-            State.currentClass = currentClass
+            state.inMethod = currentState
+            state.currentClass = currentClass
         if self.context["isInitializer"]:
-            return self.closure.getAt(0, dummyToken)
+            return self.closure.getAt(0, thisToken)
         
         self.count += 1
         return ()
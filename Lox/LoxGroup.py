@@ -1,15 +1,20 @@
-from typing import Any, Literal, NoReturn
+from __future__ import annotations
+from typing import Any, Literal, NoReturn, TYPE_CHECKING
+
 from LoxInstance import LoxInstance
 from Token import Token
 from Environment import Environment
 from Error import RuntimeError
 
+if TYPE_CHECKING:
+    from LoxContext import LoxContext
+
 class LoxGroup(LoxInstance):
     def __init__(self, name: str, environment: Environment) -> None:
         self.name = name
         self.environment = environment
     
-    def get(self, name: Token) -> Any | None:
+    def get(self, name: Token, context: LoxContext) -> Any | None:
         if name.lexeme in self.environment.values.keys():
             value = self.environment.values.get(name.lexeme)
             if type(value) != tuple:
@@ -19,7 +24,7 @@ class LoxGroup(LoxInstance):
         else:
             raise RuntimeError(name, f"'{name.lexeme}' is not a member of group '{self.name}'.")
     
-    def set(self, name: Token, value: Any, access: str) -> NoReturn:
+    def set(self, name: Token, value: Any, access: str, context: LoxContext) -> NoReturn:
         raise RuntimeError(name, "Cannot re-assign namespace members.")
     
     def varType(self) -> str:
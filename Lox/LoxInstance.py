@@ -1,68 +1,132 @@
 from __future__ import annotations
 from typing import Any, TYPE_CHECKING, Literal, Never
 
+import copy
 from Error import RuntimeError
 from List import List
 from LoxFunction import LoxFunction
 from Expr import Expr
 from Token import TokenType
 from String import String
-import State
 
 if TYPE_CHECKING:
     from Interpreter import Interpreter
     from LoxClass import LoxClass
+    from LoxContext import LoxContext
     from LoxInstance import LoxInstance
     from Token import Token
 
+# Field layout shared by all instances that had the same fields assigned in the
+# same order (a "hidden class").
+# Maps each field name to its slot index in the instance's values list and its
+# visibility ("public" or "private").
+class Shape:
+    def __init__(self, fields: dict[str, tuple[int, str]]) -> None:
+        self.fields = fields
+        self.transitions: dict[tuple[str, str], Shape] = {}
+
+    # Shape reached by adding a field to this one.
+    # Created once, then shared by every instance taking the same step.
+    def withField(self, name: str, visibility: str) -> Shape:
+        key = (name, visibility)
+        shape = self.transitions.get(key, None)
+        if shape == None:
+            fields = dict(self.fields)
+            fields[name] = (len(self.fields), visibility)
+            shape = Shape(fields)
+            self.transitions[key] = shape
+        return shape
+
+    # Shapes are never modified once made, so copies can share them.
+    def __deepcopy__(self, memo: dict) -> Shape:
+        return self
+
+emptyShape = Shape({})
+
 class LoxInstance:
+    # Instances are small and numerous, so they carry no attribute dictionary.
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: LoxClass) -> None:
         self.klass = klass
-        self.private: dict[str, Any] = {}
-        self.public: dict[str, Any] = {}
+        self.shape = emptyShape
+        self.values: list[Any] = []
 
-    def verifyClass(self, klass: LoxClass) -> bool:
+    def verifyClass(self, klass: LoxClass, context: LoxContext) -> bool:
         while klass != None:
-            if klass == State.currentClass:
+            if klass == context.currentClass:
                 return True
             klass = klass.superclass
         return False
 
-    def get(self, name: Token) -> Any | LoxFunction:
-        if name.lexeme in self.private.keys():
-            if State.inMethod and self.verifyClass(self.klass):
-                return self.private[name.lexeme]
-            raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
-
-        if name.lexeme in self.public.keys():
-            return self.public[name.lexeme]
+    def get(self, name: Token, context: LoxContext) -> Any | LoxFunction:
+        slot = self.shape.fields.get(name.lexeme, None)
+        if slot != None:
+            if slot[1] == "private":
+                if not (context.inMethod and self.verifyClass(self.klass, context)):
+                    raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
+            return self.values[slot[0]]
         
-        method = self.klass.findMethod(name.lexeme, name)
+        method = self.klass.findMethod(name.lexeme, name, context)
         if method != None:
             if type(method) == LoxFunction:
                 return method.bind(self)
+            elif isinstance(method, NativeCallable):
+                return method.bound(self)
             elif isinstance(method, LoxCallable):
-                import copy
                 func = copy.deepcopy(method)
                 func.bind(self)
                 return func
         
         raise RuntimeError(name, f"Undefined property or method '{name.lexeme}'.")
     
-    def set(self, name: Token, value: Any, visibility: str):
-        if name.lexeme in self.private.keys():
-            if State.inMethod and self.verifyClass(self.klass):
-                self.private[name.lexeme] = value
+    def set(self, name: Token, value: Any, visibility: str, context: LoxContext):
+        slot = self.shape.fields.get(name.lexeme, None)
+        if slot != None:
+            if slot[1] == "private":
+                if context.inMethod and self.verifyClass(self.klass, context):
+                    self.values[slot[0]] = value
+                    return
+                raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
+            if visibility == "public":
+                self.values[slot[0]] = value
                 return
-            raise RuntimeError(name, f"Private field '{name.lexeme}' is inaccessible.")
-        tempMethod = self.klass.findMethod(name.lexeme)
-        if tempMethod != None:
-            raise RuntimeError(name, f"Method in class definition cannot be re-assigned.")
+        else:
+            tempMethod = self.klass.findMethod(name.lexeme, None, context)
+            if tempMethod != None:
+                raise RuntimeError(name, f"Method in class definition cannot be re-assigned.")
         
-        if visibility == "private":
-            self.private[name.lexeme] = value
-        elif visibility == "public":
-            self.public[name.lexeme] = value
+        self.setField(name.lexeme, value, visibility)
+
+    # Direct field access for the interpreter and native modules
+    # (no visibility checks).
+    def field(self, name: str) -> Any | None:
+        slot = self.shape.fields.get(name, None)
+        if slot == None:
+            return None
+        return self.values[slot[0]]
+
+    def setField(self, name: str, value: Any, visibility: str = "public") -> None:
+        slot = self.shape.fields.get(name, None)
+        if (slot != None) and (slot[1] == visibility):
+            self.values[slot[0]] = value
+        elif slot == None:
+            self.shape = self.shape.withField(name, visibility)
+            self.values.append(value)
+        else:
+            # Visibility changed (e.g., a public field re-declared with 'safe').
+            # Rebuild the layout with the field moved to the end.
+            fields = [(field, self.values[index], vis) 
+                      for field, (index, vis) in self.shape.fields.items() if field != name]
+            fields.append((name, value, visibility))
+            self.shape = emptyShape
+            self.values = []
+            for field, fieldValue, vis in fields:
+                self.shape = self.shape.withField(field, vis)
+                self.values.append(fieldValue)
+
+    def fieldNames(self, visibility: str) -> list[str]:
+        return [name for name, slot in self.shape.fields.items() if slot[1] == visibility]
     
     def toString(self, interpreter: Interpreter, 
                     expr: None = None, arguments: list = []) -> String | str:
@@ -118,17 +182,11 @@ class LoxInstance:
         else:
             return ()
 
-from LoxCallable import LoxCallable
-class InstanceFunction(LoxCallable):
-    def __init__(self, mode: str) -> None:
-        self.mode: str = mode
-        self.instance: LoxInstance | None = None
-    
-    def bind(self, instance: LoxInstance) -> None:
-        self.instance = instance
+from LoxCallable import LoxCallable, NativeCallable
+class InstanceFunction(NativeCallable):
+    # Each method gets the instance it is called on as self.instance.
 
-    def call(self, interpreter: Interpreter, expr: Expr, 
-                arguments: list[Any]) -> List | tuple | None:
+    def checkBound(self, expr: Expr, arguments: list[Any]) -> None:
         if self.instance == None:
             # Expr is a Call Expr.
             # The Call Expr's callee is a Get Expr.
@@ -136,61 +194,47 @@ class InstanceFunction(LoxCallable):
             raise RuntimeError(expr.callee.object.name, 
                                "Can only retrieve fields or methods for class instances.")
 
-        match self.mode:
-            case "_fieldList":
-                return self.i_fieldList()
-            case "_methodList":
-                return self.i_methodList()
-            case "_fields":
-                self.i_fields(interpreter)
-                return ()
-            case "_methods":
-                self.i_methods(interpreter)
-                return ()
-    
-    def i_fieldList(self) -> List:
-        privates = list(self.instance.private.keys())
-        publics = list(self.instance.public.keys())
+    def i_fieldList(self, interpreter: Interpreter, expr: Expr) -> List:
+        privates = self.instance.fieldNames("private")
+        publics = self.instance.fieldNames("public")
         array = publics + privates
         return List(array)
 
-    def i_methodList(self) -> List:
+    def i_methodList(self, interpreter: Interpreter, expr: Expr) -> List:
         privates = list(self.instance.klass.private.keys())
         publics = list(self.instance.klass.public.keys())
         array = list(privates + publics)
         return List(array)
 
-    def i_fields(self, interpreter: Interpreter) -> None:
-        privates = self.instance.private
-        for field in privates.keys():
-            print(f"{field}: private")
-        publics = self.instance.public
-        for field in publics.keys():
-            if isinstance(publics[field], LoxCallable):
+    def i_fields(self, interpreter: Interpreter, expr: Expr) -> tuple:
+        for field in self.instance.fieldNames("private"):
+            interpreter.context.output.write(f"{field}: private\n")
+        for field in self.instance.fieldNames("public"):
+            object = self.instance.field(field)
+            if isinstance(object, LoxCallable):
                 continue
-            value = interpreter.stringify(publics[field])
-            print(f"{field}: {value}")
+            value = interpreter.stringify(object)
+            interpreter.context.output.write(f"{field}: {value}\n")
+        return ()
     
-    def i_methods(self, interpreter: Interpreter) -> None:
+    def i_methods(self, interpreter: Interpreter, expr: Expr) -> tuple:
         private = self.instance.klass.private
         for method in private.keys():
             value = interpreter.stringify(private[method])
-            print(f"{method}: {value}")
+            interpreter.context.output.write(f"{method}: {value}\n")
         public = self.instance.klass.public
         for method in public.keys():
             value = interpreter.stringify(public[method])
-            print(f"{method}: {value}")
-    
-    def arity(self) -> list[int]:
-        match self.mode:
-            case "_fieldList":
-                return [0,0]
-            case "_methodList":
-                return [0,0]
-            case "_fields":
-                return [0,0]
-            case "_methods":
-                return [0,0]
+            interpreter.context.output.write(f"{method}: {value}\n")
+        return ()
     
     def toString(self) -> str:
-        return f"<native method {self.mode}>"
\ No newline at end of file
+        return f"<native method {self.mode}>"
+
+# The methods every class gets (made once, and shared by every class).
+instanceFunctions: dict[str, InstanceFunction] = {}
+for name, implementation in (("_fieldList", InstanceFunction.i_fieldList),
+                             ("_methodList", InstanceFunction.i_methodList),
+                             ("_fields", InstanceFunction.i_fields),
+                             ("_methods", InstanceFunction.i_methods)):
+    instanceFunctions[name] = InstanceFunction(name, implementation, [0,0], InstanceFunction.checkBound)
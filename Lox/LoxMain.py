@@ -6,35 +6,43 @@ from Scanner import Scanner
 from Parser import Parser
 from Interpreter import Interpreter
 from Resolver import Resolver
+from Scheduler import finishTasks
 from Error import BaseError, ScanError, ParseError, StaticError, RuntimeError
+from LoxContext import LoxContext
 import os
-import State
 
 class StmtHasAccept(Protocol):
     def accept(self, interpreter: Interpreter) -> None: ...
 
-interpreter = Interpreter()
+# Context of the command-line run (created by main(), or by serve() ahead of time).
+context: LoxContext | None = None
 
-def run(source: str, fileName: str = "_REPL_") -> None:
-    scanner = Scanner(source, fileName)
+def run(context: LoxContext, source: str, fileName: str = "_REPL_") -> None:
+    scanner = Scanner(source, fileName, context)
     tokens = scanner.scanTokens()
 
     # Stop if there was a syntax (scanning) error.
-    if State.hadError:
+    if context.hadError:
         return
 
-    parser = Parser(tokens)
+    parser = Parser(tokens, context)
     statements = parser.parse()
 
     # Stop if there was a syntax (parsing) error.
-    if State.hadError:
+    if context.hadError:
         return
     
+    # Created by the first run, so that a context used only for 
+    # reporting errors does not set up a whole interpreter.
+    interpreter = context.interpreter
+    if interpreter == None:
+        interpreter = Interpreter(context)
+    
     resolver = Resolver(interpreter)
     resolver.resolve(statements)
 
     # Stop if there was a resolution error.
-    if State.hadError:
+    if context.hadError:
         return
     
     # Print out a warning for each unused variable after resolving is complete.
@@ -45,9 +53,10 @@ def run(source: str, fileName: str = "_REPL_") -> None:
     resolver.varWarnings(resolver.localVars)
 
     interpreter.interpret(statements)
+    finishTasks(context)
 
-    if State.switchCLI: # User chose to switch to CLI while debugging (final: cannot switch back).
-        State.inAFile = False
+    if context.switchCLI: # User chose to switch to CLI while debugging (final: cannot switch back).
+        context.inAFile = False
         # Clearing input buffer.
         # import os
         # if os.name == "nt": # Using Windows.
@@ -59,67 +68,123 @@ def run(source: str, fileName: str = "_REPL_") -> None:
         #     # it doesn't work on Windows.
         #     import termios
         #     termios.tcflush(sys.stdin, termios.TCIFLUSH)
-        runPrompt()
+        runPrompt(context)
 
-def piping(path: str, baseName: str) -> None:
-    if "Error" in path:
-        # To re-direct errors to the given file as well.
-        fd = None # For scope purposes.
-        try:
-            fd = open(f"Testing/Output/{baseName}Error.txt", "r+")
-        except FileNotFoundError:
-            fd = open(f"Testing/Output/{baseName}Error.txt", "w+")
-        sys.stderr = fd
-    else:
-        fd = None
-        try:
-            fd = open(f"Testing/Output/{baseName}Output.txt", "r+")
-        except FileNotFoundError:
-            fd = open(f"Testing/Output/{baseName}Output.txt", "w+")
-        sys.stdout = fd
-
-def runFile(path: str, baseName: str | None = None) -> None:
-    State.inAFile = True
+def runFile(context: LoxContext, path: str) -> None:
+    context.inAFile = True
 
     try:
         with open(path, "r") as file:
             lineList = file.readlines()
             lineList = [line.rstrip() for line in lineList]
-            State.fileLines[path] = lineList
+            context.fileLines[path] = lineList
         with open(path, "r") as file:
             content = file.read()
-        if State.testMode:
-            piping(path, baseName) # type: ignore
-        if State.testMode and ("Error" in path):
-            for line in State.fileLines[path]:
+        if context.testMode and ("Error" in path):
+            for line in context.fileLines[path]:
                 # We run each line separately so errors for each line
                 # do not affect the next line running.
                 # We reset the errors each time so they still execute separately.
-                run(line, path)
-                State.hadError = False
-                State.hadRuntimeError = False
+                run(context, line, path)
+                context.hadError = False
+                context.hadRuntimeError = False
         else:
-            run(content, path)
+            run(context, content, path)
     except FileNotFoundError as error:
-        sys.stderr.write(f"Could not run. File not found: {error.filename}.\n")
+        context.output.error(f"Could not run. File not found: {error.filename}.\n")
         sys.exit(66)
 
-    if not State.testMode:
-        if State.hadError:
+    if not context.testMode:
+        context.output.flush()
+        if context.hadError:
             sys.exit(65)
         
-        if State.hadRuntimeError:
+        if context.hadRuntimeError:
             sys.exit(70)
 
     # Must reset error flags here so that each test file
     # can run with freshly reset flags, allowing it to execute successfully.
     else:
-        State.hadError = False
-        State.hadRuntimeError = False
+        context.hadError = False
+        context.hadRuntimeError = False
+
+# Streaming mode (plox -n/-p): the script is compiled once, and its body then runs
+# for each line of the input files (or stdin), with the line in variable "line" and
+# its number in "lineNum". BEGIN { ... } and END { ... } blocks run before and after the input.
+def runStream(context: LoxContext, path: str, inputs: list[str], printLines: bool) -> None:
+    from LineStream import readLines
+    from String import String
+    context.inAFile = True
+    try:
+        with open(path, "r") as file:
+            content = file.read()
+    except FileNotFoundError as error:
+        context.output.error(f"Could not run. File not found: {error.filename}.\n")
+        sys.exit(66)
+    context.fileLines[path] = [line.rstrip() for line in content.split("\n")]
+
+    tokens = Scanner(content, path, context).scanTokens()
+    if context.hadError:
+        sys.exit(65)
+    parser = Parser(tokens, context)
+    parser.hooks = {"BEGIN": [], "END": []}
+    body = parser.parse()
+    if context.hadError:
+        sys.exit(65)
+    begin = parser.hooks["BEGIN"]
+    end = parser.hooks["END"]
+
+    interpreter = context.interpreter or Interpreter(context)
+    resolver = Resolver(interpreter)
+    # All at the top level, so variables declared in BEGIN are globals
+    # that stay alive across lines.
+    resolver.resolve(begin + body + end)
+    if context.hadError:
+        sys.exit(65)
+    resolver.varWarnings(resolver.localVars)
+
+    interpreter.interpret(begin)
+    values = interpreter.globals.values
+    lineNum = 0
+    missing = False
+    running = not context.hadRuntimeError
+    for input in (inputs or ["-"]):
+        if not running:
+            break
+        try:
+            # Large buffers, so the input is read in large chunks.
+            if input == "-":
+                file = open(sys.stdin.fileno(), "r", buffering = 1 << 20, closefd = False)
+            else:
+                file = open(input, "r", buffering = 1 << 20)
+        except OSError as error:
+            context.output.error(f"Could not read input file: {input} ({error.strerror}).\n")
+            missing = True
+            continue
+        with file:
+            for text in readLines(file):
+                lineNum += 1
+                interpreter.globals.define("line", String(text), "VAR")
+                interpreter.globals.define("lineNum", float(lineNum), "VAR")
+                running = interpreter.interpretMore(body)
+                if not running:
+                    break
+                if printLines:
+                    context.output.write(interpreter.stringify(values["line"]) + "\n")
+    if running:
+        interpreter.interpretMore(end)
+    finishTasks(context)
+
+    context.output.flush()
+    if context.hadRuntimeError:
+        sys.exit(70)
+    if missing:
+        sys.exit(66)
 
-def runPrompt() -> None:
+def runPrompt(context: LoxContext) -> None:
     while True:
         lines = []
+        context.output.flush()
         print(">>>", end = " ")
         line = input("")
         if line == "":
@@ -140,41 +205,43 @@ def runPrompt() -> None:
                 lines.append(newLine)
             else:
                 break
-        State.fileLines["_REPL_"] = lines
+        context.fileLines["_REPL_"] = lines
         line = line.replace("\t", "    ")
-        run(line)
-        if not State.debugMode:
-            State.hadError = False
+        run(context, line)
+        if not context.debugMode:
+            context.hadError = False
 
-def error(error: BaseError) -> None:
+def error(context: LoxContext, error: BaseError) -> None:
     if type(error) == ScanError:
-        report(error, "")
+        report(context, error, "")
     elif error.token.type == TokenType.EOF: # type: ignore
-        report(error, " at end")
+        report(context, error, " at end")
     else:
-        report(error, " at '" + error.token.lexeme + "'") # type: ignore
+        report(context, error, " at '" + error.token.lexeme + "'") # type: ignore
 
-def report(error: BaseError, where: str) -> None:
+def report(context: LoxContext, error: BaseError, where: str) -> None:
     # Scan errors are different since there are no tokens whose fields we can use.
     line = error.line if (type(error) == ScanError) else error.token.line # type: ignore
     column = error.column if (type(error) == ScanError) else error.token.column # type: ignore
     message = error.message # type: ignore
     lexerFile = error.file if (type(error) == ScanError) else None
+    # Written after anything the program has printed so far.
+    write = context.output.error
 
-    sys.stderr.write(error.__class__.__name__[:-5] + " ")
+    write(error.__class__.__name__[:-5] + " ")
 
     # In debug mode, we treat commands as REPL prompts (and accordingly for error reporting).
-    if State.debugMode:
-        sys.stderr.write(f'error: {message}\n')
-        State.debugError = True
+    if context.debugMode:
+        write(f'error: {message}\n')
+        context.debugError = True
         return
 
-    if not State.linePos:
-        sys.stderr.write(f'error: {message}\n')
+    if not context.linePos:
+        write(f'error: {message}\n')
         if type(error) == RuntimeError:
-            State.hadRuntimeError = True
+            context.hadRuntimeError = True
         else:
-            State.hadError = True
+            context.hadError = True
         return
 
     lexemeLen = 1
@@ -185,53 +252,55 @@ def report(error: BaseError, where: str) -> None:
     fileText = "" if (file == "_REPL_") else f"\"{file}\", "
     # Length = 0 -> token = EOF (no significant column value).
     if lexemeLen == 0:
-        sys.stderr.write(f'error{where} [{fileText}line {line}]: {message}\n')
-        if State.linePrint:
-            printErrorLine(line, file)
+        write(f'error{where} [{fileText}line {line}]: {message}\n')
+        if context.linePrint:
+            printErrorLine(context, line, file)
     elif lexemeLen == 1:
-        sys.stderr.write(f'error{where} [{fileText}line {line}, {column}]: {message}\n')
-        if State.linePrint:
-            printErrorLine(line, file, column, column)
+        write(f'error{where} [{fileText}line {line}, {column}]: {message}\n')
+        if context.linePrint:
+            printErrorLine(context, line, file, column, column)
     else:
-        sys.stderr.write(f'error{where} [{fileText}line {line}, {column}-{column + lexemeLen - 1}]: {message}\n')
-        if State.linePrint:
-            printErrorLine(line, file, column, column + lexemeLen - 1)
+        write(f'error{where} [{fileText}line {line}, {column}-{column + lexemeLen - 1}]: {message}\n')
+        if context.linePrint:
+            printErrorLine(context, line, file, column, column + lexemeLen - 1)
 
     if type(error) == RuntimeError:
-        State.hadRuntimeError = True
+        context.hadRuntimeError = True
     else:
-        State.hadError = True
+        context.hadError = True
 
-def warn(warning) -> None:
+def warn(context: LoxContext, warning) -> None:
     # All warnings that we have (thus far) are given based on
     # static analysis of the code, while debug mode is only
     # on at runtime.
     # Thus, there would be no point altering the warnings to
     # fit the debugger.
-    if State.debugMode:
+    if context.debugMode:
         return
+    write = context.output.error
 
     line = warning.token.line
     column = warning.token.column
     lexemeLen = len(warning.token.lexeme)
     file = warning.token.fileName
 
-    if not State.linePos:
-        sys.stderr.write(f'Warning: {warning.message}')
+    if not context.linePos:
+        write(f'Warning: {warning.message}')
         return
 
     fileText = "" if (file == "_REPL_") else f"\"{file}\", "
     if lexemeLen == 1: 
-        sys.stderr.write(f'Warning [{fileText}line {line}, {column}]: ' + warning.message)
+        write(f'Warning [{fileText}line {line}, {column}]: ' + warning.message)
     else:
-        sys.stderr.write(f'Warning [{fileText}line {line}, {column}-{column + lexemeLen - 1}]: ' + warning.message)
+        write(f'Warning [{fileText}line {line}, {column}-{column + lexemeLen - 1}]: ' + warning.message)
 
 # Not available for REPL (why add it?).
 # Start and end set to None initially in case of error being at end of line.
-def printErrorLine(line: int, file: str, start: int | None = None, 
+def printErrorLine(context: LoxContext, line: int, file: str, start: int | None = None, 
                     end: int | None = None) -> None:
+    write = context.output.error
     # rstrip used so a potential newline at the end of a line does not impact our error message.
-    printLine = State.fileLines[file][line - 1].rstrip('\n') # -1 since line is minimum 1.
+    printLine = context.fileLines[file][line - 1].rstrip('\n') # -1 since line is minimum 1.
     # Strip all the whitespace on the left-side of the line, and record 
     # how much it is shifted to the left (to move the arrows 
     # to the left by the same amount).
@@ -241,23 +310,22 @@ def printErrorLine(line: int, file: str, start: int | None = None,
     if (start != None) and (end != None): # end automatically guaranteed if start is not None
         start -= (prevLineLen - newLineLen)
         end -= (prevLineLen - newLineLen)
-        sys.stderr.write(f"{line} |\t{printLine}\n")
+        write(f"{line} |\t{printLine}\n")
         # Fill space before second vertical bar to align with above line.
-        sys.stderr.write(" ".ljust(len(str(line)) + 1, " "))
-        sys.stderr.write("|\t" + (" " * (start - 1)))
-        sys.stderr.write("^" * (end - start + 1) + '\n')
+        write(" ".ljust(len(str(line)) + 1, " "))
+        write("|\t" + (" " * (start - 1)))
+        write("^" * (end - start + 1) + '\n')
     else:
-        sys.stderr.write(f"{line} |\t{printLine}\n")
-        sys.stderr.write(" ".ljust(len(str(line)) + 1, " "))
-        sys.stderr.write("|\t" + (" " * newLineLen) + "^\n")
-    sys.stderr.flush()
+        write(f"{line} |\t{printLine}\n")
+        write(" ".ljust(len(str(line)) + 1, " "))
+        write("|\t" + (" " * newLineLen) + "^\n")
 
 def fileNameCheck(path: str) -> None:
     if (len(path) < 4) or (path[-4:] != ".lox"):
         sys.stderr.write("Invalid lox file.\n")
         sys.exit(64) # Same issue (bad usage), so same exit code.
 
-def test() -> None:
+def test(jobs: int | None = None) -> None:
     from importlib import import_module
     sys.path.append(os.getcwd() +  "\\Testing\\Python Files")
     module = import_module("generateTests")
@@ -265,18 +333,19 @@ def test() -> None:
     generateFunc("tests")
     with open("Testing/testList.txt") as f:
         lines = f.readlines()
-        if len(lines) == 0:
-            print("No test files available.")
-            exit(0)
-        for line in lines:
-            if line[-1] == '\n':
-                line = line[:-1]
-            path = "Testing/Tests/" + line
-            fileNameCheck(path)
-            runFile(path, line[:-4])
-            path = "Testing/Tests/" + line[:-4] + "Error.lox"
-            fileNameCheck(path)
-            runFile(path, line[:-4])
+    if len(lines) == 0:
+        print("No test files available.")
+        exit(0)
+    names = []
+    for line in lines:
+        if line[-1] == '\n':
+            line = line[:-1]
+        fileNameCheck("Testing/Tests/" + line)
+        fileNameCheck("Testing/Tests/" + line[:-4] + "Error.lox")
+        names.append(line)
+    # Each test file runs in a worker process, in its own context.
+    from TestRunner import runTests
+    runTests(names, jobs)
 
 def clean() -> None:
     lines: list[str] = []
@@ -300,45 +369,93 @@ def clean() -> None:
                 except OSError as error:
                         sys.stderr.write(f"Error cleaning test file {path}:\n{str(error)}")
 
-def stateSetUp() -> None:
+def serve(path: str | None) -> None:
+    from LoxServer import LoxServer
+    # Constructed once here; each script runs on a forked copy of it.
+    global context
+    context = LoxContext()
+    Interpreter(context)
+    LoxServer(path, main, context).serve()
+
+def stateSetUp(context: LoxContext) -> None:
     if len(sys.argv) == 2:
         if sys.argv[1] == "-test":
-            State.testMode = True
+            context.testMode = True
         elif sys.argv[1] == "-clean":
-            State.cleanMode = True
+            context.cleanMode = True
         elif sys.argv[1] == "-linepos":
-            State.Error = True
-            State.linePos = True
+            context.Error = True
+            context.linePos = True
         elif sys.argv[1] == "-error":
-            State.Error = True
-            State.linePos = True
-            State.linePrint = True
+            context.Error = True
+            context.linePos = True
+            context.linePrint = True
         else:
-            State.fileName = sys.argv[1]
-            State.linePos = True
-            State.linePrint = True
+            context.fileName = sys.argv[1]
+            context.linePos = True
+            context.linePrint = True
 
 def main() -> None:
-    stateSetUp()
+    global context
+    if (len(sys.argv) in (2, 3)) and (sys.argv[1] == "-serve"):
+        serve(sys.argv[2] if (len(sys.argv) == 3) else None)
+        return
+    if (len(sys.argv) == 3) and (sys.argv[1] == "-test"):
+        if not sys.argv[2].isdigit() or int(sys.argv[2]) < 1:
+            sys.stderr.write("Usage: plox -test [jobs]\n")
+            sys.exit(64)
+        test(int(sys.argv[2]))
+        return
+    if (len(sys.argv) > 1) and (sys.argv[1] in ("-n", "-p")):
+        if len(sys.argv) < 3:
+            sys.stderr.write(f"Usage: plox {sys.argv[1]} [script] [input files]\n")
+            sys.exit(64)
+        if context == None:
+            context = LoxContext()
+        import atexit
+        atexit.register(context.output.flush)
+        context.fileName = sys.argv[2]
+        context.linePos = True
+        context.linePrint = True
+        context.argv = sys.argv[3:]
+        fileNameCheck(context.fileName)
+        runStream(context, context.fileName, sys.argv[3:], sys.argv[1] == "-p")
+        return
+    if (len(sys.argv) > 1) and (sys.argv[1] == "-jobs"):
+        if (len(sys.argv) < 4) or not sys.argv[2].isdigit() or (int(sys.argv[2]) < 1):
+            sys.stderr.write("Usage: plox -jobs [n] [scripts, globs or job files]\n")
+            sys.exit(64)
+        from BatchRunner import readJobs, runJobs
+        try:
+            jobs = readJobs(sys.argv[3:])
+        except OSError as error:
+            sys.stderr.write(f"Could not read job file: {error.filename}.\n")
+            sys.exit(66)
+        sys.exit(runJobs(jobs, int(sys.argv[2])))
+    if context == None:
+        context = LoxContext()
+    import atexit
+    atexit.register(context.output.flush)
+    stateSetUp(context)
     if len(sys.argv) == 1:
-        runPrompt()
+        runPrompt(context)
     elif len(sys.argv) == 2:
-        if State.testMode:
+        if context.testMode:
             test()
-        elif State.cleanMode:
+        elif context.cleanMode:
             clean()
-        elif State.Error:
-            runPrompt()
+        elif context.Error:
+            runPrompt(context)
         else:
-            fileNameCheck(State.fileName)
-            runFile(State.fileName)
+            fileNameCheck(context.fileName)
+            runFile(context, context.fileName)
     elif len(sys.argv) > 2:
-        State.fileName = sys.argv[1]
-        State.linePos = True
-        State.linePrint = True
-        fileNameCheck(State.fileName)
-        State.argv = sys.argv[2:]
-        runFile(State.fileName)
+        context.fileName = sys.argv[1]
+        context.linePos = True
+        context.linePrint = True
+        fileNameCheck(context.fileName)
+        context.argv = sys.argv[2:]
+        runFile(context, context.fileName)
         # sys.stderr.write("Usage: plox [option or script]\n")
         # sys.exit(64)
 
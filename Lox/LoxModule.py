@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Environment import Environment
+    from Interpreter import Interpreter
+    from Stmt import Stmt
+    from Token import Token
+
+# A Lox file imported with GetLib or GetFile.
+# Each file is compiled (scanned and parsed) once per process and kept in State.modules,
+# then resolved once and run once per context (in its own environment, kept in 
+# the context's moduleEnvironments) the first time it is fetched.
+# Every importer after that gets a ModuleBinding for each of that environment's names.
+class LoxModule:
+    def __init__(self, path: str, fileName: str, lines: list[str]) -> None:
+        self.path = path
+        # Name used for the file in tokens and error messages, and its lines.
+        self.fileName = fileName
+        self.lines = lines
+        # None while the file is still being compiled (used to detect circular imports).
+        self.statements: list[Stmt] | None = None
+        # Top-level names bound by the module, with their declaring tokens (set by the resolver).
+        self.names: dict[str, Token] | None = None
+
+# Placeholder for a module's top-level class or function that has not been
+# defined yet. The declaration is only run (in the module's environment) 
+# the first time the name is looked up, so unused library classes cost nothing.
+class LazyBinding:
+    def __init__(self, interpreter: Interpreter, declaration: Stmt.Class | Stmt.Function, 
+                 environment: Environment) -> None:
+        self.interpreter = interpreter
+        self.declaration = declaration
+        self.environment = environment
+        self.defined = False
+
+    def force(self) -> Any:
+        if not self.defined:
+            # Run directly (not through execute()), so line hooks don't see it.
+            interpreter = self.interpreter
+            previous = interpreter.environment
+            try:
+                interpreter.environment = self.environment
+                self.declaration.accept(interpreter)
+            finally:
+                interpreter.environment = previous
+            self.defined = True
+        return self.environment.values[self.declaration.name.lexeme]
+
+    # Shared by every environment it was copied into.
+    def __deepcopy__(self, memo: dict) -> LazyBinding:
+        return self
+
+# An imported name in the importer's environment, forwarding to the module's own binding,
+# so every importer sees (and makes) later assignments to the module's top-level variables.
+class ModuleBinding:
+    def __init__(self, environment: Environment, name: str) -> None:
+        self.environment = environment
+        self.name = name
+
+    def force(self) -> Any:
+        value = self.environment.values[self.name]
+        if type(value) == LazyBinding:
+            value = value.force()
+            self.environment.values[self.name] = value
+        return value
+
+    def __deepcopy__(self, memo: dict) -> ModuleBinding:
+        return self
@@ -0,0 +1,132 @@
+import os
+import signal
+import socket
+import sys
+import traceback
+from typing import Callable
+
+from LoxClient import socketPath
+from LoxContext import LoxContext
+from Parser import Parser
+from Token import Token, TokenType
+
+# The interpreter's install directory (holding Lox, Modules and Libraries),
+# wherever the process is started from.
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files in one of the install directories (none if it is missing).
+def installed(directory: str) -> list[str]:
+    path = os.path.join(root, directory)
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.listdir(path))
+
+# Loads the Python modules, the GetMod modules and the parsed library files,
+# so that scripts run from this process (or its forked children) start warm.
+# Used by server mode and by batch jobs (-jobs).
+def warmUp(context: LoxContext) -> None:
+    from NativeModule import nativeModule
+    for file in installed("Modules"):
+        if file.endswith(".py") and (file != "__init__.py"):
+            nativeModule(file[:-3])
+
+    # Libraries are only parsed here, not resolved or run (that still
+    # happens per script, so warnings and errors show up as usual).
+    # They are cached by absolute path, so a script run from another directory
+    # (whose GetLib refers to that directory's Libraries) never gets these by mistake.
+    parser = Parser([], context)
+    libraries = os.path.join(root, "Libraries")
+    for file in installed("Libraries"):
+        if file.endswith(".lox"):
+            path = os.path.join(libraries, file)
+            name = Token(TokenType.STRING, f'"{file[:-4]}"', None, 0, 0, path)
+            parser.fetchModule(path, name, "No such library file.")
+
+class LoxServer:
+    '''
+    Runs Lox scripts sent by clients (LoxClient.py) from one warm process.
+    Python modules, the GetMod modules, and the parsed library files are loaded
+    once, before accepting requests. Each request then runs in a forked child,
+    so every script starts from this clean state and nothing it does
+    (globals, context, imports, output) leaks into the next one.
+    The child takes over the client's stdin/stdout/stderr (passed over the socket)
+    and reports the script's exit code back when done.
+    '''
+
+    def __init__(self, path: str | None, main: Callable[[], None], 
+                 context: LoxContext) -> None:
+        self.path = path or socketPath()
+        # LoxMain's main(), run in the child with the client's arguments.
+        self.main = main
+        # Context main() runs scripts in (each child gets its own copy).
+        self.context = context
+
+    def serve(self) -> None:
+        warmUp(self.context)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(64)
+        # Finished children are reaped automatically.
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        sys.stderr.write(f"plox server listening on {self.path}\n")
+        try:
+            while True:
+                connection, _ = server.accept()
+                try:
+                    message, fds, _, _ = socket.recv_fds(connection, 65536, 3)
+                except OSError:
+                    connection.close()
+                    continue
+                # Anything still buffered would be written twice otherwise.
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    # The child must never get back into the accept loop.
+                    try:
+                        server.close()
+                        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                        code = self.runRequest(message.decode().split("\0"), fds, connection)
+                        connection.sendall(f"exit {code}\n".encode())
+                    finally:
+                        os._exit(0)
+                connection.close()
+                for fd in fds:
+                    os.close(fd)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            os.unlink(self.path)
+
+    # Runs in the child process.
+    # request is the client's working directory followed by its arguments.
+    def runRequest(self, request: list[str], fds: list[int],
+                   connection: socket.socket) -> int:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", closefd = False)
+        sys.stdout = open(1, "w", closefd = False)
+        sys.stderr = open(2, "w", buffering = 1, closefd = False)
+        code = 0
+        try:
+            connection.sendall(f"pid {os.getpid()}\n".encode())
+            os.chdir(request[0])
+            sys.argv = [sys.argv[0]] + request[1:]
+            self.main()
+        except SystemExit as exit:
+            if type(exit.code) == int:
+                code = exit.code
+            elif exit.code != None:
+                sys.stderr.write(f"{exit.code}\n")
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 70
+        # No atexit handlers run in the child.
+        self.context.output.flush()
+        sys.stderr.flush()
+        return code
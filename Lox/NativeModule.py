@@ -0,0 +1,136 @@
+from __future__ import annotations
+from typing import Any, Callable, TYPE_CHECKING
+
+import os
+import sys
+from ByteBuffer import ByteBuffer
+from Environment import Environment
+from Error import RuntimeError
+from List import List
+from LoxCallable import LoxCallable, NativeCallable
+import State
+from String import String
+
+if TYPE_CHECKING:
+    from Expr import Expr
+    from Interpreter import Interpreter
+    from LoxClass import LoxClass
+
+'''
+Native (GetMod) modules are Python files in the "Modules" directory, each making a
+NativeModule named after the file, and declaring its functions on it once:
+
+    example = NativeModule("example")
+    example.function("repeat", repeat, [STRING, INTEGER], required = 1)
+
+Every function declares its parameters' types (the ones after the first "required"
+are optional). The argument checks and the arity are built from these once, when the
+module is loaded, so a call only checks each argument's type and then calls the
+implementation, as implementation(function, interpreter, expr, *arguments).
+Like every other callable, the implementation returns () when it has no value.
+Methods of objects returned by a module (e.g., files) are declared the same way, as
+NativeFunctions in a class's methods; they are bound to the instance they are called on.
+Each module is loaded once per process, and shared by every context importing it.
+'''
+
+class Param:
+    '''
+    The type a parameter accepts (the name is used in error messages), and
+    how its value is passed to the implementation (e.g., numbers as int).
+    '''
+
+    def __init__(self, name: str, types: tuple[type, ...] | None,
+                 convert: Callable[[Any], Any] | None = None,
+                 negative: str | None = None) -> None:
+        self.name = name
+        # None accepts any value.
+        self.types = types
+        self.convert = convert
+        # Error message for negative values (None if they are allowed).
+        self.negative = negative
+
+    def accepts(self, value: Any) -> bool:
+        if self.types == None:
+            return True
+        # Exact types (as everywhere in the interpreter), except for abstract ones like LoxCallable.
+        return (type(value) in self.types) or isinstance(value, self.types)
+
+    # The same parameter, but rejecting negative values with the given message.
+    def counting(self, message: str) -> Param:
+        return Param(self.name, self.types, self.convert, message)
+
+NUMBER = Param("number", (float,))
+# A number passed on as an int (e.g., a count or a position).
+INTEGER = Param("number", (float,), int)
+STRING = Param("string", (String,))
+BOOLEAN = Param("boolean", (bool,))
+LIST = Param("list", (List,))
+BYTES = Param("bytes", (ByteBuffer,))
+FUNCTION = Param("function", (LoxCallable,))
+ANY = Param("any", None)
+
+class NativeFunction(NativeCallable):
+    def __init__(self, name: str, implementation: Callable, params: list[Param],
+                 required: int | None = None) -> None:
+        if required == None:
+            required = len(params)
+        super().__init__(name, implementation, [required, len(params)])
+        self.params = params
+        self.mismatch = "Arguments do not match accepted parameter types.\n" \
+                        "Types are: " + ", ".join(param.name for param in params) + "."
+        # Only parameters that do something beyond the type check.
+        self.special = any((param.convert != None) or (param.negative != None) for param in params)
+
+    def call(self, interpreter: Interpreter, expr: Expr.Call, arguments: list[Any]) -> Any:
+        params = self.params
+        for index, argument in enumerate(arguments):
+            if not params[index].accepts(argument):
+                raise RuntimeError(expr.rightParen, self.mismatch)
+        if self.special:
+            for index, argument in enumerate(arguments):
+                param = params[index]
+                if (param.negative != None) and (int(argument) < 0):
+                    raise RuntimeError(expr.rightParen, param.negative)
+                if param.convert != None:
+                    arguments[index] = param.convert(argument)
+        return self.implementation(self, interpreter, expr, *arguments)
+
+class NativeModule:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.environment = Environment()
+
+    def function(self, name: str, implementation: Callable, params: list[Param] = [],
+                 required: int | None = None, kind: type = NativeFunction) -> NativeFunction:
+        function = kind(name, implementation, params, required)
+        self.environment.define(name, function, "VAR")
+        return function
+
+    # Declares a method of a class made by the module (e.g., the class of its file objects).
+    def method(self, klass: LoxClass, name: str, implementation: Callable, params: list[Param] = [],
+               required: int | None = None, kind: type = NativeFunction) -> NativeFunction:
+        function = kind(name, implementation, params, required)
+        klass.public[name] = function
+        return function
+
+    def constant(self, name: str, value: Any) -> None:
+        self.environment.define(name, value, "FIX")
+
+# Returns the environment of the native module with the given name (None if there is none),
+# loading the module the first time.
+def nativeModule(name: str) -> Environment | None:
+    with State.modulesLock:
+        environment = State.nativeModules.get(name, None)
+        if environment == None:
+            from importlib import import_module
+            path = os.getcwd() + "/Modules"
+            sys.path.append(path)
+            try:
+                module = import_module(name)
+            except ModuleNotFoundError:
+                return None
+            finally:
+                sys.path.remove(path)
+            environment = getattr(module, name).environment
+            State.nativeModules[name] = environment
+        return environment
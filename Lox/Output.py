@@ -0,0 +1,64 @@
+import sys
+from typing import TextIO
+
+class Output:
+    '''
+    Buffer for everything the running program writes to stdout (print, echo, etc.).
+    Flush policies:
+    - "line": flush after every write (used when stdout is a terminal).
+    - "block": flush once the buffer holds at least size characters (pipes and files).
+    - None: pick one of the above from stdout (re-checked if sys.stdout is replaced).
+    A size of 0 disables buffering.
+    Anything written to stderr and any read from stdin should call flush() first,
+    so output stays in order when both streams go to the same place.
+    The streams default to whatever sys.stdout and sys.stderr are when written to.
+    '''
+
+    def __init__(self, size: int, policy: str | None = None, 
+                 stdout: TextIO | None = None, stderr: TextIO | None = None) -> None:
+        self.size = size
+        self.policy = policy
+        self.stdout = stdout
+        self.stderr = stderr
+        self.buffer: list[str] = []
+        self.length = 0
+        # Stream the current policy was picked for.
+        self.stream = None
+        self.lineMode = False
+
+    def target(self) -> TextIO:
+        return self.stdout or sys.stdout
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+        self.length += len(text)
+        if self.target() is not self.stream:
+            self.setStream()
+        if self.lineMode or (self.length >= self.size):
+            self.flush()
+
+    # Writes a message to stderr, after anything already printed.
+    def error(self, text: str) -> None:
+        self.flush()
+        stream = self.stderr or sys.stderr
+        stream.write(text)
+        stream.flush()
+
+    def flush(self) -> None:
+        stream = self.target()
+        if self.length != 0:
+            # The stream may have changed since the last write (e.g., test output piping).
+            stream.write("".join(self.buffer))
+            self.buffer.clear()
+            self.length = 0
+        stream.flush()
+
+    def setStream(self) -> None:
+        self.stream = self.target()
+        if self.policy == None:
+            try:
+                self.lineMode = self.stream.isatty()
+            except (AttributeError, ValueError):
+                self.lineMode = False
+        else:
+            self.lineMode = (self.policy == "line")
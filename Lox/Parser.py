@@ -1,17 +1,53 @@
-from typing import Any
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
 
 from Token import TokenType, Token
 from Expr import Expr
 from Stmt import Stmt
 from Error import ParseError
+from LoxModule import LoxModule
 from Warning import returnWarning
 from String import String
 import State
 
+if TYPE_CHECKING:
+    from LoxContext import LoxContext
+
+# Table for the operator-precedence (Pratt) expression parser.
+# Maps each binary operator to its binding power and the minimum binding power
+# of its right operand. Left-associative operators bind their right operand
+# one level tighter; right-associative ones (ternary, exponent) at their own level.
+# From loosest to tightest: or, and, ternary, equality, comparison, term, factor, 
+# (prefix unary), exponent.
+infixRules: dict[TokenType, tuple[int, int]] = {
+    TokenType.OR:               (1, 2),
+    # The right operand of 'and' is an equality (a ternary cannot follow 'and').
+    TokenType.AND:              (2, 4),
+    TokenType.Q_MARK:           (3, 3),
+    TokenType.BANG_EQUAL:       (4, 5),
+    TokenType.EQUAL_EQUAL:      (4, 5),
+    TokenType.GREATER:          (5, 6),
+    TokenType.GREATER_EQUAL:    (5, 6),
+    TokenType.LESS:             (5, 6),
+    TokenType.LESS_EQUAL:       (5, 6),
+    TokenType.MINUS:            (6, 7),
+    TokenType.PLUS:             (6, 7),
+    TokenType.SLASH:            (7, 8),
+    TokenType.STAR:             (7, 8),
+    TokenType.MOD:              (7, 8),
+    TokenType.POWER:            (9, 9)
+}
+
+# Binding power of prefix ! and - (their operand is parsed at this level too).
+unaryPower = 8
+
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+    def __init__(self, tokens: list[Token], context: LoxContext) -> None:
         self.current = 0
         self.tokens = tokens
+        self.context = context
+        # True while parsing a function body (static variables are only allowed there).
+        self.parsingFunction = False
         # Will be None when not in a loop, "forLoop" when within a for-loop, 
         # and "whileLoop" when within a while-loop.
         self.loopType: str | None = None
@@ -23,19 +59,41 @@ class Parser:
         # fields.
         self.inClass = False
         self.inInit = False
+        # Bodies of the top-level BEGIN { ... } and END { ... } blocks, 
+        # collected in streaming mode (plox -n/-p) only.
+        self.hooks: dict[str, list[Stmt]] | None = None
     
     def parse(self) -> list[Stmt]:
         statements: list[Stmt] = []
         while not self.isAtEnd():
             try:
+                if (self.hooks != None) and self.checkHook():
+                    name = self.advance().lexeme
+                    self.advance()
+                    self.hooks[name].extend(self.block())
+                    continue
                 statements.append(self.declaration())
             except ParseError as error:
                 self.synchronize()
-                error.show()
+                error.show(self.context)
         
         return statements
     
     def declaration(self) -> Stmt:
+        # Record the first token of every statement so line events
+        # (breakpoints, stepping, coverage) know where it is.
+        start = self.peek()
+        stmt = self.parseDeclaration()
+        stmt.start = start
+        return stmt
+
+    def statement(self) -> Stmt:
+        start = self.peek()
+        stmt = self.parseStatement()
+        stmt.start = start
+        return stmt
+
+    def parseDeclaration(self) -> Stmt:
         # Moved the try-catch block from here to parse() instead.
         # Avoid the inclusion of None-value declarations in the statement list.
 
@@ -55,7 +113,7 @@ class Parser:
             return self.varDeclaration("FIX", False)
         
         if self.match(TokenType.STATE):
-            if State.parsingFunction:
+            if self.parsingFunction:
                 return self.varDeclaration("VAR", True)
             else:
                 raise ParseError(self.previous(),
@@ -76,7 +134,7 @@ class Parser:
         
         return self.statement()
             
-    def statement(self) -> Stmt:
+    def parseStatement(self) -> Stmt:
         if self.match(TokenType.ATTEMPT):
             return self.errorStatement()
         if self.match(TokenType.BREAK):
@@ -166,45 +224,61 @@ class Parser:
         name = self.consume(TokenType.STRING, "Expect name of import.")
         self.consume(TokenType.SEMICOLON, "Expect ';' after fetch statement.")
 
+        fetch = Stmt.Fetch(mode, name)
         if mode.lexeme[3:] == "Lib":
-            from Scanner import Scanner
             file = "Libraries/" + name.lexeme[1:-1] + ".lox"
-            try:
-                with open(file, "r") as f:
-                    text = f.read()
-                f.close()
-                import State as State
-                with open(file, "r") as f:
-                    lines = f.readlines()
-                    lines = [line.rstrip() for line in lines]
-                    State.fileLines[file] = lines
-            except FileNotFoundError:
-                raise ParseError(name, "No such library file.")
-            scanner = Scanner(text, file)
-            newTokens = scanner.scanTokens()[:-1]
-            self.tokens[self.current:self.current] = newTokens
+            fetch.module = self.fetchModule(file, name, "No such library file.")
 
         elif mode.lexeme[3:] == "File":
-            from Scanner import Scanner
             file = name.lexeme[1:-1]
             if (len(file) < 4) or (file[-4:] != ".lox"):
                 raise ParseError(name, "Invalid Lox file.")
+            fetch.module = self.fetchModule(file, name, "File not found.")
+
+        return fetch
+
+    # Compiles an imported file into a module, or returns the already-compiled one.
+    def fetchModule(self, file: str, name: Token, notFound: str) -> LoxModule:
+        import os
+        # Other threads (contexts) may be fetching the same file.
+        with State.modulesLock:
+            path = os.path.realpath(file)
+            module = State.modules.get(path, None)
+            if module != None:
+                if module.statements == None:
+                    raise ParseError(name, "Circular import.")
+                # Compiled by another context, which has the lines for error messages.
+                if module.fileName not in self.context.fileLines:
+                    self.context.fileLines[module.fileName] = module.lines
+                return module
+
             try:
                 with open(file, "r") as f:
                     text = f.read()
-                f.close()
-                import State as State
-                with open(file, "r") as f:
-                    lines = f.readlines()
-                    lines = [line.rstrip() for line in lines]
-                    State.fileLines[file] = lines
             except FileNotFoundError:
-                raise ParseError(name, "File not found.")
-            scanner = Scanner(text, file)
-            newTokens = scanner.scanTokens()[:-1]
-            self.tokens[self.current:self.current] = newTokens
+                raise ParseError(name, notFound)
 
-        return Stmt.Fetch(mode, name)
+            from Scanner import Scanner
+            module = LoxModule(path, file, [line.rstrip() for line in text.split("\n")])
+            self.context.fileLines[file] = module.lines
+            State.modules[path] = module
+            # Scan and parse errors are reported (through hadError) rather than raised,
+            # so the flag is cleared to tell whether this file had any.
+            hadError = self.context.hadError
+            self.context.hadError = False
+            try:
+                tokens = Scanner(text, file, self.context).scanTokens()
+                module.statements = Parser(tokens, self.context).parse()
+            except BaseException:
+                State.modules.pop(path)
+                raise
+            finally:
+                failed = self.context.hadError
+                self.context.hadError = hadError or failed
+            # A partly parsed module is not kept, so every fetch reports its errors.
+            if failed:
+                State.modules.pop(path)
+            return module
 
     def rangeForLoop(self, initType) -> Stmt.Block:
         iterator = self.consume(TokenType.IDENTIFIER, "Expect iterator variable name.")
@@ -441,7 +515,7 @@ class Parser:
         # Report a warning if any code follows a return statement in the same scope.
         if (not self.check(TokenType.RIGHT_BRACE)) and (not self.isAtEnd()):
             if not self.inStructure:
-                returnWarning(self.peek()).warn()
+                returnWarning(self.peek()).warn(self.context)
 
         return Stmt.Return(keyword, value)
 
@@ -525,8 +599,8 @@ class Parser:
         return (defaultFound, defaults, variadic)
 
     def function(self, kind) -> Stmt.Function:
-        inFunction = State.parsingFunction
-        State.parsingFunction = True
+        inFunction = self.parsingFunction
+        self.parsingFunction = True
 
         # Default in case of unassigned lambda.
         funcName = None
@@ -561,7 +635,7 @@ class Parser:
         body = self.block()
 
         self.inInit = prevInit
-        State.parsingFunction = inFunction
+        self.parsingFunction = inFunction
         return Stmt.Function(funcName, parameters, body, defaults)
     
     def block(self) -> list[Stmt]:
@@ -638,7 +712,7 @@ class Parser:
                        TokenType.POST_INC,
                        TokenType.POST_DEC)
 
-        expr = self.orExpr()
+        expr = self.operators()
 
         if self.match(TokenType.EQUAL):
             equals = self.previous()
@@ -682,97 +756,45 @@ class Parser:
         
         return expr
     
-    def orExpr(self) -> Expr:
-        expr = self.andExpr()
-
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.andExpr()
-            expr = Expr.Logical(expr, operator, right)
-        
-        return expr
-    
-    def andExpr(self) -> Expr:
-        expr = self.ternary()
-
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Expr.Logical(expr, operator, right)
-        
-        return expr
-    
-    # Ternary implementation my own.
-    def ternary(self) -> Expr:
-        expr = self.equality()
-
-        while self.match(TokenType.Q_MARK):
-            left = self.expression()
-            self.consume(TokenType.COLON,
-                        "Expect colon separator between ternary operator branches.")
-            right = self.ternary()
-            expr = Expr.Ternary(expr, left, right)
-        
-        return expr
-
-    def equality(self) -> Expr:
-        expr = self.comparison()
-
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Expr.Binary(expr, operator, right)
-        
-        return expr
-    
-    def comparison(self) -> Expr:
-        expr = self.term()
-
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, 
-                         TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Expr.Binary(expr, operator, right)
-        
-        return expr
-    
-    def term(self) -> Expr:
-        expr = self.factor()
-
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Expr.Binary(expr, operator, right)
-        
-        return expr
-    
-    def factor(self) -> Expr:
-        expr = self.unary()
-
-        # Added the modulus operator (same precedence as * and /).
-        while self.match(TokenType.SLASH, TokenType.STAR, TokenType.MOD):
-            operator = self.previous()
-            right = self.unary()
-            expr = Expr.Binary(expr, operator, right)
-        
-        return expr
-    
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Expr.Unary(operator, right)
+    # Parses all binary, logical, ternary and prefix unary operators 
+    # using the infixRules table, instead of one method per precedence level.
+    # Only operators binding at least as tightly as minPower are consumed.
+    def operators(self, minPower: int = 1) -> Expr:
+        if (minPower <= unaryPower) and (self.peek().type in (TokenType.BANG, TokenType.MINUS)):
+            operator = self.advance()
+            right = self.operators(unaryPower)
+            expr = Expr.Unary(operator, right)
+        else:
+            expr = self.call()
         
-        return self.exponent()
-    
-    def exponent(self) -> Expr:
-        expr = self.call()
-
-        while self.match(TokenType.POWER):
-            operator = self.previous()
-            # Exponent operator is right-associative.
-            right = self.exponent()
-            expr = Expr.Binary(expr, operator, right)
+        # Once an operator is applied, no looser operator in this loop can be 
+        # followed by a tighter one (which would have been part of its right operand).
+        ceiling = None
+        while True:
+            rule = infixRules.get(self.peek().type, None)
+            if rule == None:
+                break
+            power, rightPower = rule
+            if (power < minPower) or ((ceiling != None) and (power > ceiling)):
+                break
+            operator = self.advance()
+            ceiling = power
+
+            match operator.type:
+                case TokenType.OR | TokenType.AND:
+                    right = self.operators(rightPower)
+                    expr = Expr.Logical(expr, operator, right)
+                # Ternary implementation my own.
+                case TokenType.Q_MARK:
+                    left = self.expression()
+                    self.consume(TokenType.COLON,
+                                "Expect colon separator between ternary operator branches.")
+                    right = self.operators(rightPower)
+                    expr = Expr.Ternary(expr, left, right)
+                case _:
+                    # Exponent operator is right-associative.
+                    right = self.operators(rightPower)
+                    expr = Expr.Binary(expr, operator, right)
         
         return expr
     
@@ -905,6 +927,11 @@ class Parser:
             return False
         return (self.peek().type == type)
 
+    # BEGIN/END followed by '{' (never the start of a valid statement otherwise).
+    def checkHook(self) -> bool:
+        return (self.check(TokenType.IDENTIFIER) and (self.peek().lexeme in ("BEGIN", "END"))
+                and (self.peekNext().type == TokenType.LEFT_BRACE))
+
     def advance(self) -> Token:
         if not self.isAtEnd():
             self.current += 1
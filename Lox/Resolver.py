@@ -1,15 +1,22 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
 from Expr import Expr
 from Stmt import Stmt
 from Token import Token, TokenType
 from Error import StaticError
 from enum import Enum
-from Interpreter import Interpreter
 from Warning import unusedWarning
 
+if TYPE_CHECKING:
+    from Interpreter import Interpreter
+
 class Resolver:
     def __init__(self, interpreter: Interpreter) -> None:
         self.interpreter = interpreter
-        self.scopes: list[dict[Token, bool]] = []
+        # Scopes map each name to its declaring token (for warnings) 
+        # and whether it has been defined yet.
+        self.scopes: list[dict[str, tuple[Token, bool]]] = []
         self.FunctionType = Enum('FunctionType', 'NONE, FUNCTION, LAMBDA, INITIALIZER, METHOD')
         self.classType = Enum('classType', 'NONE, CLASS, SUBCLASS')
         self.currentFunction = self.FunctionType.NONE
@@ -37,11 +44,10 @@ class Resolver:
             return
         
         scope = self.scopes[-1]
-        for key in scope.keys():
-            if key.lexeme == name.lexeme:
-                raise StaticError(name, "Already a variable with this name in this scope.")
+        if name.lexeme in scope:
+            raise StaticError(name, "Already a variable with this name in this scope.")
         
-        scope[name] = False
+        scope[name.lexeme] = (name, False)
         # Add the token instead of the lexeme in case its fields are required for error-reporting.
         # False = has not been used in this scope; using a list since a tuple is immutable.
         self.localVars[name] = [name.line, False]
@@ -52,7 +58,10 @@ class Resolver:
         if len(self.scopes) == 0:
             return
         
-        self.scopes[-1][name] = True
+        scope = self.scopes[-1]
+        # Keep the declaring token, if any.
+        token = scope.get(name.lexeme, (name, False))[0]
+        scope[name.lexeme] = (token, True)
 
     def resolve(self, target: Expr | Stmt | list[Stmt]) -> None:
         if type(target) == list:
@@ -62,20 +71,20 @@ class Resolver:
             try:
                 target.accept(self)
             except StaticError as error:
-                error.show()
+                error.show(self.interpreter.context)
     
     def resolveLocal(self, expr: Expr, name: Token) -> None:
         size = len(self.scopes)
 
         for i in range(size - 1, -1, -1): # -1 increment to iterate in reverse
-            for key in self.scopes[i].keys():
-                if key.lexeme == name.lexeme:
-                    self.interpreter.resolve(expr, size - 1 - i)
-                    if not self.inAssign:
-                        # True = has been used in this scope 
-                        # (in other than an assignment).
-                        self.localVars[key][1] = True
-                    return
+            entry = self.scopes[i].get(name.lexeme, None)
+            if entry != None:
+                self.interpreter.resolve(expr, size - 1 - i)
+                if not self.inAssign:
+                    # True = has been used in this scope 
+                    # (in other than an assignment).
+                    self.localVars[entry[0]][1] = True
+                return
     
     def resolveFunction(self, function: Stmt.Function, funcType) -> None:
         enclosingFunction = self.currentFunction
@@ -121,7 +130,7 @@ class Resolver:
 
         # Issue the warnings.
         for var in varList:
-            unusedWarning(var).warn()
+            unusedWarning(var).warn(self.interpreter.context)
     
     def visitBreakStmt(self, stmt: Stmt.Break) -> None:
         pass
@@ -202,7 +211,35 @@ class Resolver:
         self.resolve(stmt.expression)
     
     def visitFetchStmt(self, stmt: Stmt.Fetch) -> None:
-        pass
+        module = stmt.module
+        if module == None: # GetMod.
+            return
+        if module.path not in self.interpreter.context.resolvedModules:
+            self.resolveModule(module)
+        
+        # The module's bindings are copied into the importing scope when it runs.
+        if len(self.scopes) != 0:
+            scope = self.scopes[-1]
+            for name, token in module.names.items():
+                scope[name] = (token, True)
+                self.localVars[token] = [token.line, True]
+    
+    # Modules are resolved once per context (so each run gets its warnings), on their own, 
+    # with their top-level bindings in a scope of their own (the module's environment at runtime).
+    def resolveModule(self, module) -> None:
+        self.interpreter.context.resolvedModules.add(module.path)
+        resolver = Resolver(self.interpreter)
+        resolver.beginScope()
+        resolver.resolve(module.statements)
+        scope = resolver.scopes[-1]
+        module.names = {name: entry[0] for name, entry in scope.items()}
+        # Top-level bindings are used by the importers.
+        for token in module.names.values():
+            if token in resolver.localVars.keys():
+                resolver.localVars[token][1] = True
+        resolver.endScope()
+        if not self.interpreter.context.hadError:
+            resolver.varWarnings(resolver.localVars)
     
     def visitFunctionStmt(self, stmt: Stmt.Function) -> None:
         self.declare(stmt.name)
@@ -352,9 +389,8 @@ class Resolver:
     def visitVariableExpr(self, expr: Expr.Variable) -> None:
         if len(self.scopes) != 0:
             # Check that variable in expression is declared (but not yet defined) in current scope.
-            scope = self.scopes[-1]
-            for key in scope.keys():
-                if (key.lexeme == expr.name.lexeme) and (scope.get(key, None) == False):
-                    raise StaticError(expr.name, "Cannot read local variable in its own initializer.")
+            entry = self.scopes[-1].get(expr.name.lexeme, None)
+            if (entry != None) and (entry[1] == False):
+                raise StaticError(expr.name, "Cannot read local variable in its own initializer.")
         
         self.resolveLocal(expr, expr.name)
\ No newline at end of file
@@ -1,8 +1,12 @@
-from typing import Any
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
 
 from Token import Token, TokenType
 from Error import ScanError
 
+if TYPE_CHECKING:
+    from LoxContext import LoxContext
+
 class Scanner:
     source = str()
     tokens: list[Token] = []
@@ -49,9 +53,10 @@ class Scanner:
     }
 
     # fileName is None for debugger.
-    def __init__(self, source: str, fileName: str | None) -> None:
+    def __init__(self, source: str, fileName: str | None, context: LoxContext) -> None:
         self.source = source
         self.fileName = fileName
+        self.context = context
 
     def scanTokens(self) -> list[Token]:
         # Reset the list to be empty so that it is ready for each new line/file.
@@ -62,7 +67,7 @@ class Scanner:
             try:
                 self.scanToken()
             except ScanError as error:
-                error.show()
+                error.show(self.context)
         self.tokens.append(Token(TokenType.EOF, "", None, self.line, self.column, self.fileName))
         return self.tokens
 
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Any, Callable, TYPE_CHECKING
+
+import threading
+
+if TYPE_CHECKING:
+    import asyncio
+    from Expr import Expr
+    from Interpreter import Interpreter
+    from LoxCallable import LoxCallable
+    from LoxContext import LoxContext
+
+'''
+Tasks let a program overlap slow operations (e.g., reading many files, or waiting on stdin).
+spawn(function, args...) starts a Lox function as a task, and the async I/O functions
+(fileIO's afileread/afilewrite, userIO's ainline) start an I/O task on the event loop.
+await(task) waits for a task and returns its result.
+
+Only one task runs Lox code at a time: it holds the scheduler's baton (a lock) and only
+gives it up while it is awaiting, letting another task run in the meantime.
+Each task has its own interpreter state (environment, call stack, current function/class),
+which is swapped in and out along with the baton.
+I/O tasks never run Lox code, so any number of them can be in progress at once.
+When a run ends, file I/O tasks still in progress are finished (see finish()),
+while reads from stdin, which may never get any input, are abandoned.
+'''
+
+class LoxTask:
+    def __init__(self, kind: str) -> None:
+        self.kind = kind # "function" or "I/O".
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def finish(self, result: Any, error: BaseException | None) -> None:
+        self.result = result
+        self.error = error
+        self.done.set()
+
+    # A task is a handle to one running operation, so copies (e.g., in a copied list) share it.
+    def __deepcopy__(self, memo: dict) -> LoxTask:
+        return self
+
+    def __str__(self) -> str:
+        return f"<{self.kind} task>"
+
+class Scheduler:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        self.baton = threading.Lock()
+        # The program's main task is already running.
+        self.baton.acquire()
+        # Event loop for I/O tasks (started on first use, in its own thread).
+        self.loop: asyncio.AbstractEventLoop | None = None
+        # I/O tasks on the event loop that are not done yet.
+        self.pending: set[LoxTask] = set()
+
+    # The interpreter state belonging to the running task.
+    def save(self) -> tuple:
+        interpreter = self.interpreter
+        context = interpreter.context
+        return (interpreter.environment, interpreter.loopLevel, interpreter.ExprStmt,
+                context.callStack, context.inMethod, context.currentClass, context.currentFunction)
+
+    def restore(self, state: tuple) -> None:
+        interpreter = self.interpreter
+        context = interpreter.context
+        (interpreter.environment, interpreter.loopLevel, interpreter.ExprStmt,
+         context.callStack, context.inMethod, context.currentClass, context.currentFunction) = state
+
+    def spawn(self, function: LoxCallable, expr: Expr.Call, arguments: list[Any]) -> LoxTask:
+        task = LoxTask("function")
+
+        def run() -> None:
+            self.baton.acquire()
+            # A new task starts from the global scope, with an empty call stack.
+            self.restore((self.interpreter.globals, 0, False, [], False, None, None))
+            try:
+                result = function.call(self.interpreter, expr, arguments)
+                task.finish(None if type(result) == tuple else result, None)
+            except BaseException as error:
+                task.finish(None, error)
+            finally:
+                self.baton.release()
+
+        threading.Thread(target = run, daemon = True).start()
+        return task
+
+    def eventLoop(self) -> asyncio.AbstractEventLoop:
+        if self.loop == None:
+            # Only imported when needed, to keep startup fast.
+            import asyncio
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target = self.loop.run_forever, daemon = True).start()
+        return self.loop
+
+    # Runs a blocking I/O function (which must not touch the interpreter) as a task.
+    def io(self, function: Callable, *arguments: Any) -> LoxTask:
+        import asyncio
+        task = LoxTask("I/O")
+        self.pending.add(task)
+
+        def finished(future) -> None:
+            self.pending.discard(task)
+            task.finish(None if future.exception() else future.result(), future.exception())
+
+        future = asyncio.run_coroutine_threadsafe(asyncio.to_thread(function, *arguments),
+                                                  self.eventLoop())
+        future.add_done_callback(finished)
+        return task
+
+    # Runs a read from stdin as a task. It runs in a daemon thread rather than on the
+    # event loop (whose threads are joined when the process exits), so a read that
+    # never gets any input does not keep the program from ending.
+    def input(self, function: Callable) -> LoxTask:
+        task = LoxTask("I/O")
+
+        def run() -> None:
+            try:
+                result = function()
+            except BaseException as error:
+                task.finish(None, error)
+                return
+            task.finish(result, None)
+
+        threading.Thread(target = run, daemon = True).start()
+        return task
+
+    # Called when a run ends: waits for the I/O tasks still in progress (e.g., file writes
+    # that were never awaited, which would otherwise be lost). Their errors are dropped,
+    # as nothing awaits them.
+    def finish(self) -> None:
+        for task in list(self.pending):
+            task.done.wait()
+
+    def wait(self, task: LoxTask) -> Any:
+        if not task.done.is_set():
+            state = self.save()
+            self.baton.release()
+            try:
+                task.done.wait()
+            finally:
+                self.baton.acquire()
+                self.restore(state)
+        if task.error != None:
+            raise task.error
+        return task.result
+
+# Each context gets its own scheduler (created on first use).
+def scheduler(interpreter: Interpreter) -> Scheduler:
+    context = interpreter.context
+    if context.scheduler == None:
+        context.scheduler = Scheduler(interpreter)
+    return context.scheduler
+
+# Finishes the context's outstanding I/O tasks (if it ever started any).
+def finishTasks(context: LoxContext) -> None:
+    if context.scheduler != None:
+        context.scheduler.finish()
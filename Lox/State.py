@@ -1,37 +1,19 @@
-# File to handle multiple shared ("global") variables across interpreter files.
+# Settings and caches shared by every interpreter context in the process.
+# Everything belonging to a single run lives in its LoxContext instead.
 
-# For handling command-line arguments to the interpreter (used in LoxMain).
-fileName: str
-testMode = False
-cleanMode = False
-Error = False # True if "-error" or "-linepos" options have been used.
-linePos = False # True if line-position info should be printed.
-linePrint = False # True if error lines should be printed.
-argv = []
+# Maximum number of calls kept in each context's trace log (0 disables it).
+traceLogSize = 64
 
-# For error-handling.
-hadError = False # If a lex error, parse error, or resolve error occurred during their respective stages.
-hadRuntimeError = False # If a runtime error occurred during the interpreter stage.
-# Dictionary containing all the lines in the file being executed (to print out lines containing errors) 
-# with their associated file name.
-fileLines = dict()
+# For program output (print, echo, etc.).
+outputBufferSize = 65536 # In characters (0 disables buffering).
+outputPolicy = None # "line", "block", or None (line-buffered on a terminal, block-buffered otherwise).
 
-# For debug option (files only).
-inAFile = False # Whether or not we are running a file or command-line prompts.
-switchCLI = False # Whether or not to end file execution and switch to terminal CLI.
-debugMode = False # Whether or not we are in a debug session (will alter format of error-reporting).
-debugError = False
-callStack = list()
-traceLog = list()
-breakpoints = []
-
-replDebug = False
-
-# For access to private fields within methods.
-inMethod = False
-currentClass = None
-
-# For static variables in functions.
-from LoxFunction import LoxFunction
-parsingFunction = False # For parsing error-handling.
-currentFunction: LoxFunction | None = None
\ No newline at end of file
+# Compiled GetLib/GetFile modules, by file path.
+# Only the parsed statements (and the names they bind) are kept here;
+# running them is up to each context.
+modules = dict()
+# Environments of the native (GetMod) modules loaded so far, by module name.
+nativeModules = dict()
+# Held while fetching a module (re-entrant, since compiling a module fetches its own imports).
+from threading import RLock
+modulesLock = RLock()
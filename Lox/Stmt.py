@@ -1,5 +1,7 @@
 class Stmt:
 	class Break:
+		start = None
+
 		def __init__(self, breakCMD, loopType):
 			self.breakCMD = breakCMD
 			self.loopType = loopType
@@ -8,6 +10,8 @@ class Stmt:
 			visitor.visitBreakStmt(self)
 
 	class Block:
+		start = None
+
 		def __init__(self, statements):
 			self.statements = statements
 
@@ -15,6 +19,8 @@ class Stmt:
 			visitor.visitBlockStmt(self)
 
 	class Class:
+		start = None
+
 		def __init__(self, name, superclass, private, public, classMethods):
 			self.name = name
 			self.superclass = superclass
@@ -26,6 +32,8 @@ class Stmt:
 			visitor.visitClassStmt(self)
 
 	class Continue:
+		start = None
+
 		def __init__(self, continueCMD, loopType):
 			self.continueCMD = continueCMD
 			self.loopType = loopType
@@ -34,6 +42,8 @@ class Stmt:
 			visitor.visitContinueStmt(self)
 
 	class Error:
+		start = None
+
 		def __init__(self, body, errors, handler):
 			self.body = body
 			self.errors = errors
@@ -43,6 +53,8 @@ class Stmt:
 			visitor.visitErrorStmt(self)
 
 	class Expression:
+		start = None
+
 		def __init__(self, expression):
 			self.expression = expression
 
@@ -50,6 +62,9 @@ class Stmt:
 			visitor.visitExpressionStmt(self)
 
 	class Fetch:
+		start = None
+		module = None
+
 		def __init__(self, mode, name):
 			self.mode = mode
 			self.name = name
@@ -58,6 +73,8 @@ class Stmt:
 			visitor.visitFetchStmt(self)
 
 	class Function:
+		start = None
+
 		def __init__(self, name, params, body, defaults):
 			self.name = name
 			self.params = params
@@ -68,6 +85,8 @@ class Stmt:
 			visitor.visitFunctionStmt(self)
 
 	class Group:
+		start = None
+
 		def __init__(self, name, vars, functions, classes):
 			self.name = name
 			self.vars = vars
@@ -78,6 +97,8 @@ class Stmt:
 			visitor.visitGroupStmt(self)
 
 	class If:
+		start = None
+
 		def __init__(self, condition, thenBranch, elseBranch):
 			self.condition = condition
 			self.thenBranch = thenBranch
@@ -87,6 +108,8 @@ class Stmt:
 			visitor.visitIfStmt(self)
 
 	class List:
+		start = None
+
 		def __init__(self, name, initializer):
 			self.name = name
 			self.initializer = initializer
@@ -95,6 +118,8 @@ class Stmt:
 			visitor.visitListStmt(self)
 
 	class Match:
+		start = None
+
 		def __init__(self, value, cases, default):
 			self.value = value
 			self.cases = cases
@@ -104,6 +129,8 @@ class Stmt:
 			visitor.visitMatchStmt(self)
 
 	class Print:
+		start = None
+
 		def __init__(self, expression):
 			self.expression = expression
 
@@ -111,6 +138,8 @@ class Stmt:
 			visitor.visitPrintStmt(self)
 
 	class Report:
+		start = None
+
 		def __init__(self, keyword, exception):
 			self.keyword = keyword
 			self.exception = exception
@@ -119,6 +148,8 @@ class Stmt:
 			visitor.visitReportStmt(self)
 
 	class Return:
+		start = None
+
 		def __init__(self, keyword, value):
 			self.keyword = keyword
 			self.value = value
@@ -127,6 +158,8 @@ class Stmt:
 			visitor.visitReturnStmt(self)
 
 	class Var:
+		start = None
+
 		def __init__(self, name, equals, initializer, access, static):
 			self.name = name
 			self.equals = equals
@@ -138,6 +171,8 @@ class Stmt:
 			visitor.visitVarStmt(self)
 
 	class While:
+		start = None
+
 		def __init__(self, condition, body):
 			self.condition = condition
 			self.body = body
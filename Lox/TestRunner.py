@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from LoxContext import LoxContext
+
+'''
+Runs the test files (plox -test) across a pool of worker processes.
+Each test file and its Error variant run in a fresh context whose output is
+captured in memory; the results come back in the order of testList.txt and
+are only then written to Testing/Output (for the generated pytest scripts).
+'''
+
+# Runs one test file and its Error variant, in a worker process.
+def runTest(name: str) -> dict:
+    from LoxMain import runFile
+    baseName = name[:-4]
+    result = {"name": name, "output": "", "error": "", "messages": "", "time": 0.0}
+    start = time.perf_counter()
+    for path in ("Testing/Tests/" + name, "Testing/Tests/" + baseName + "Error.lox"):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        context = LoxContext(stdout = stdout, stderr = stderr)
+        context.testMode = True
+        try:
+            runFile(context, path)
+        except SystemExit:
+            pass
+        context.output.flush()
+        result["output"] += stdout.getvalue()
+        if "Error" in path:
+            result["error"] = stderr.getvalue()
+        else:
+            # Anything the regular test writes to stderr (e.g., warnings) is not
+            # part of its expected output, but is still shown.
+            result["messages"] = stderr.getvalue()
+    result["time"] = time.perf_counter() - start
+    return result
+
+def runTests(names: list[str], jobs: int | None = None) -> None:
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers = jobs) as pool:
+        # map() keeps the results in submission order.
+        results = list(pool.map(runTest, names))
+    total = time.perf_counter() - start
+
+    os.makedirs("Testing/Output", exist_ok = True)
+    for result in results:
+        baseName = result["name"][:-4]
+        with open(f"Testing/Output/{baseName}Output.txt", "w") as file:
+            file.write(result["output"])
+        with open(f"Testing/Output/{baseName}Error.txt", "w") as file:
+            file.write(result["error"])
+        if result["messages"] != "":
+            sys.stderr.write(result["messages"])
+        print(f"{result["time"] * 1000:9.1f} ms  {result["name"]}")
+
+    busy = sum(result["time"] for result in results)
+    print(f"Ran {len(results)} test files in {total:.2f} s ({busy:.2f} s of test time).")
@@ -1,6 +1,8 @@
 from typing import Any
 
 from enum import Enum
+import sys
+from threading import Lock
 
 TokenType = Enum('TokenType', 
                  'LEFT_PAREN, RIGHT_PAREN, LEFT_BRACE, RIGHT_BRACE, LEFT_BRACKET, RIGHT_BRACKET, ' 
@@ -13,16 +15,49 @@ TokenType = Enum('TokenType',
                  'SLASH_EQUALS, POST_INC, POST_DEC, FIX, GROUP, MATCH, IS, FALLTHROUGH, END,' \
                  'DOUBLE_LEFT_BRACE, DOUBLE_RIGHT_BRACE, STATE')
 
+# Every token used to carry its own reference to its file's name.
+# File names are instead stored once here, and tokens keep a small id into the table.
+fileNames: list[str | None] = [None] # Id 0 is for dummy tokens.
+fileIds: dict[str | None, int] = {None: 0}
+# Held while adding a file (files are scanned by several threads, e.g., in threaded contexts).
+fileIdsLock = Lock()
+
+def fileId(fileName: str | None) -> int:
+    id = fileIds.get(fileName, None)
+    if id == None:
+        with fileIdsLock:
+            # Another thread may have added it in the meantime.
+            id = fileIds.get(fileName, None)
+            if id == None:
+                id = len(fileNames)
+                fileNames.append(fileName)
+                fileIds[fileName] = id
+    return id
+
 class Token:
+    # Tokens are kept alive by the AST for error reporting, so they are kept small:
+    # no attribute dictionary, interned lexemes (identifiers and keywords repeat a lot),
+    # and a file id in place of the file name.
+    __slots__ = ("type", "lexeme", "literal", "line", "column", "fileId")
+
     def __init__(self, type: TokenType, lexeme: str, literal: Any, 
                     line: int, column: int, fileName: str | None) -> None:
         # fileName is None for dummy tokens.
         self.type = type
-        self.lexeme = lexeme
+        self.lexeme = sys.intern(lexeme)
         self.literal = literal
         self.line = line
         self.column = column
-        self.fileName = fileName
+        self.fileId = fileId(fileName)
+    
+    @property
+    def fileName(self) -> str | None:
+        return fileNames[self.fileId]
+    
+    # File ids are only valid in this process, so pickled tokens (e.g., sent to a worker
+    # process) carry the file name itself.
+    def __reduce__(self) -> tuple:
+        return (Token, (self.type, self.lexeme, self.literal, self.line, self.column, self.fileName))
     
     def toString(self) -> str:
         if self.type.name != "EOF":
@@ -0,0 +1,24 @@
+from collections import deque
+from typing import Iterator
+
+# Fixed-capacity record of the most recent function calls (used by the
+# debugger's "log" instruction).
+# Backed by a deque with a maximum length, so recording a call is O(1)
+# and the oldest entries are dropped once the log is full.
+# A capacity of 0 disables the log entirely.
+class TraceLog:
+    def __init__(self, size: int) -> None:
+        self.entries: deque[dict] = deque(maxlen = size)
+
+    def record(self, funcData: dict) -> None:
+        self.entries.append(funcData)
+
+    def enabled(self) -> bool:
+        return (self.entries.maxlen != 0)
+
+    # Most recent call first.
+    def __iter__(self) -> Iterator[dict]:
+        return reversed(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
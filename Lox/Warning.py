@@ -1,23 +1,29 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
 from Expr import Expr
 from LoxInstance import LoxInstance
 from Token import Token
 
+if TYPE_CHECKING:
+    from LoxContext import LoxContext
+
 # Warning raised if code appears after return statement within the same scope.
 class returnWarning(Warning):
     def __init__(self, token: Token) -> None:
         self.token = token # The token appearing after the return statement.
         self.message = "code found after return statement (will be ignored).\n"
-    def warn(self) -> None:
+    def warn(self, context: LoxContext) -> None:
         from LoxMain import warn
-        warn(self)
+        warn(context, self)
 
 class unusedWarning(Warning):
     def __init__(self, token: Token) -> None:
         self.token = token
         self.message = "unused local variable found.\n"
-    def warn(self) -> None:
+    def warn(self, context: LoxContext) -> None:
         from LoxMain import warn
-        warn(self)
+        warn(context, self)
 
 class UserWarning(Warning):
     def __init__(self, warning: LoxInstance, expression: Expr) -> None:
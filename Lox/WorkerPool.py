@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import Any, TYPE_CHECKING
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import repeat
+from Error import RuntimeError
+from List import List
+from LoxFunction import LoxFunction
+from Stmt import Stmt
+from String import String
+
+if TYPE_CHECKING:
+    from Interpreter import Interpreter
+    from Token import Token
+
+'''
+Runs Lox functions in a pool of worker processes (for the parallel module).
+Each worker is sent the program's top-level declarations (functions, classes, groups and
+imports, already parsed and resolved) once, when it starts, and runs them to define the
+same functions as the program. A call then only sends the function's position among the
+declarations and its arguments.
+Global variables are not sent, so the functions should only use their arguments.
+Values cross between processes as plain Python data: numbers, Booleans and nil as they are,
+strings as str and lists as list (which pickle far smaller and faster than String and List).
+'''
+
+# Turns a Lox value into plain data for another process.
+def encode(value: Any, token: Token) -> Any:
+    if (value == None) or (type(value) in (float, bool)):
+        return value
+    if type(value) == String:
+        return value.text
+    if type(value) == List:
+        return [encode(element, token) for element in value.array]
+    raise RuntimeError(token, "Only numbers, Booleans, nil, strings and lists can be sent to or from a worker.")
+
+def decode(value: Any) -> Any:
+    if type(value) == str:
+        return String(value)
+    if type(value) == list:
+        return List([decode(element) for element in value])
+    return value
+
+# ------------------------------------------------------------
+# Worker side.
+
+# The worker process's interpreter, and its functions by position among the declarations.
+worker: dict[str, Any] = {}
+
+def startWorker(declarations: list[Stmt]) -> None:
+    from Interpreter import Interpreter
+    from LoxContext import LoxContext
+    context = LoxContext()
+    interpreter = Interpreter(context)
+    context.interpreter = interpreter
+    functions: dict[int, LoxFunction] = {}
+    worker["interpreter"] = interpreter
+    worker["functions"] = functions
+    worker["error"] = None
+    try:
+        for index, statement in enumerate(declarations):
+            interpreter.execute(statement)
+            if type(statement) == Stmt.Function:
+                functions[index] = interpreter.globals.values[statement.name.lexeme]
+    except RuntimeError as error:
+        worker["error"] = ("error", error.token, error.message)
+    context.output.flush()
+
+# Returns ("value", result) or ("error", token, message).
+def runCall(index: int, arguments: list[Any]) -> tuple:
+    if worker["error"] != None:
+        return worker["error"]
+    interpreter = worker["interpreter"]
+    function = worker["functions"][index]
+    try:
+        result = function.call(interpreter, None, [decode(argument) for argument in arguments])
+        if type(result) == tuple: # No return value.
+            result = None
+        return ("value", encode(result, function.declaration.name))
+    except RuntimeError as error:
+        return ("error", error.token, error.message)
+    except RecursionError:
+        return ("error", function.declaration.name, "Recursion limit exceeded.")
+    finally:
+        interpreter.context.output.flush()
+
+# ------------------------------------------------------------
+# Program side.
+
+def outcome(result: tuple) -> Any:
+    if result[0] == "error":
+        raise RuntimeError(result[1], result[2])
+    return decode(result[1])
+
+class WorkerPool:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.declarations = list(interpreter.declarations)
+        self.workers = os.cpu_count() or 1
+        # Forked workers start with the interpreter's modules already loaded.
+        if "fork" in multiprocessing.get_all_start_methods():
+            method = multiprocessing.get_context("fork")
+        else:
+            method = None
+        # Output still buffered here would otherwise be copied into forked workers.
+        interpreter.context.output.flush()
+        self.pool = ProcessPoolExecutor(max_workers = self.workers, mp_context = method,
+                                        initializer = startWorker, initargs = (self.declarations,))
+
+    # The function's position among the declarations sent to the workers.
+    def index(self, function: Any, token: Token) -> int:
+        if type(function) == LoxFunction:
+            for index, statement in enumerate(self.declarations):
+                if statement is function.declaration:
+                    return index
+        raise RuntimeError(token, "Only top-level functions can run in a worker.")
+
+    def map(self, function: LoxFunction, items: List, token: Token) -> List:
+        index = self.index(function, token)
+        arguments = [[encode(item, token)] for item in items.array]
+        # Sending the items in chunks saves a round trip per item.
+        chunk = max(1, len(arguments) // (self.workers * 4))
+        results = self.pool.map(runCall, repeat(index), arguments, chunksize = chunk)
+        return List([outcome(result) for result in results])
+
+    def submit(self, function: LoxFunction, arguments: List, token: Token) -> Future:
+        index = self.index(function, token)
+        return self.pool.submit(runCall, index, [encode(argument, token) for argument in arguments.array])
+
+    def shutdown(self) -> None:
+        # Calls already submitted still finish.
+        self.pool.shutdown(wait = False)
+
+# Each context gets its own pool, created on first use.
+# It is replaced once the program has more declarations than its workers were sent.
+def workerPool(interpreter: Interpreter) -> WorkerPool:
+    context = interpreter.context
+    pool = context.workerPool
+    if (pool == None) or (len(pool.declarations) != len(interpreter.declarations)):
+        if pool != None:
+            pool.shutdown()
+        context.workerPool = WorkerPool(interpreter)
+    return context.workerPool
@@ -1,7 +1,8 @@
 from io import TextIOWrapper
 import os
 
-def defineAST(directory: str, classes: list[str], file: TextIOWrapper) -> None:
+def defineAST(directory: str, classes: list[str], extras: dict[str, list[str]], 
+              file: TextIOWrapper) -> None:
     file.write(f"class {directory}:\n")
 
     for entry in classes:
@@ -10,6 +11,12 @@ def defineAST(directory: str, classes: list[str], file: TextIOWrapper) -> None:
         fields = parts[1].split(",")
 
         file.write(f"\tclass {className}:\n")
+        # Class-level defaults for attributes filled in after construction.
+        attributes = extras.get("*", []) + extras.get(className, [])
+        for attribute in attributes:
+            file.write(f"\t\t{attribute} = None\n")
+        if len(attributes) != 0:
+            file.write("\n")
         file.write(f"\t\tdef __init__(self")
         for field in fields:
             field = field.strip()
@@ -46,6 +53,18 @@ ExprClasses = [ "Access     : object, operator, start, end",
                 "Unary      : operator, right",
                 "Variable   : name"]
 
+# Attributes filled in after construction ("*" applies to every class).
+# Get/Set: inline cache of the last instance shape seen and its field slot, as one 
+# (shape, slot) tuple so it is replaced in a single step (nodes of imported modules
+# are shared by every context in the process).
+# Variable/Assign/This/Super: scope depth found by the resolver (None for globals).
+ExprExtras = {"Get"      : ["cache"],
+              "Set"      : ["cache"],
+              "Variable" : ["depth"],
+              "Assign"   : ["depth"],
+              "This"     : ["depth"],
+              "Super"    : ["depth"]}
+
 StmtClasses = [ "Break      : breakCMD, loopType",
                 "Block      : statements",
                 "Class      : name, superclass, private, public, classMethods",
@@ -64,12 +83,17 @@ StmtClasses = [ "Break      : breakCMD, loopType",
                 "Var        : name, equals, initializer, access, static",
                 "While      : condition, body"]
 
+# start: first token of the statement (set by the parser, used for line events).
+# Fetch: compiled module for GetLib/GetFile (None for GetMod).
+StmtExtras = {"*"      : ["start"],
+              "Fetch"  : ["module"]}
+
 scriptDir = os.path.dirname(__file__) # scriptDir = 'Lox/utils'
 
 targetPath = os.path.join(scriptDir, "..", "Expr.py")
 with open(os.path.abspath(targetPath), "w") as f:
-    defineAST("Expr", ExprClasses, f)
+    defineAST("Expr", ExprClasses, ExprExtras, f)
 
 targetPath = os.path.join(scriptDir, "..", "Stmt.py")
 with open(os.path.abspath(targetPath), "w") as f:
-    defineAST("Stmt", StmtClasses, f)
\ No newline at end of file
+    defineAST("Stmt", StmtClasses, StmtExtras, f)
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+'''
+Measures cold-start time: running an empty Lox script, from launching the
+interpreter until it exits (i.e., time-to-first-statement, since there is nothing to run).
+The time for starting a bare Python process is measured as well and reported separately,
+so the remaining time is what plox itself spends on imports and setup.
+Both run with -S (no site module), which would otherwise add a lot of noise.
+Must be run from the project's root directory:
+    python3 Lox/utils/StartupBenchmark.py [runs]
+'''
+
+def timeCommand(command: list[str], runs: int) -> list[float]:
+    times = []
+    for i in range(0, runs):
+        start = time.perf_counter()
+        subprocess.run(command, check = True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def report(label: str, times: list[float]) -> None:
+    print(f"{label:<12} min {min(times) * 1000:7.1f} ms   median {statistics.median(times) * 1000:7.1f} ms")
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+with tempfile.TemporaryDirectory() as directory:
+    script = os.path.join(directory, "empty.lox")
+    open(script, "w").close()
+
+    # One untimed run so compiled bytecode is cached.
+    subprocess.run([sys.executable, "-S", "Lox/LoxMain.py", script], check = True)
+
+    python = timeCommand([sys.executable, "-S", "-c", "pass"], runs)
+    plox = timeCommand([sys.executable, "-S", "Lox/LoxMain.py", script], runs)
+
+report("python", python)
+report("plox", plox)
+print(f"plox startup (excluding Python): {(statistics.median(plox) - statistics.median(python)) * 1000:.1f} ms")
@@ -2,15 +2,18 @@ import os
 import sys
 sys.path.append(os.getcwd() +  "/Lox")
 from importlib import import_module as im
-Environment = getattr(im("Environment"), "Environment")
-LoxCallable = getattr(im("LoxCallable"), "LoxCallable")
+NativeModule = im("NativeModule")
 LoxClass = getattr(im("LoxClass"), "LoxClass")
 LoxInstance = getattr(im("LoxInstance"), "LoxInstance")
 RuntimeError = getattr(im("Error"), "RuntimeError")
 List = getattr(im("List"), "List")
 String = getattr(im("String"), "String")
+LineStream = getattr(im("LineStream"), "LineStream")
+ByteBuffer = getattr(im("ByteBuffer"), "ByteBuffer")
+scheduler = getattr(im("Scheduler"), "scheduler")
 sys.path.pop()
 import io
+import re
 
 '''
 Needed operations:
@@ -23,11 +26,12 @@ Additional: handle multiple input/output streams.
 
 - File input.
 1) Reading X characters from a file - fd.
-2) Reading X bytes from a file (as bytes) - fd.
+2) Reading X bytes from a file (as bytes), or reading into existing bytes - fd.
 3) Reading a word from a file - fd.
 4) Reading a line from a file - fd.
 5) Reading entire file into a single string - fd.
 6) Reading entire file (or certain number of lines) into list of lines - fd.
+7) Reading the lines of a file lazily, as a stream - fd.
 Additional: add option in each one to shift or not shift file pointer.
 
 - File output.
@@ -40,138 +44,180 @@ Additional: add option in each one to shift or not shift file pointer.
 3) Move cursor to very beginning or very end - fd.
 4) Check if cursor is at the end of the file - fd.
 
+- Memory-mapped files.
+1) Mapping a file (read-only or read-write) - path/name.
+2) Size, byte ranges (as bytes or text), searching, and reading lines - map.
+3) Writing to a position (read-write maps only) - map.
+
+- Asynchronous file I/O.
+1) Reading a whole file, or writing/appending a whole string, as a task - path/name.
+
 '''
 
 
 '''
-To add a function:
-1. Add its name to "functions" list below.
-2. Add its mode to the match-case structure in call().
-3. Add a function definition for it below call (syntax: f_[function name]).
-4. Add a case for it under check().
-5. Add a check function (syntax: check_[function name]) for it to validate its arguments.
-6. Add its name and arity in the match-case within arity().
-7. Make any necessary changes to fileIOSetUp below to accommodate the new function.
+To add a function (or a file/map method), write its implementation below (syntax: f_[function name],
+taking the interpreter and the call expression before its arguments, and returning () if it
+has no value), then declare it in the tables at the end of the file, with its parameter types.
 '''
 
-fileIO = Environment()
-functions = ["filemake", "fileopen", "filehas", "fileremove", "filedrop", "fileflush",
-             "filechars", "filebytes", "fileword", "fileline", "filelines", "fileall",
-             "filewrite", "fileput",
-             "filejump", "fileskip", "filelimits", "filepos", "feof"]
+fileIO = NativeModule.NativeModule("fileIO")
+
+# Size of the chunks read by fileReader (in characters).
+chunkSize = 1 << 16
+
+class fileReader:
+    '''
+    Buffered reading for fileword, filechars, fileline and feof.
+    The file is read in large chunks, and words, lines, etc. are found within
+    the chunk (with str.find or a regex), from a logical cursor (index).
+    The file's own cursor stays after the end of the buffer until another
+    operation needs it, at which point sync() moves it back to the logical cursor.
+    '''
+
+    wordPattern = re.compile(r"\S+")
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.index = 0
+        # File position at which each chunk in the buffer starts, with the
+        # chunk's offset in the buffer (empty when nothing is buffered).
+        self.chunks: list[tuple[int, int]] = []
+
+    # Reads another chunk into the buffer. Returns False at the end of the file.
+    def fill(self) -> bool:
+        if self.index == len(self.buffer):
+            # Nothing left to keep in the buffer; start a new one.
+            self.chunks = []
+            self.buffer = ""
+            self.index = 0
+        elif len(self.chunks) > 1:
+            # Drop the chunks before the one the cursor is in.
+            while (len(self.chunks) > 1) and (self.chunks[1][1] <= self.index):
+                self.chunks.pop(0)
+            drop = self.chunks[0][1]
+            self.chunks = [(position, offset - drop) for position, offset in self.chunks]
+            self.buffer = self.buffer[drop:]
+            self.index -= drop
+        position = self.file.tell()
+        chunk = self.file.read(chunkSize)
+        if chunk == "":
+            return False
+        self.chunks.append((position, len(self.buffer)))
+        self.buffer += chunk
+        return True
 
-class fileFunction(LoxCallable):
-    def __init__(self, mode: str):
-        self.mode = mode
+    # Puts the file's cursor back at the logical cursor, and empties the buffer.
+    def sync(self) -> None:
+        if len(self.chunks) == 0:
+            return
+        if self.index < len(self.buffer):
+            position, offset = self.chunks[0]
+            for chunk in self.chunks:
+                if chunk[1] <= self.index:
+                    position, offset = chunk
+            self.file.seek(position)
+            self.file.read(self.index - offset)
+        self.chunks = []
+        self.buffer = ""
+        self.index = 0
+
+    # Reads up to (and past) the next occurrence of char, returning the text before it.
+    def readUntil(self, char: str, move: bool) -> str:
+        end = self.buffer.find(char, self.index)
+        while end == -1:
+            # Characters after the cursor already searched.
+            searched = len(self.buffer) - self.index
+            if not self.fill():
+                break
+            end = self.buffer.find(char, self.index + searched)
+        if end == -1:
+            text = self.buffer[self.index:]
+            end = len(self.buffer)
+        else:
+            text = self.buffer[self.index:end]
+            end += 1
+        if move:
+            self.index = end
+        return text
+
+    def chars(self, n: int, move: bool) -> str:
+        while (len(self.buffer) - self.index < n) and self.fill():
+            pass
+        text = self.buffer[self.index:self.index + n]
+        if move:
+            self.index += len(text)
+        return text
+
+    def word(self, move: bool) -> str:
+        match = self.wordPattern.search(self.buffer, self.index)
+        # The word may continue into the next chunk.
+        while ((match == None) or (match.end() == len(self.buffer))) and self.fill():
+            match = self.wordPattern.search(self.buffer, self.index)
+        if match == None:
+            if move:
+                self.index = len(self.buffer)
+            return ""
+        if move:
+            # The whitespace character after the word is read as well.
+            self.index = min(match.end() + 1, len(self.buffer))
+        return match.group()
+
+    def atEnd(self) -> bool:
+        return (self.index == len(self.buffer)) and not self.fill()
+
+    # Reads lines as they are needed (for streams).
+    def lines(self):
+        while not self.atEnd():
+            yield String(self.readUntil("\n", True))
+
+class fileFunction(NativeModule.NativeFunction):
+    def __init__(self, name, implementation, params, required = None):
+        super().__init__(name, implementation, params, required)
         self.fd = io.StringIO()
+        self.reader = None
         self.movepos = True
+        # Any method not reading through the fileReader works on the file itself,
+        # from the logical cursor.
+        self.syncs = name not in bufferedModes
 
     def bind(self, fileObj):
-        self.fd = fileObj.public.get("fd", None)
-        self.movepos = fileObj.public.get("movepos", None)
+        self.fd = fileObj.field("fd")
+        self.reader = fileObj.field("reader")
+        self.movepos = fileObj.field("movepos")
     
     def call(self, interpreter, expr, arguments):
-        try:
-            self.check(expr, arguments)
-        except RuntimeError as error:
-            raise error
-        
-        match self.mode:
-            case "filemake":
-                # No need to handle errors raised from the functions here.
-                # Any errors raised will traverse the call stack until they reach the Interpreter,
-                # where they are properly dealt with.
-                if len(arguments) == 3:
-                    return self.f_filemake(expr, arguments[0], arguments[1], arguments[2])
-                elif len(arguments) == 2:
-                    return self.f_filemake(expr, arguments[0], arguments[1])
-                elif len(arguments) == 1:
-                    return self.f_filemake(expr, arguments[0])
-            case "fileopen":
-                if len(arguments) == 2:
-                    return self.f_fileopen(expr, arguments[0], arguments[1])
-                elif len(arguments) == 1:
-                    return self.f_fileopen(expr, arguments[0])
-            case "filehas":
-                return self.f_filehas(expr, arguments[0])
-            case "fileremove":
-                self.f_fileremove(expr, arguments[0])
-                return ()
-            case "filedrop":
-                self.f_filedrop()
-                return ()
-            case "fileflush":
-                self.f_fileflush()
-                return ()
-
-            case "filechars":
-                return self.f_filechars(expr, int(arguments[0]))
-            case "filebytes":
-                return self.f_filebytes(expr, int(arguments[0]))
-            case "fileword":
-                return self.f_fileword(expr)
-            case "fileline":
-                return self.f_fileline(expr)
-            case "filelines":
-                if len(arguments) == 1:
-                    return self.f_filelines(expr, int(arguments[0]))
-                elif len(arguments) == 0:
-                    return self.f_filelines(expr)
-            case "fileall":
-                return self.f_fileall(expr)
-            
-            case "filewrite":
-                if len(arguments) == 2:
-                    self.f_filewrite(expr, arguments[0], arguments[1])
-                elif len(arguments) == 1:
-                    self.f_filewrite(expr, arguments[0])
-                return ()
-            case "fileput":
-                if len(arguments) == 3:
-                    self.f_fileput(expr, arguments[0], arguments[1], arguments[2])
-                elif len(arguments) == 2:
-                    self.f_fileput(expr, arguments[0], arguments[1])
-                return ()
-            
-            case "filejump":
-                self.f_filejump(expr, arguments[0])
-                return ()
-            case "fileskip":
-                self.f_fileskip(expr, arguments[0])
-                return ()
-            case "filelimits":
-                self.f_filelimits(expr, arguments[0])
-                return ()
-            case "filepos":
-                return self.f_filepos(expr)
-            case "feof":
-                return self.f_feof(expr)
+        if (self.reader != None) and self.syncs:
+            try:
+                self.reader.sync()
+            except ValueError:
+                raise RuntimeError(expr.leftParen, "File is closed.")
+        return super().call(interpreter, expr, arguments)
     
     # ------------------------------------------------------------
 
     # Helper methods.
 
     def filesize(self, fd, expr): # expr is the expression of the main function, not filesize.
-        # If we run the function multiple times, our file cursor will shift forward each time.
-        # Thus, we must return to our original position in the file each time.
-        previous = 0
+        # The size (in bytes, like cursor positions) comes from the file's metadata,
+        # so it takes the same time for any file size.
+        # Writes still in the buffer are flushed first, so that they are counted.
         try:
-            previous = fd.tell()
-            fd.seek(0) # Read from the beginning of the file.
-            content = fd.read()
-            fd.seek(previous)
-            return len(content)
+            fd.flush()
+            return os.fstat(fd.fileno()).st_size
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
 
     # File handling.
 
-    def f_filemake(self, expr, path, makedirs = False, movepos = True):
+    def f_filemake(self, interpreter, expr, path, makedirs = False, movepos = True):
         try:
             instance = LoxInstance(fileRef)
             open(path.text, "x").close() # Just create the file.
-            instance.public["fd"] = open(path.text, "r+")
-            instance.public["movepos"] = movepos
+            instance.setField("fd", open(path.text, "r+"))
+            instance.setField("reader", fileReader(instance.field("fd")), "private")
+            instance.setField("movepos", movepos)
             return instance
         except FileExistsError:
             raise RuntimeError(expr.rightParen, "File already exists.")
@@ -195,20 +241,21 @@ class fileFunction(LoxCallable):
                 raise RuntimeError(expr.rightParen, 
                                    f"Error creating file '{path}':\n{str(error)}")
 
-    def f_fileopen(self, expr, path, movepos = True):
+    def f_fileopen(self, interpreter, expr, path, movepos = True):
         try:
             instance = LoxInstance(fileRef)
-            instance.public["fd"] = open(path.text, "r+")
-            instance.public["movepos"] = movepos
+            instance.setField("fd", open(path.text, "r+"))
+            instance.setField("reader", fileReader(instance.field("fd")), "private")
+            instance.setField("movepos", movepos)
             return instance
         except FileNotFoundError:
             raise RuntimeError(expr.rightParen, "File does not exist.")
     
-    def f_filehas(self, expr, path):
+    def f_filehas(self, interpreter, expr, path):
         from pathlib import Path
         return Path(path.text).is_file()
     
-    def f_fileremove(self, expr, path):
+    def f_fileremove(self, interpreter, expr, path):
         import os
         if os.path.exists(path.text): # Check that file exists.
             try:
@@ -218,91 +265,101 @@ class fileFunction(LoxCallable):
                 raise RuntimeError(expr.rightParen, f"Error deleting file '{path.text}':\n{str(error)}")
         else:
             raise RuntimeError(expr.rightParen, "File not found.")
+        return ()
     
-    def f_filedrop(self):
+    # Asynchronous file I/O.
+    # These return a task straight away, and do the I/O on the scheduler's event loop
+    # (await() gives the task's result, or raises its error).
+
+    def f_afileread(self, interpreter, expr, path):
+        def read():
+            with open(path.text) as file:
+                return String(file.read())
+        return scheduler(interpreter).io(read)
+
+    def f_afilewrite(self, interpreter, expr, path, string, append: bool = False):
+        def write():
+            with open(path.text, "a" if append else "w") as file:
+                file.write(string.text)
+        return scheduler(interpreter).io(write)
+
+    def f_filedrop(self, interpreter, expr):
         self.fd.close()
+        return ()
     
-    def f_fileflush(self):
+    def f_fileflush(self, interpreter, expr):
         self.fd.flush()
+        return ()
     
     # File input.
 
-    def f_filechars(self, expr, n: int, delim: bool = False):
+    def f_filechars(self, interpreter, expr, n: int, delim: bool = False):
         try:
-            previous = self.fd.tell()
-            chars = ""
             if delim:
-                char = ""
-                while True:
-                    char = self.fd.read(1)
-                    if char == '\n':
-                        break
-                    chars += char
-            else:
-                chars = self.fd.read(n)
-            if not self.movepos:
-                self.fd.seek(previous)
-            return String(chars)
+                return String(self.reader.readUntil("\n", self.movepos)[:n])
+            return String(self.reader.chars(n, self.movepos))
         except ValueError: # File is closed.
             raise RuntimeError(expr.leftParen, "File is closed.")
     
-    def f_filebytes(self, expr, n: int, delim: bool = False):
+    # Bytes are read from the binary layer under the (text) file object,
+    # from the same position; the text layer is then moved to where the reading ended.
+    def f_filebytes(self, interpreter, expr, n: int, delim: bool = False):
         try:
-            file = open(self.fd, "rb") # Opening here again to read as bytes instead.
+            self.fd.flush()
             previous = self.fd.tell()
-            nbytes = b""
+            file = self.fd.buffer
+            file.seek(previous)
             if delim:
-                char = b""
-                while True:
-                    char = file.read(1)
-                    if (char == b'\n') or (char == b'\r'):
-                        break
-                    nbytes += char
+                nbytes = file.readline()
+                end = min((i for i in (nbytes.find(b'\n'), nbytes.find(b'\r')) if i != -1),
+                          default = len(nbytes))
+                nbytes = nbytes[:end]
+                consumed = end + 1
+            else:
+                nbytes = file.read(n)
+                consumed = len(nbytes)
+            if self.movepos:
+                self.fd.seek(previous + consumed)
             else:
-                nbytes = file.buffer.read(n)
-            if not self.movepos:
                 self.fd.seek(previous)
-            return nbytes
+            return ByteBuffer(bytearray(nbytes))
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
-    
-    def f_fileword(self, expr):
+
+    # Reads straight into the memory of existing bytes (from position start in them),
+    # filling them if the file is long enough. Returns the number of bytes read.
+    def f_fileinto(self, interpreter, expr, buffer, start: int = 0):
+        if buffer.view.readonly:
+            raise RuntimeError(expr.rightParen, "Bytes are read-only.")
+        if start > len(buffer.view):
+            raise RuntimeError(expr.rightParen, "Start is beyond the end of the bytes.")
         try:
+            self.fd.flush()
             previous = self.fd.tell()
-            c = ""
-            word = ""
-            fd = self.fd
-            while True:
-                c = fd.read(1)
-                if c.isspace():
-                    continue
-                else:
-                    break
-            pos = fd.tell()
-            if pos != 0: # Fail-safe.
-                fd.seek(fd.tell() - 1) # Previous for-loop will go past the first character.
-            while True:
-                c = fd.read(1)
-                if c.isspace() or (c == ""): # Check for EOF.
-                    break
-                word += c
-            if not self.movepos:
+            file = self.fd.buffer
+            file.seek(previous)
+            count = file.readinto(buffer.view[start:])
+            if self.movepos:
+                self.fd.seek(previous + count)
+            else:
                 self.fd.seek(previous)
-            return String(word)
+            return float(count)
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
     
-    def f_fileline(self, expr):
+    def f_fileword(self, interpreter, expr):
         try:
-            previous = self.fd.tell()
-            line = self.fd.readline()
-            if not self.movepos:
-                self.fd.seek(previous)
-            return String(line.strip())
+            return String(self.reader.word(self.movepos))
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
+    
+    def f_fileline(self, interpreter, expr):
+        try:
+            return String(self.reader.readUntil("\n", self.movepos).strip())
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
     
-    def f_filelines(self, expr, n: int = -1):
+    def f_filelines(self, interpreter, expr, n: int = -1):
         try:
             previous = self.fd.tell()
             filelines = []
@@ -321,7 +378,11 @@ class fileFunction(LoxCallable):
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
     
-    def f_fileall(self, expr):
+    # Lines are read as the stream reaches them, from the current cursor position.
+    def f_filestream(self, interpreter, expr):
+        return LineStream(self.reader.lines())
+
+    def f_fileall(self, interpreter, expr):
         try:
             previous = self.fd.tell()
             file = self.fd.read()
@@ -333,7 +394,7 @@ class fileFunction(LoxCallable):
     
     # File output.
     
-    def f_filewrite(self, expr, string, format: bool = True):
+    def f_filewrite(self, interpreter, expr, string, format: bool = True):
         previous = self.fd.tell()
         try:
             if format:
@@ -346,9 +407,10 @@ class fileFunction(LoxCallable):
         finally:
             if not self.movepos:
                 self.fd.seek(previous)
+        return ()
     
     # Will not change cursor position (use jump then write instead for that).
-    def f_fileput(self, expr, string, pos: int, format: bool = True):
+    def f_fileput(self, interpreter, expr, string, pos: int, format: bool = True):
         previous = self.fd.tell()
         try:
             if pos >= self.filesize(self.fd, expr):
@@ -365,27 +427,30 @@ class fileFunction(LoxCallable):
         finally:
             if not self.movepos:
                 self.fd.seek(previous)
+        return ()
 
     # General operations.
 
-    def f_filejump(self, expr, pos: int):
+    def f_filejump(self, interpreter, expr, pos: int):
         if pos >= self.filesize(self.fd, expr):
             raise RuntimeError(expr.rightParen, "Jump value is beyond end of file.")
         try:
             self.fd.seek(pos)
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
+        return ()
 
-    def f_fileskip(self, expr, skip: int):
-        if (self.f_filepos(expr) + skip) >= self.filesize(self.fd, expr):
+    def f_fileskip(self, interpreter, expr, skip: int):
+        if (self.f_filepos(interpreter, expr) + skip) >= self.filesize(self.fd, expr):
             raise RuntimeError(expr.rightParen, "Position after skip is beyond end of file.")
         try:
             position = self.fd.tell()
             self.fd.seek(position + skip)
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
+        return ()
 
-    def f_filelimits(self, expr, option):
+    def f_filelimits(self, interpreter, expr, option):
         try:
             match option.text:
                 case "b":
@@ -394,198 +459,177 @@ class fileFunction(LoxCallable):
                     self.fd.seek(0,2)
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
+        return ()
     
-    def f_filepos(self, expr):
+    def f_filepos(self, interpreter, expr):
         try:
             return float(self.fd.tell()) # Make sure all our numbers are floats.
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def f_feof(self, expr) -> bool:
+    def f_feof(self, interpreter, expr) -> bool:
         try:
-            previous = self.fd.tell()
-            if self.fd.read(1) == "":
-                return True
-            # Always move back (user doesn't expect us to move forward by any characters).
-            self.fd.seek(previous) # Only return to original position if not at end.
-            return False
+            return self.reader.atEnd()
         except ValueError:
             raise RuntimeError(expr.leftParen, "File is closed.")
 
-    # ------------------------------------------------------------
+    # Memory-mapped files.
+    # Only the parts of the file that are accessed are read (by the OS, on demand).
 
-    # Error checking.
+    def f_filemap(self, interpreter, expr, path, write: bool = False):
+        import mmap
+        try:
+            with open(path.text, "r+b" if write else "rb") as file:
+                access = mmap.ACCESS_WRITE if write else mmap.ACCESS_READ
+                data = mmap.mmap(file.fileno(), 0, access = access)
+        except FileNotFoundError:
+            raise RuntimeError(expr.rightParen, "File does not exist.")
+        except ValueError: # Empty files cannot be mapped.
+            raise RuntimeError(expr.rightParen, "Cannot map an empty file.")
+        except OSError as error:
+            raise RuntimeError(expr.rightParen, f"Error mapping file '{path.text}':\n{str(error)}")
+        instance = LoxInstance(mapRef)
+        instance.setField("fd", data)
+        instance.setField("movepos", True)
+        return instance
 
-    def check(self, expr, arguments):
-        funcString = "check_" + self.mode
-        func = fileFunction.__dict__[funcString]
-        return func(self, expr, arguments)
+    def checkRange(self, expr, start: int, end: int):
+        if not (0 <= start <= end <= len(self.fd)):
+            raise RuntimeError(expr.rightParen, "Range is outside the mapped file.")
 
-    # ------------------------------------------------------------
+    def f_mapsize(self, interpreter, expr):
+        try:
+            return float(len(self.fd))
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_filemake(self, expr, arguments):
-        if type(arguments[0]) == String:
-            if len(arguments) == 1:
-                return True
-            elif (len(arguments) == 2) and (type(arguments[1]) == bool):
-                return True
-            elif len(arguments) == 3:
-                types = (String, bool, bool)
-                argTypes = (type(arguments[0]), type(arguments[1]), type(arguments[2]))
-                if types == argTypes:
-                    return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string, boolean.")
-
-    def check_fileopen(self, expr, arguments):
-        if type(arguments[0]) == String:
-            if (len(arguments) == 1) or (type(arguments[1]) == bool):
-                return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string.")
-
-    def check_filehas(self, expr, arguments):
-        if type(arguments[0]) == String:
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string.")
-    
-    def check_fileremove(self, expr, arguments):
-        if type(arguments[0]) == String:
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string.")
+    def f_mapbytes(self, interpreter, expr, start: int, end: int):
+        try:
+            self.checkRange(expr, start, end)
+            return ByteBuffer(self.fd[start:end])
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_filedrop(self, expr, arguments):
-        return True
-    
-    def check_fileflush(self, expr, arguments):
-        return True
+    def f_maptext(self, interpreter, expr, start: int, end: int):
+        try:
+            self.checkRange(expr, start, end)
+            return String(self.fd[start:end].decode("utf-8", errors = "replace"))
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_filechars(self, expr, arguments):
-        if type(arguments[0]) == float:
-            if (len(arguments) == 1) or (type(arguments[1]) == bool):
-                return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_filebytes(self, expr, arguments):
-        if type(arguments[0]) == float:
-            if (len(arguments) == 1) or (type(arguments[1]) == bool):
-                return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_fileword(self, expr, arguments):
-        return True
+    def f_mapfind(self, interpreter, expr, string, start: int = 0):
+        try:
+            return float(self.fd.find(string.text.encode("utf-8"), start))
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_fileline(self, expr, arguments):
-        return True
+    def f_mapline(self, interpreter, expr):
+        try:
+            line = self.fd.readline()
+            return String(line.decode("utf-8", errors = "replace").rstrip("\r\n"))
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_filelines(self, expr, arguments):
-        if (len(arguments) == 0) or (type(arguments[0]) == float):
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
+    def f_mapeof(self, interpreter, expr) -> bool:
+        try:
+            return self.fd.tell() >= len(self.fd)
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_fileall(self, expr, arguments):
-        return True
+    def f_mapjump(self, interpreter, expr, pos: int):
+        try:
+            if pos > len(self.fd):
+                raise RuntimeError(expr.rightParen, "Jump value is beyond end of file.")
+            self.fd.seek(pos)
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
+        return ()
 
-    def check_filewrite(self, expr, arguments):
-        if (type(arguments[0]) == String):
-            if (len(arguments) == 1) or (type(arguments[1]) == bool):
-                return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string, boolean.")
-
-    def check_fileput(self, expr, arguments):
-        if (type(arguments[0]) == String) and (type(arguments[1]) == float):
-            if (len(arguments) == 2) or (type(arguments[2] == bool)):
-                return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string, number.")
-
-    def check_filejump(self, expr, arguments):
-        if type(arguments[0]) == float:
-            if int(arguments[0]) < 0:
-                raise RuntimeError(expr.rightParen, "Jump value cannot be negative.")
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_fileskip(self, expr, arguments):
-        if type(arguments[0]) == float:
-            if int(arguments[0]) < 0:
-                raise RuntimeError(expr.rightParen, "Skip value cannot be negative.")
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_filelimits(self, expr, arguments):
-        if type(arguments[0]) == String:
-            return True
-        raise RuntimeError(expr.rightParen, "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: string.")
-
-    def check_filepos(self, expr, arguments):
-        return True
+    def f_mappos(self, interpreter, expr):
+        try:
+            return float(self.fd.tell())
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
 
-    def check_feof(self, expr, arguments):
-        return True
+    # The size of a mapped file is fixed, so this only overwrites.
+    def f_mapput(self, interpreter, expr, string, pos: int):
+        try:
+            data = string.text.encode("utf-8")
+            if pos + len(data) > len(self.fd):
+                raise RuntimeError(expr.rightParen, "Text goes beyond end of file.")
+            self.fd[pos:pos + len(data)] = data
+        except TypeError: # Read-only map.
+            raise RuntimeError(expr.rightParen, "File was not mapped for writing.")
+        except ValueError:
+            raise RuntimeError(expr.leftParen, "File is closed.")
+        return ()
 
-    # ------------------------------------------------------------
+    def f_mapdrop(self, interpreter, expr):
+        self.fd.close()
+        return ()
 
-    def arity(self):
-        match self.mode:
-            case "filemake":
-                return [1,3]
-            case "fileopen":
-                return [1,2]
-            case "filehas":
-                return [1,1]
-            case "fileremove":
-                return [1,1]
-            case "filedrop":
-                return [0,0]
-            case "fileflush":
-                return [0,0]
-            case "filechars":
-                return [1,1]
-            case "filebytes":
-                return [1,1]
-            case "fileword":
-                return [0,0]
-            case "fileline":
-                return [0,0]
-            case "filelines":
-                return [0,1]
-            case "fileall":
-                return [0,0]
-            case "filewrite":
-                return [1,2]
-            case "fileput":
-                return [2,3]
-            case "filejump":
-                return [1,1]
-            case "fileskip":
-                return [1,1]
-            case "filelimits":
-                return [1,1]
-            case "filepos":
-                return [0,0]
-            case "feof":
-                return [0,0]
-    
     # ------------------------------------------------------------
 
     def toString(self):
         return "<fileIO function>"
 
+# Methods that read through the file object's fileReader.
+bufferedModes = ("filechars", "fileword", "fileline", "filestream", "feof")
+
 fileRef = LoxClass(None, None, "file", {}, {})
-def fileIOSetUp():
-    fileIO.define("FILE_BEG", String("b"), "FIX")
-    fileIO.define("FILE_END", String("e"), "FIX")
-    for function in functions[:4]:
-        fileIO.define(function, fileFunction(function), "VAR")
-    for function in functions[4:]:
-        fileRef.public[function] = fileFunction(function)
\ No newline at end of file
+mapRef = LoxClass(None, None, "filemap", {}, {})
+
+INTEGER = NativeModule.INTEGER
+STRING = NativeModule.STRING
+BOOLEAN = NativeModule.BOOLEAN
+BYTES = NativeModule.BYTES
+
+fileIO.constant("FILE_BEG", String("b"))
+fileIO.constant("FILE_END", String("e"))
+
+# Name, implementation, parameter types and number of required parameters (the rest are optional).
+# File handling (module functions).
+for name, implementation, params, required in (
+        ("filemake", fileFunction.f_filemake, [STRING, BOOLEAN, BOOLEAN], 1),
+        ("fileopen", fileFunction.f_fileopen, [STRING, BOOLEAN], 1),
+        ("filehas", fileFunction.f_filehas, [STRING], 1),
+        ("fileremove", fileFunction.f_fileremove, [STRING], 1),
+        ("filemap", fileFunction.f_filemap, [STRING, BOOLEAN], 1),
+        ("afileread", fileFunction.f_afileread, [STRING], 1),
+        ("afilewrite", fileFunction.f_afilewrite, [STRING, STRING, BOOLEAN], 2)):
+    fileIO.function(name, implementation, params, required, fileFunction)
+
+# Methods of file objects.
+for name, implementation, params, required in (
+        ("filedrop", fileFunction.f_filedrop, [], 0),
+        ("fileflush", fileFunction.f_fileflush, [], 0),
+        ("filechars", fileFunction.f_filechars, [INTEGER], 1),
+        ("filebytes", fileFunction.f_filebytes, [INTEGER], 1),
+        ("fileinto", fileFunction.f_fileinto, [BYTES, INTEGER.counting("Start cannot be negative.")], 1),
+        ("fileword", fileFunction.f_fileword, [], 0),
+        ("fileline", fileFunction.f_fileline, [], 0),
+        ("filelines", fileFunction.f_filelines, [INTEGER], 0),
+        ("filestream", fileFunction.f_filestream, [], 0),
+        ("fileall", fileFunction.f_fileall, [], 0),
+        ("filewrite", fileFunction.f_filewrite, [STRING, BOOLEAN], 1),
+        ("fileput", fileFunction.f_fileput, [STRING, INTEGER, BOOLEAN], 2),
+        ("filejump", fileFunction.f_filejump, [INTEGER.counting("Jump value cannot be negative.")], 1),
+        ("fileskip", fileFunction.f_fileskip, [INTEGER.counting("Skip value cannot be negative.")], 1),
+        ("filelimits", fileFunction.f_filelimits, [STRING], 1),
+        ("filepos", fileFunction.f_filepos, [], 0),
+        ("feof", fileFunction.f_feof, [], 0)):
+    fileIO.method(fileRef, name, implementation, params, required, fileFunction)
+
+# Methods of memory-mapped file objects (returned by filemap).
+for name, implementation, params, required in (
+        ("mapsize", fileFunction.f_mapsize, [], 0),
+        ("mapbytes", fileFunction.f_mapbytes, [INTEGER, INTEGER], 2),
+        ("maptext", fileFunction.f_maptext, [INTEGER, INTEGER], 2),
+        ("mapfind", fileFunction.f_mapfind, [STRING, INTEGER], 1),
+        ("mapline", fileFunction.f_mapline, [], 0),
+        ("mapeof", fileFunction.f_mapeof, [], 0),
+        ("mapjump", fileFunction.f_mapjump, [INTEGER.counting("Jump value cannot be negative.")], 1),
+        ("mappos", fileFunction.f_mappos, [], 0),
+        ("mapput", fileFunction.f_mapput, [STRING, INTEGER.counting("Position cannot be negative.")], 2),
+        ("mapdrop", fileFunction.f_mapdrop, [], 0)):
+    fileIO.method(mapRef, name, implementation, params, required, fileFunction)
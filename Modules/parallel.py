@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.append(os.getcwd() +  "/Lox")
+from importlib import import_module as im
+NativeModule = im("NativeModule")
+RuntimeError = getattr(im("Error"), "RuntimeError")
+LoxTask = getattr(im("Scheduler"), "LoxTask")
+scheduler = getattr(im("Scheduler"), "scheduler")
+WorkerPool = im("WorkerPool")
+sys.path.pop()
+
+'''
+Runs top-level Lox functions in worker processes, one per CPU core, so CPU-bound work
+can use every core (see WorkerPool.py for how the workers are set up).
+1) pmap(function, list) - calls the function on each element, across the workers,
+   and returns the list of results (in order).
+2) submit(function, args) - starts a call with the arguments in list args in a worker,
+   and returns a task for it at once.
+3) result(task) - waits for a submitted call and returns its result (the same as await()).
+'''
+
+parallel = NativeModule.NativeModule("parallel")
+
+class ParallelFunction(NativeModule.NativeFunction):
+    def checkArity(self, expr, function, count: int):
+        arity = function.arity()
+        if not (arity[0] <= count <= arity[1]):
+            raise RuntimeError(expr.rightParen, "Arguments do not match the function's arity.")
+
+    def p_pmap(self, interpreter, expr, function, items):
+        self.checkArity(expr, function, 1)
+        return WorkerPool.workerPool(interpreter).map(function, items, expr.rightParen)
+
+    def p_submit(self, interpreter, expr, function, arguments):
+        self.checkArity(expr, function, len(arguments.array))
+        future = WorkerPool.workerPool(interpreter).submit(function, arguments, expr.rightParen)
+        task = LoxTask("worker")
+
+        def finished(future):
+            try:
+                task.finish(WorkerPool.outcome(future.result()), None)
+            except RuntimeError as error:
+                task.finish(None, error)
+            except Exception as error: # E.g., a worker process ended abruptly.
+                task.finish(None, RuntimeError(expr.rightParen, f"Worker failed: {error}"))
+
+        future.add_done_callback(finished)
+        return task
+
+    def p_result(self, interpreter, expr, task):
+        return scheduler(interpreter).wait(task)
+
+    def toString(self):
+        return "<parallel function>"
+
+FUNCTION = NativeModule.FUNCTION
+LIST = NativeModule.LIST
+TASK = NativeModule.Param("task", (LoxTask,))
+
+# Name, implementation, parameter types.
+for name, implementation, params in (
+        ("pmap", ParallelFunction.p_pmap, [FUNCTION, LIST]),
+        ("submit", ParallelFunction.p_submit, [FUNCTION, LIST]),
+        ("result", ParallelFunction.p_result, [TASK])):
+    parallel.function(name, implementation, params, kind = ParallelFunction)
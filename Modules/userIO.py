@@ -2,80 +2,30 @@ import os
 import sys
 sys.path.append(os.getcwd() +  "/Lox")
 from importlib import import_module as im
-Environment = getattr(im("Environment"), "Environment")
-LoxCallable = getattr(im("LoxCallable"), "LoxCallable")
+NativeModule = im("NativeModule")
 RuntimeError = getattr(im("Error"), "RuntimeError")
 List = getattr(im("List"), "List")
 String = getattr(im("String"), "String")
+lineStream = getattr(im("LineStream"), "lineStream")
+ByteBuffer = getattr(im("ByteBuffer"), "ByteBuffer")
+scheduler = getattr(im("Scheduler"), "scheduler")
 
-userIO = Environment()
-functions = ["inchars", "inbytes", "inword", "inline", "inlines", "inpeek", "echo", "inflush", "outflush"]
+userIO = NativeModule.NativeModule("userIO")
+
+class IOFunction(NativeModule.NativeFunction):
+    def __init__(self, name, implementation, params, required = None):
+        super().__init__(name, implementation, params, required)
+        # Show any pending output (e.g., a prompt) before reading input.
+        self.flushes = name[:2] == "in"
 
-class IOFunction(LoxCallable):
-    def __init__(self, mode: str):
-        self.mode = mode
-    
-    def check(self, expr, arguments):
-        funcString = "check_" + self.mode
-        func = IOFunction.__dict__[funcString]
-        return func(self, expr, arguments)
-    
     def call(self, interpreter, expr, arguments):
-        if self.check(expr, arguments):
-            match self.mode:
-                case "inchars":
-                    # Our numbers are all saved as floats, but read() only accepts integers.
-                    if len(arguments) == 2:
-                        return self.io_inchars(int(arguments[0]), arguments[1])
-                    elif len(arguments) == 1:
-                        return self.io_inchars(int(arguments[0]))
-                case "inbytes":
-                    if len(arguments) == 2:
-                        return self.io_inbytes(int(arguments[0]), arguments[1])
-                    elif len(arguments) == 1:
-                        return self.io_inbytes(int(arguments[0]))
-                case "inword":
-                    return self.io_inword()
-                case "inline":
-                    return self.io_inline()
-                case "inlines":
-                    return self.io_inlines(int(arguments[0]))
-                case "inpeek":
-                    return self.io_inpeek()
-                case "echo":
-                    self.io_echo(arguments[0], expr)
-                    return ()
-                case "inflush":
-                    self.io_inflush()
-                    return ()
-                case "outflush":
-                    self.io_outflush()
-                    return ()
-    
-    def arity(self):
-        match self.mode:
-            case "inchars":
-                return [1,2]
-            case "inbytes":
-                return [1,2]
-            case "inword":
-                return [0,0]
-            case "inline":
-                return [0,0]
-            case "inlines":
-                return [0,1]
-            case "inpeek":
-                return [0,0]
-            case "echo":
-                return [1,1]
-            case "inflush":
-                return [0,0]
-            case "outflush":
-                return [0,0]
+        if self.flushes:
+            interpreter.context.output.flush()
+        return super().call(interpreter, expr, arguments)
     
     # Input.
 
-    def io_inchars(self, n: int, delim: bool = False):
+    def io_inchars(self, interpreter, expr, n: int, delim: bool = False):
         if delim:
             string = ""
             char = ""
@@ -88,7 +38,7 @@ class IOFunction(LoxCallable):
         else:
             return String(sys.stdin.read(n))
 
-    def io_inbytes(self, n: int, delim: bool = False):
+    def io_inbytes(self, interpreter, expr, n: int, delim: bool = False):
         if delim:
             string = b""
             char = b""
@@ -97,11 +47,11 @@ class IOFunction(LoxCallable):
                 if (char == b'\n') or (char == b'\r'):
                     break
                 string += char
-            return string
+            return ByteBuffer(bytearray(string))
         else:
-            return sys.stdin.buffer.read(n)
+            return ByteBuffer(bytearray(sys.stdin.buffer.read(n)))
 
-    def io_inword(self):
+    def io_inword(self, interpreter, expr):
         string = ""
         char = ""
         while True:
@@ -111,13 +61,13 @@ class IOFunction(LoxCallable):
             string += char
         return String(string)
 
-    def io_inline(self):
+    def io_inline(self, interpreter = None, expr = None):
         string = sys.stdin.readline()
-        if string[-1] == '\n':
+        if string[-1:] == '\n':
             return String(string[:-1])
         return String(string)
     
-    def io_inlines(self, n: int = -1):
+    def io_inlines(self, interpreter, expr, n: int = -1):
         if n != -1:
             lineList = []
             for i in range(0, n):
@@ -127,21 +77,34 @@ class IOFunction(LoxCallable):
         lineList = [String(line.rstrip('\n')) for line in lineList]
         return List(lineList)
 
-    def io_inpeek(self):
+    # Lines are read as the stream reaches them.
+    def io_instream(self, interpreter, expr):
+        return lineStream(sys.stdin)
+
+    # Returns a task reading a line (await() gives the line), so the program can go on meanwhile.
+    def io_ainline(self, interpreter, expr):
+        interpreter.context.output.flush()
+        return scheduler(interpreter).input(self.io_inline)
+
+    def io_inpeek(self, interpreter, expr):
         return String(sys.stdin.read(1))
     
     # Output.
 
-    def io_echo(self, arg, expr):
+    def io_echo(self, interpreter, expr, arg):
         try:
-            printText = arg.text.encode("utf-8").decode("unicode_escape")
-            print(printText)
+            printText = arg.text
+            # Plain ASCII text without escapes is unchanged by the decoding.
+            if ("\\" in printText) or (not printText.isascii()):
+                printText = printText.encode("utf-8").decode("unicode_escape")
+            interpreter.context.output.write(printText + "\n")
         except UnicodeDecodeError:
             raise RuntimeError(expr.leftParen, "Failed to format string.")
+        return ()
     
     # Buffer flushing.
 
-    def io_inflush(self):
+    def io_inflush(self, interpreter, expr):
         import os
         if os.name == "nt": # Using Windows.
             import msvcrt
@@ -152,60 +115,30 @@ class IOFunction(LoxCallable):
             # it doesn't work on Windows.
             import termios
             termios.tcflush(sys.stdin, termios.TCIFLUSH)
+        return ()
     
-    def io_outflush(self):
-        sys.stdout.flush()
-    
-    # Error checking.
+    def io_outflush(self, interpreter, expr):
+        interpreter.context.output.flush()
+        return ()
 
-    def check_inchars(self, expr, arguments):
-        # No need for argument number checks since that is already a part of the interpreter.
-        if (type(arguments[0]) == float):
-            if (len(arguments) == 1) or (type(arguments[1]) == bool):
-                return True
-        raise RuntimeError(expr.rightParen, 
-                                       "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number, boolean.")
-    
-    def check_inbytes(self, expr, arguments):
-        if type(arguments[0]) == float:
-            return True
-        raise RuntimeError(expr.rightParen, 
-                                       "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_inword(self, expr, arguments):
-        return True
-    
-    def check_inline(self, expr, arguments):
-        return True
-
-    def check_inlines(self, expr, arguments):
-        if len(arguments) or type(arguments[0]) == float:
-            return True
-        raise RuntimeError(expr.rightParen, 
-                                       "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-    
-    def check_inpeek(self, expr, arguments):
-        return True
-
-    def check_echo(self, expr, arguments):
-        if type(arguments[0]) == String:
-            return True
-        raise RuntimeError(expr.rightParen, 
-                                       "Arguments do not match accepted parameter types.\n" \
-                                       "Types are: number.")
-
-    def check_inflush(self, expr, arguments):
-        return True
-    
-    def check_outflush(self, expr, arguments):
-        return True
-    
     def toString(self):
         return "<userIO function>"
-    
-def userIOSetUp():
-    for function in functions:
-        userIO.define(function, IOFunction(function), "VAR")
\ No newline at end of file
+
+INTEGER = NativeModule.INTEGER
+BOOLEAN = NativeModule.BOOLEAN
+STRING = NativeModule.STRING
+
+# Name, implementation, parameter types and number of required parameters (the rest are optional).
+for name, implementation, params, required in (
+        ("inchars", IOFunction.io_inchars, [INTEGER, BOOLEAN], 1),
+        ("inbytes", IOFunction.io_inbytes, [INTEGER, BOOLEAN], 1),
+        ("inword", IOFunction.io_inword, [], 0),
+        ("inline", IOFunction.io_inline, [], 0),
+        ("inlines", IOFunction.io_inlines, [INTEGER], 0),
+        ("instream", IOFunction.io_instream, [], 0),
+        ("ainline", IOFunction.io_ainline, [], 0),
+        ("inpeek", IOFunction.io_inpeek, [], 0),
+        ("echo", IOFunction.io_echo, [STRING], 1),
+        ("inflush", IOFunction.io_inflush, [], 0),
+        ("outflush", IOFunction.io_outflush, [], 0)):
+    userIO.function(name, implementation, params, required, IOFunction)